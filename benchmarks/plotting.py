@@ -0,0 +1,37 @@
+"""Benchmarks of `show_model`."""
+
+import os
+import tempfile
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+from blobmodel import Geometry, Model, show_model
+
+
+class ShowModel:
+    """Rendering a realization to a GIF."""
+
+    timeout = 300
+
+    def setup(self):
+        self.dataset = Model(
+            geometry=Geometry(Nx=32, Ny=32, Lx=10, Ly=10, dt=0.1, T=2),
+            num_blobs=20,
+            verbose=False,
+            seed=1,
+        ).make_realization()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def teardown(self):
+        plt.close("all")
+        self.directory.cleanup()
+
+    def time_show_model(self):
+        show_model(
+            self.dataset,
+            gif_name=os.path.join(self.directory.name, "animation.gif"),
+            show=False,
+        )
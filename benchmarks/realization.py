@@ -0,0 +1,119 @@
+"""Benchmarks of `Model.make_realization` across the parameter space."""
+
+import numpy as np
+from blobmodel import (
+    BlobShapeEnum,
+    BlobShapeImpl,
+    DefaultBlobFactory,
+    DistributionEnum,
+    Geometry,
+    Model,
+)
+
+# Grid sizes (Nx, Ny, number of time steps) of the realizations.
+GRIDS = {
+    "small": (16, 16, 200),
+    "medium": (32, 32, 500),
+    "large": (64, 64, 1000),
+}
+
+
+def _model(grid="small", num_blobs=100, periodic_y=False, **model_kwargs):
+    Nx, Ny, Nt = GRIDS[grid]
+    model_kwargs.setdefault(
+        "blob_factory",
+        DefaultBlobFactory().set_sampler("vy", DistributionEnum.normal, 0.5),
+    )
+    return Model(
+        geometry=Geometry(
+            Nx=Nx, Ny=Ny, Lx=10, Ly=10, dt=0.1, T=Nt * 0.1, periodic_y=periodic_y
+        ),
+        num_blobs=num_blobs,
+        verbose=False,
+        seed=1,
+        **model_kwargs,
+    )
+
+
+class GridSize:
+    """Realizations on growing grids with growing numbers of blobs."""
+
+    params = (list(GRIDS), [10, 100, 1000])
+    param_names = ["grid", "num_blobs"]
+    timeout = 300
+
+    def setup(self, grid, num_blobs):
+        self.model = _model(grid, num_blobs)
+
+    def time_make_realization(self, grid, num_blobs):
+        self.model.make_realization()
+
+    def peakmem_make_realization(self, grid, num_blobs):
+        self.model.make_realization()
+
+
+class BlobShapes:
+    """Realizations with every blob shape, for both axes."""
+
+    params = [shape.name for shape in BlobShapeEnum]
+    param_names = ["blob_shape"]
+
+    def setup(self, blob_shape):
+        shape = BlobShapeEnum[blob_shape]
+        self.model = _model(
+            "medium", blob_shape=BlobShapeImpl(shape, shape), num_blobs=200
+        )
+
+    def time_make_realization(self, blob_shape):
+        self.model.make_realization()
+
+
+class Labels:
+    """Realizations with the blob labels computed."""
+
+    params = ["off", "same", "individual"]
+    param_names = ["labels"]
+
+    def setup(self, labels):
+        self.model = _model("medium", num_blobs=200, labels=labels)
+
+    def time_make_realization(self, labels):
+        self.model.make_realization()
+
+
+class Features:
+    """Realizations exercising the optional model features."""
+
+    params = ["default", "periodic_y", "tilted", "t_drain_array", "one_dimensional"]
+    param_names = ["feature"]
+
+    def setup(self, feature):
+        factory = DefaultBlobFactory(
+            t_drain=(
+                np.linspace(2, 1, GRIDS["medium"][0])
+                if feature == "t_drain_array"
+                else np.inf
+            )
+        )
+        if feature == "one_dimensional":
+            self.model = Model(
+                geometry=Geometry(Nx=GRIDS["medium"][0], Ny=1, Ly=0, dt=0.1, T=500),
+                blob_factory=factory,
+                num_blobs=1000,
+                one_dimensional=True,
+                verbose=False,
+                seed=1,
+            )
+            return
+        factory.set_sampler("vy", DistributionEnum.normal, 0.5)
+        if feature == "tilted":
+            factory.set_theta_setter(lambda: np.pi / 4)
+        self.model = _model(
+            "medium",
+            num_blobs=200,
+            periodic_y=feature == "periodic_y",
+            blob_factory=factory,
+        )
+
+    def time_make_realization(self, feature):
+        self.model.make_realization()
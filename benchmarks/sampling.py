@@ -0,0 +1,21 @@
+"""Benchmarks of the blob factories."""
+
+from blobmodel import BlobShapeImpl, DefaultBlobFactory, DistributionEnum
+
+
+class SampleBlobs:
+    """Sampling blob populations with `DefaultBlobFactory`."""
+
+    params = [1000, 10000, 100000]
+    param_names = ["num_blobs"]
+
+    def setup(self, num_blobs):
+        self.factory = DefaultBlobFactory(seed=1).set_sampler(
+            "vy", DistributionEnum.normal, 0.5
+        )
+        self.blob_shape = BlobShapeImpl()
+
+    def time_sample_blobs(self, num_blobs):
+        self.factory.sample_blobs(
+            Ly=10, T=100, num_blobs=num_blobs, blob_shape=self.blob_shape
+        )
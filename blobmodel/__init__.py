@@ -1,6 +1,22 @@
-from .model import Model, to_imaging_dataset
-from .blobs import Blob
+from .model import Model, RealizationPlan, to_imaging_dataset
+from .blobs import Blob, BlobBatch
 from .plotting import show_model
+from .profiling import PhaseTimer, WorkCounters
+from .progress import (
+    ProgressReporter,
+    ProgressState,
+    SilentReporter,
+    CallbackReporter,
+    LoggingReporter,
+    TqdmReporter,
+)
+from .statistics import (
+    Reducer,
+    MeanReducer,
+    VarianceReducer,
+    HistogramReducer,
+    PointStatisticsReducer,
+)
 from .stochasticality import (
     BlobFactory,
     BlobListFactory,
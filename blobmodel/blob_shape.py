@@ -2,6 +2,8 @@
 
 from enum import Enum
 from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+import math
 import numpy as np
 
 
@@ -26,8 +28,26 @@ class AbstractBlobShape(ABC):
     ``phi(theta_p, theta_s) = phi_p(theta_p) * phi_s(theta_s)``
 
     Where the p and s subindexes stand for primary and secondary directions.
+    The shapes should be computed in the floating point dtype of ``theta``,
+    so that single-precision realizations stay in float32.
+
+    Shape parameters are passed as keyword arguments. By default they are
+    scalars, so blobs with different shape parameters are evaluated in
+    separate calls. Subclasses setting `supports_parameter_arrays` to True
+    also accept parameter arrays broadcastable against ``theta`` (e.g. one
+    value per blob of shape ``(batch, 1, 1, 1)`` for a stacked batch of
+    blobs), and return per-blob arrays from `get_support_p` and
+    `get_support_s` when given parameter arrays of shape ``(batch,)``.
+
+    Subclasses setting `supports_out` to True accept an ``out`` keyword
+    argument in `get_blob_shape_p` and `get_blob_shape_s`: a preallocated
+    buffer of the shape and dtype of ``theta``, possibly ``theta`` itself,
+    which the shape is written into and returned in.
     """
 
+    supports_parameter_arrays = False
+    supports_out = False
+
     @abstractmethod
     def get_blob_shape_p(self, theta: np.ndarray, **kwargs) -> np.ndarray:
         raise NotImplementedError
@@ -36,14 +56,119 @@ class AbstractBlobShape(ABC):
     def get_blob_shape_s(self, theta: np.ndarray, **kwargs) -> np.ndarray:
         raise NotImplementedError
 
+    def get_support_p(self, tolerance: float, **kwargs) -> Tuple[float, float]:
+        """Compute the interval of theta outside of which the pulse shape in
+        the principal direction is smaller than `tolerance` in magnitude.
+
+        Used by `Model.make_realization` to truncate blobs when ``speed_up``
+        is enabled. The default assumes a symmetric shape decaying at least
+        as fast as ``exp(-|theta|) / sqrt(pi)``; subclasses should override
+        it with the support of their shapes.
+
+        Parameters
+        ----------
+        tolerance : float
+            Value below which the pulse shape is neglected.
+        kwargs
+            Shape parameters, as passed to `get_blob_shape_p`.
+
+        Returns
+        -------
+        Tuple[float, float]
+            Lower and upper bound of the support in units of the blob width.
+        """
+        return _get_default_support(tolerance)
+
+    def get_support_s(self, tolerance: float, **kwargs) -> Tuple[float, float]:
+        """Compute the interval of theta outside of which the pulse shape in
+        the secondary direction is smaller than `tolerance` in magnitude.
+
+        See `get_support_p`.
+
+        Parameters
+        ----------
+        tolerance : float
+            Value below which the pulse shape is neglected.
+        kwargs
+            Shape parameters, as passed to `get_blob_shape_s`.
+
+        Returns
+        -------
+        Tuple[float, float]
+            Lower and upper bound of the support in units of the blob width.
+        """
+        return _get_default_support(tolerance)
+
+    def get_jumps_p(self, **kwargs) -> Tuple[float, ...]:
+        """Compute the values of theta at which the pulse shape in the
+        principal direction jumps.
+
+        Used by `sum_up_homogeneous_blobs` to place the jumps of
+        discontinuous shapes exactly. The default assumes a continuous
+        shape; subclasses with discontinuous shapes should override it.
+
+        Parameters
+        ----------
+        kwargs
+            Scalar shape parameters, as passed to `get_blob_shape_p`.
+
+        Returns
+        -------
+        Tuple[float, ...]
+            Positions of the jumps in units of the blob width.
+        """
+        return ()
+
+    def get_jumps_s(self, **kwargs) -> Tuple[float, ...]:
+        """Compute the values of theta at which the pulse shape in the
+        secondary direction jumps.
 
-def _get_exponential_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
+        See `get_jumps_p`.
+
+        Parameters
+        ----------
+        kwargs
+            Scalar shape parameters, as passed to `get_blob_shape_s`.
+
+        Returns
+        -------
+        Tuple[float, ...]
+            Positions of the jumps in units of the blob width.
+        """
+        return ()
+
+
+def _float_dtype(*arrays) -> np.dtype:
+    """Floating point dtype computations on `arrays` are carried out in: the
+    common dtype of the arrays if it is a floating point one, float64 else."""
+    dtype = np.result_type(*(np.asarray(array).dtype for array in arrays))
+    return dtype if np.issubdtype(dtype, np.floating) else np.dtype(np.float64)
+
+
+def _output_buffer(
+    theta: np.ndarray, out: Optional[np.ndarray], *parameters: np.ndarray
+) -> np.ndarray:
+    """Array a pulse shape of `theta` is written into: `out` if given, else
+    a new array in the floating point dtype of `theta`, of the shape of
+    `theta` broadcast against the shape `parameters`."""
+    if out is None:
+        shape = np.broadcast_shapes(np.shape(theta), *map(np.shape, parameters))
+        return np.empty(shape, dtype=_float_dtype(theta))
+    return out
+
+
+def _get_exponential_shape(
+    theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+) -> np.ndarray:
     """Compute the exponential pulse shape.
 
     Parameters
     ----------
     theta : np.ndarray
         Array of theta values.
+    out : np.ndarray, optional
+        Buffer of the shape of theta to write the result into, which may be
+        theta itself.
     kwargs
         Additional keyword arguments.
 
@@ -52,18 +177,26 @@ def _get_exponential_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
     np.ndarray
         Array representing the exponential pulse shape.
     """
-    kern = np.zeros(shape=np.shape(theta))
-    kern[theta < 0] = np.exp(theta[theta < 0])
-    return kern
+    leading = np.greater_equal(theta, 0)
+    out = _output_buffer(theta, out)
+    np.minimum(theta, 0, out=out)
+    np.exp(out, out=out)
+    np.copyto(out, 0, where=leading)
+    return out
 
 
-def _get_lorentz_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
+def _get_lorentz_shape(
+    theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+) -> np.ndarray:
     """Compute the Lorentzian pulse shape.
 
     Parameters
     ----------
     theta : np.ndarray
         Array of theta values.
+    out : np.ndarray, optional
+        Buffer of the shape of theta to write the result into, which may be
+        theta itself.
     kwargs
         Additional keyword arguments.
 
@@ -72,10 +205,16 @@ def _get_lorentz_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
     np.ndarray
         Array representing the Lorentzian pulse shape.
     """
-    return 1 / (np.pi * (1 + theta**2))
+    out = _output_buffer(theta, out)
+    np.square(theta, out=out)
+    out += 1
+    out *= np.pi
+    return np.divide(1, out, out=out)
 
 
-def _get_double_exponential_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
+def _get_double_exponential_shape(
+    theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+) -> np.ndarray:
     """Compute the double-exponential pulse shape.
 
     The shape is ``exp(-theta / lam)`` for ``theta >= 0`` and
@@ -95,10 +234,15 @@ def _get_double_exponential_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
     ----------
     theta : np.ndarray
         Array of theta values.
+    out : np.ndarray, optional
+        Buffer of the shape of theta to write the result into, which may be
+        theta itself.
     kwargs
         Additional keyword arguments.
-        lam : float
+        lam : float or np.ndarray
             Asymmetry parameter controlling the shape, in the interval [0, 1].
+            An array, e.g. one value per blob of shape (batch, 1, 1, 1), must
+            broadcast against theta.
             The limits are the one-sided shapes: lam = 0 is nonzero only for
             theta < 0 (a pure temporal decay for v_x > 0), lam = 1 is nonzero
             only for theta >= 0 (a pure temporal rise for v_x > 0).
@@ -114,23 +258,41 @@ def _get_double_exponential_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
         If lam lies outside the interval [0, 1].
     """
     lam = kwargs["lam"]
-    if not 0.0 <= lam <= 1.0:
-        raise ValueError(f"lam must be in the interval [0, 1], got lam = {lam}.")
-    kern = np.zeros(shape=np.shape(theta))
-    if lam < 1.0:
-        kern[theta < 0] = np.exp(theta[theta < 0] / (1 - lam))
-    if lam > 0.0:
-        kern[theta >= 0] = np.exp(-theta[theta >= 0] / lam)
-    return kern
-
-
-def _get_gaussian_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
+    if np.ndim(lam) == 0:
+        if not 0.0 <= lam <= 1.0:
+            raise ValueError(f"lam must be in the interval [0, 1], got lam = {lam}.")
+    else:
+        if np.any((lam < 0.0) | (lam > 1.0)):
+            raise ValueError(
+                f"lam must be in the interval [0, 1], got values in "
+                f"[{np.min(lam)}, {np.max(lam)}]."
+            )
+        lam = np.asarray(lam, dtype=_float_dtype(theta))
+    leading = np.greater_equal(theta, 0)
+    out = _output_buffer(theta, out, lam)
+    # A vanishing e-folding length (lam = 0 or 1) divides by zero, which
+    # gives exp(-inf) = 0 except at theta = 0, where 0 / 0 is set to 0 below.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(theta, 1 - lam, out=out, where=~leading)
+        np.divide(theta, lam, out=out, where=leading)
+    np.negative(out, out=out, where=leading)
+    np.exp(out, out=out)
+    np.copyto(out, 0, where=np.isnan(out))
+    return out
+
+
+def _get_gaussian_shape(
+    theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+) -> np.ndarray:
     """Compute the Gaussian pulse shape.
 
     Parameters
     ----------
     theta : np.ndarray
         Array of theta values.
+    out : np.ndarray, optional
+        Buffer of the shape of theta to write the result into, which may be
+        theta itself.
     kwargs
         Additional keyword arguments.
 
@@ -139,15 +301,25 @@ def _get_gaussian_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
     np.ndarray
         Array representing the Gaussian pulse shape.
     """
-    return 1 / np.sqrt(np.pi) * np.exp(-(theta**2))
+    out = _output_buffer(theta, out)
+    np.square(theta, out=out)
+    np.negative(out, out=out)
+    np.exp(out, out=out)
+    out *= 1 / math.sqrt(math.pi)
+    return out
 
 
-def _get_rectangle_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
+def _get_rectangle_shape(
+    theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+) -> np.ndarray:
     """Compute the hard ellipse pulse shape.
     Parameters
     ----------
     theta : np.ndarray
         Array of theta values.
+    out : np.ndarray, optional
+        Buffer of the shape of theta to write the result into, which may be
+        theta itself.
     kwargs
         Additional keyword arguments.
     Returns
@@ -155,16 +327,23 @@ def _get_rectangle_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
     np.ndarray
         Array representing the rectangle pulse shape.
     """
-    return np.abs(theta) < 0.5
+    out = _output_buffer(theta, out)
+    np.abs(theta, out=out)
+    return np.less(out, 0.5, out=out)
 
 
-def _get_secant_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
-    """Compute the secant pulse shape.
+def _get_secant_shape(
+    theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+) -> np.ndarray:
+    """Compute the secant pulse shape ``1 / (pi * cosh(theta))``.
 
     Parameters
     ----------
     theta : np.ndarray
         Array of theta values.
+    out : np.ndarray, optional
+        Buffer of the shape of theta to write the result into, which may be
+        theta itself.
     kwargs
         Additional keyword arguments.
 
@@ -173,16 +352,25 @@ def _get_secant_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
     np.ndarray
         Array representing the secant pulse shape.
     """
-    return 2 / np.pi / (np.exp(theta) + np.exp(-theta))
+    out = _output_buffer(theta, out)
+    with np.errstate(over="ignore"):
+        np.cosh(theta, out=out)
+    out *= np.pi
+    return np.divide(1, out, out=out)
 
 
-def _get_dipole_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
+def _get_dipole_shape(
+    theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+) -> np.ndarray:
     """Compute the diople pulse shape as a derivative of a gaussian pulse shape.
 
     Parameters
     ----------
     theta : np.ndarray
         Array of theta values.
+    out : np.ndarray, optional
+        Buffer of the shape of theta to write the result into, which may be
+        theta itself.
     kwargs
         Additional keyword arguments.
 
@@ -191,11 +379,106 @@ def _get_dipole_shape(theta: np.ndarray, **kwargs) -> np.ndarray:
     np.ndarray
         Array representing the dipole pulse shape.
     """
-    return -2 * theta / np.sqrt(2 * np.pi) * np.exp(-(theta**2) / 2)
+    # The Gaussian factor needs theta, which out may overwrite.
+    gaussian = np.square(theta, dtype=_float_dtype(theta))
+    gaussian *= -0.5
+    np.exp(gaussian, out=gaussian)
+    out = _output_buffer(theta, out)
+    np.multiply(theta, -2 / math.sqrt(2 * math.pi), out=out)
+    out *= gaussian
+    return out
+
+
+def _get_default_support(tolerance: float, **kwargs) -> Tuple[float, float]:
+    """Support of a shape bounded by ``exp(-|theta|) / sqrt(pi)``."""
+    radius = max(0.0, -np.log(tolerance * np.sqrt(np.pi)))
+    return -radius, radius
+
+
+def _get_exponential_support(tolerance: float, **kwargs) -> Tuple[float, float]:
+    """Support of the exponential pulse shape, which vanishes for theta >= 0."""
+    return min(0.0, np.log(tolerance)), 0.0
+
+
+def _get_lorentz_support(tolerance: float, **kwargs) -> Tuple[float, float]:
+    """Support of the Lorentzian pulse shape, which decays as a power law."""
+    radius = np.sqrt(max(0.0, 1 / (np.pi * tolerance) - 1))
+    return -radius, radius
+
+
+def _get_double_exponential_support(tolerance: float, **kwargs) -> Tuple[float, float]:
+    """Support of the double-exponential pulse shape, see
+    `_get_double_exponential_shape` for the asymmetry parameter ``lam``."""
+    lam = kwargs["lam"]
+    log_tolerance = min(0.0, np.log(tolerance))
+    return (1 - lam) * log_tolerance, -lam * log_tolerance
+
+
+def _get_gaussian_support(tolerance: float, **kwargs) -> Tuple[float, float]:
+    """Support of the Gaussian pulse shape."""
+    radius = np.sqrt(max(0.0, -np.log(tolerance * np.sqrt(np.pi))))
+    return -radius, radius
+
+
+def _get_rectangle_support(tolerance: float, **kwargs) -> Tuple[float, float]:
+    """Support of the rectangle pulse shape, which is compact."""
+    return -0.5, 0.5
+
+
+def _get_secant_support(tolerance: float, **kwargs) -> Tuple[float, float]:
+    """Support of the secant pulse shape ``1 / (pi * cosh(theta))``."""
+    radius = np.arccosh(max(1.0, 1 / (np.pi * tolerance)))
+    return -radius, radius
+
+
+def _get_dipole_support(tolerance: float, **kwargs) -> Tuple[float, float]:
+    """Support of the dipole pulse shape.
+
+    The radius solves ``2 * r * exp(-r**2 / 2) / sqrt(2 * pi) = tolerance``
+    beyond the maximum at r = 1 by fixed-point iteration, which converges
+    from above.
+    """
+    radius = max(1.0, np.sqrt(-2 * np.log(min(tolerance, 0.5))) + 1)
+    for _ in range(20):
+        radius = np.sqrt(
+            2 * np.log(max(1.0, 2 * radius / (np.sqrt(2 * np.pi) * tolerance)))
+        )
+    return -radius, radius
+
+
+def _get_no_jumps(**kwargs) -> Tuple[float, ...]:
+    """Jumps of a continuous pulse shape."""
+    return ()
+
+
+def _get_exponential_jumps(**kwargs) -> Tuple[float, ...]:
+    """Jumps of the exponential pulse shape, which drops to 0 at theta = 0."""
+    return (0.0,)
+
+
+def _get_double_exponential_jumps(**kwargs) -> Tuple[float, ...]:
+    """Jumps of the double-exponential pulse shape, which is one-sided for
+    ``lam`` 0 or 1."""
+    return (0.0,) if kwargs["lam"] in (0.0, 1.0) else ()
+
+
+def _get_rectangle_jumps(**kwargs) -> Tuple[float, ...]:
+    """Jumps of the rectangle pulse shape at its edges."""
+    return (-0.5, 0.5)
 
 
 class BlobShapeImpl(AbstractBlobShape):
-    """Implementation of the AbstractBlobShape class."""
+    """Implementation of the AbstractBlobShape class.
+
+    All shapes accept per-blob arrays of shape parameters and write into
+    preallocated buffers, see `AbstractBlobShape.supports_parameter_arrays`
+    and `AbstractBlobShape.supports_out`. Two instances with the same pulse
+    shapes compare equal, so that blobs with distinct but equal shape
+    objects are evaluated together, see `BlobBatch`.
+    """
+
+    supports_parameter_arrays = True
+    supports_out = True
 
     def __init__(
         self,
@@ -226,16 +509,35 @@ class BlobShapeImpl(AbstractBlobShape):
             raise NotImplementedError(
                 f"{self.__class__.__name__}.blob_shape not implemented"
             )
+        self._pulse_shapes = (pulse_shape_p, pulse_shape_s)
         self._shape_p = BlobShapeImpl.__GENERATORS[pulse_shape_p]
         self._shape_s = BlobShapeImpl.__GENERATORS[pulse_shape_s]
-
-    def get_blob_shape_p(self, theta: np.ndarray, **kwargs) -> np.ndarray:
+        self._support_p = BlobShapeImpl.__SUPPORTS[pulse_shape_p]
+        self._support_s = BlobShapeImpl.__SUPPORTS[pulse_shape_s]
+        self._jumps_p = BlobShapeImpl.__JUMPS[pulse_shape_p]
+        self._jumps_s = BlobShapeImpl.__JUMPS[pulse_shape_s]
+
+    def __eq__(self, other: object) -> bool:
+        """Two blob shapes are equal if they have the same pulse shapes."""
+        if not isinstance(other, BlobShapeImpl):
+            return NotImplemented
+        return self._pulse_shapes == other._pulse_shapes
+
+    def __hash__(self) -> int:
+        return hash(self._pulse_shapes)
+
+    def get_blob_shape_p(
+        self, theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+    ) -> np.ndarray:
         """Compute the pulse shape in the principal direction.
 
         Parameters
         ----------
         theta : np.ndarray
             Array of theta values.
+        out : np.ndarray, optional
+            Buffer of the shape of theta to write the result into, which may
+            be theta itself. By default a new array is returned.
         kwargs
             Additional keyword arguments passed to the shape function.
 
@@ -244,15 +546,20 @@ class BlobShapeImpl(AbstractBlobShape):
         np.ndarray
             Array representing the pulse shape in the principal direction.
         """
-        return self._shape_p(theta, **kwargs)
+        return self._shape_p(theta, out=out, **kwargs)
 
-    def get_blob_shape_s(self, theta: np.ndarray, **kwargs) -> np.ndarray:
+    def get_blob_shape_s(
+        self, theta: np.ndarray, out: Optional[np.ndarray] = None, **kwargs
+    ) -> np.ndarray:
         """Compute the pulse shape in the secondary direction.
 
         Parameters
         ----------
         theta : np.ndarray
             Array of theta values.
+        out : np.ndarray, optional
+            Buffer of the shape of theta to write the result into, which may
+            be theta itself. By default a new array is returned.
         kwargs
             Additional keyword arguments passed to the shape function.
 
@@ -261,7 +568,71 @@ class BlobShapeImpl(AbstractBlobShape):
         np.ndarray
             Array representing the pulse shape in the secondary direction.
         """
-        return self._shape_s(theta, **kwargs)
+        return self._shape_s(theta, out=out, **kwargs)
+
+    def get_support_p(self, tolerance: float, **kwargs) -> Tuple[float, float]:
+        """Compute the support of the pulse shape in the principal direction.
+
+        Parameters
+        ----------
+        tolerance : float
+            Value below which the pulse shape is neglected.
+        kwargs
+            Shape parameters, as passed to `get_blob_shape_p`.
+
+        Returns
+        -------
+        Tuple[float, float]
+            Lower and upper bound of the support in units of the blob width.
+        """
+        return self._support_p(tolerance, **kwargs)
+
+    def get_support_s(self, tolerance: float, **kwargs) -> Tuple[float, float]:
+        """Compute the support of the pulse shape in the secondary direction.
+
+        Parameters
+        ----------
+        tolerance : float
+            Value below which the pulse shape is neglected.
+        kwargs
+            Shape parameters, as passed to `get_blob_shape_s`.
+
+        Returns
+        -------
+        Tuple[float, float]
+            Lower and upper bound of the support in units of the blob width.
+        """
+        return self._support_s(tolerance, **kwargs)
+
+    def get_jumps_p(self, **kwargs) -> Tuple[float, ...]:
+        """Compute the jumps of the pulse shape in the principal direction.
+
+        Parameters
+        ----------
+        kwargs
+            Scalar shape parameters, as passed to `get_blob_shape_p`.
+
+        Returns
+        -------
+        Tuple[float, ...]
+            Positions of the jumps in units of the blob width.
+        """
+        return self._jumps_p(**kwargs)
+
+    def get_jumps_s(self, **kwargs) -> Tuple[float, ...]:
+        """Compute the jumps of the pulse shape in the secondary direction.
+
+        Parameters
+        ----------
+        kwargs
+            Scalar shape parameters, as passed to `get_blob_shape_s`.
+
+        Returns
+        -------
+        Tuple[float, ...]
+            Positions of the jumps in units of the blob width.
+        """
+        return self._jumps_s(**kwargs)
 
     __GENERATORS = {
         BlobShapeEnum.exp: _get_exponential_shape,
@@ -272,3 +643,23 @@ class BlobShapeImpl(AbstractBlobShape):
         BlobShapeEnum.dipole: _get_dipole_shape,
         BlobShapeEnum.rect: _get_rectangle_shape,
     }
+
+    __SUPPORTS = {
+        BlobShapeEnum.exp: _get_exponential_support,
+        BlobShapeEnum.lorentz: _get_lorentz_support,
+        BlobShapeEnum.double_exp: _get_double_exponential_support,
+        BlobShapeEnum.gaussian: _get_gaussian_support,
+        BlobShapeEnum.secant: _get_secant_support,
+        BlobShapeEnum.dipole: _get_dipole_support,
+        BlobShapeEnum.rect: _get_rectangle_support,
+    }
+
+    __JUMPS = {
+        BlobShapeEnum.exp: _get_exponential_jumps,
+        BlobShapeEnum.lorentz: _get_no_jumps,
+        BlobShapeEnum.double_exp: _get_double_exponential_jumps,
+        BlobShapeEnum.gaussian: _get_no_jumps,
+        BlobShapeEnum.secant: _get_no_jumps,
+        BlobShapeEnum.dipole: _get_no_jumps,
+        BlobShapeEnum.rect: _get_rectangle_jumps,
+    }
@@ -1,10 +1,12 @@
 """This module defines a Blob class and related functions for discretizing and manipulating blobs."""
 
-from typing import Union, Any, Optional
-from nptyping import NDArray
+from typing import Dict, List, Sequence, Tuple, Union, Any, Optional
+from numpy.typing import NDArray
 import numpy as np
-from .blob_shape import AbstractBlobShape, BlobShapeImpl
+from .blob_shape import AbstractBlobShape, BlobShapeImpl, _float_dtype
 import cmath
+import copy
+import math
 
 
 class Blob:
@@ -159,6 +161,55 @@ class Blob:
         ``theta`` argument or, when that is None, from ``blob_alignment``."""
         return self._theta
 
+    @property
+    def is_separable(self) -> bool:
+        """bool: True if the blob is untilted (``theta == 0``). Its shape
+        then factorizes into a function of (x, t) times a function of (y, t),
+        which the discretization exploits to evaluate the blob as an outer
+        product instead of on the full (Ny, Nx, Nt) grid. With ``v_y == 0``
+        the second factor does not depend on time either (read-only)."""
+        return self._theta == 0
+
+    def get_support(
+        self, truncation_error: float
+    ) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        """
+        Compute the extent of the region around the blob centre in which the
+        blob (without amplitude and draining) exceeds ``truncation_error``.
+
+        The supports of the pulse shapes along the principal and secondary
+        directions, as reported by the blob shape, span a rectangle in the
+        blob frame, which is rotated by the tilt angle and projected onto the
+        x- and y-axes.
+
+        Parameters
+        ----------
+        truncation_error : float
+            Value below which the pulse shapes are neglected.
+
+        Returns
+        -------
+        Tuple[Tuple[float, float], Tuple[float, float]]
+            Lower and upper offset from the blob centre along x and along y.
+        """
+        support_p = np.array(
+            self.blob_shape.get_support_p(truncation_error, **self.shape_parameters_p)
+        )
+        support_s = np.array(
+            self.blob_shape.get_support_s(truncation_error, **self.shape_parameters_s)
+        )
+        extent_p, extent_s = support_p * self.width_p, support_s * self.width_s
+        if self.is_separable:
+            return tuple(extent_p), tuple(extent_s)
+
+        def project(extent: NDArray, factor: float) -> NDArray:
+            return np.sort(extent * factor)
+
+        cos, sin = np.cos(self._theta), np.sin(self._theta)
+        support_x = project(extent_p, cos) + project(extent_s, -sin)
+        support_y = project(extent_p, sin) + project(extent_s, cos)
+        return tuple(support_x), tuple(support_y)
+
     def discretize_blob(
         self,
         x: NDArray,
@@ -201,7 +252,7 @@ class Blob:
         Notes
         -----
         The periodicity in the y direction is implemented by first substracting the number of full domain Ly
-        propagations made by the blob and by summing mirror blobs at vertical positions +-Ly.
+        propagations made by the blob at each time and by summing mirror blobs at vertical positions +-Ly.
 
         Returns
         -------
@@ -223,10 +274,10 @@ class Blob:
                 x, y, t, Ly, periodic_y, one_dimensional=one_dimensional
             )
 
-        time = t if np.ndim(t) == 0 else t[0][0]
-        vertical_prop = self.v_y * (time - self.t_init) + self.pos_y0
-        # Wrap the blob position into the domain [y0, y0 + Ly).
-        number_of_y_propagations = (vertical_prop - y0) // Ly
+        # Wrap the blob position into the domain [y0, y0 + Ly) at every
+        # time, so that blobs crossing the domain several times during t
+        # stay in it.
+        number_of_y_propagations = (self._blob_trajectory_y(t) - y0) // Ly
 
         # Sum of a centered blob is two "ghost blobs" at vertical positions +-Ly.
         return (
@@ -295,18 +346,28 @@ class Blob:
             Discretized blob.
 
         """
-        # Blob position
-        pos_x = self._blob_trajectory_x(t)
-        pos_y = self._blob_trajectory_y(t)
+        # Blob position, kept in the floating point dtype of the grid.
+        dtype = _float_dtype(x, y, t)
+        pos_x = np.asarray(self._blob_trajectory_x(t), dtype=dtype)
+        pos_y = np.asarray(self._blob_trajectory_y(t), dtype=dtype)
         if periodic_y:
-            pos_y -= number_of_y_propagations * Ly
+            pos_y = pos_y - np.asarray(number_of_y_propagations * Ly, dtype=dtype)
 
         # Blob frame coordinates
-        xb = np.cos(self._theta) * (x - pos_x) + np.sin(self._theta) * (y - pos_y)
-        yb = -np.sin(self._theta) * (x - pos_x) + np.cos(self._theta) * (y - pos_y)
+        if self.is_separable:
+            # Separable fast path: without tilt xb only depends on (x, t) and
+            # yb on (y, t), or on y alone if v_y == 0. Evaluating the shapes
+            # on the unbroadcast arrays replaces most of the full-grid exp
+            # calls by an outer product.
+            xb = x - pos_x
+            yb = y - pos_y
+        else:
+            cos, sin = dtype.type(np.cos(self._theta)), dtype.type(np.sin(self._theta))
+            xb = cos * (x - pos_x) + sin * (y - pos_y)
+            yb = -sin * (x - pos_x) + cos * (y - pos_y)
 
-        theta_x = xb / self.width_p
-        theta_y = yb / self.width_s
+        theta_x = xb / dtype.type(self.width_p)
+        theta_y = yb / dtype.type(self.width_s)
         primary_axis_shape = self.blob_shape.get_blob_shape_p(
             theta_x, **self.shape_parameters_p
         )
@@ -318,7 +379,10 @@ class Blob:
         )
 
         return (
-            self.amplitude * self._drain(t) * primary_axis_shape * secondary_axis_shape
+            dtype.type(self.amplitude)
+            * self._drain(t).astype(dtype, copy=False)
+            * primary_axis_shape
+            * secondary_axis_shape
         )
 
     def _drain(self, t: Union[int, NDArray]) -> NDArray:
@@ -336,9 +400,12 @@ class Blob:
             Drain factor.
 
         """
+        dtype = _float_dtype(t)
+        elapsed = np.asarray(t - self.t_init, dtype=dtype)
         if isinstance(self.t_drain, np.ndarray):
-            return np.exp(-(t - self.t_init) / self.t_drain[np.newaxis, :, np.newaxis])
-        return np.exp(-(t - self.t_init) / self.t_drain)
+            t_drain = self.t_drain.astype(dtype, copy=False)
+            return np.exp(-elapsed / t_drain[np.newaxis, :, np.newaxis])
+        return np.exp(-elapsed / dtype.type(self.t_drain))
 
     def _blob_trajectory_x(self, t: Union[int, NDArray]) -> Any:
         """
@@ -348,6 +415,760 @@ class Blob:
 
     def _blob_trajectory_y(self, t: Union[int, NDArray]) -> Any:
         """
-        Position of the blob in the y-direction at a given time t.
+        Position of the blob in the y-direction at a given time t. For
+        ``v_y == 0`` this is the scalar ``pos_y0``, whatever the shape of t.
         """
+        if self.v_y == 0:
+            return self.pos_y0
         return self.pos_y0 + self.v_y * (t - self.t_init)
+
+
+class BlobBatch:
+    """
+    Columnar (struct-of-arrays) representation of a population of blobs.
+
+    Every blob parameter of `Blob` is stored as a NumPy column with one entry
+    per blob, so that populations of millions of blobs can be sampled,
+    validated, sorted and windowed with vectorized operations. `Blob` objects
+    are only materialized on demand, see `to_blob` and `to_blobs`.
+
+    Attributes
+    ----------
+    amplitude, width_p, width_s, v_x, v_y, pos_x0, pos_y0, t_init, theta : np.ndarray
+        Blob parameters, shape (num_blobs,). `theta` holds the resolved tilt
+        angles, see `Blob.theta`.
+    t_drain : np.ndarray
+        Drain times, either shape (num_blobs,) or, for drain times varying
+        along x, shape (num_blobs, Nx).
+    blob_id : np.ndarray
+        Blob identifiers, shape (num_blobs,).
+    blob_shapes : List[AbstractBlobShape]
+        Distinct blob shapes of the population; equal shapes (see
+        `BlobShapeImpl`) are stored once.
+    shape_index : np.ndarray
+        Index of each blob's shape into `blob_shapes`, shape (num_blobs,).
+    shape_parameters_p, shape_parameters_s : Dict[str, np.ndarray]
+        Numeric shape parameters, one column per name. NaN marks a parameter
+        a blob does not have.
+    """
+
+    _COLUMNS = (
+        "blob_id",
+        "amplitude",
+        "width_p",
+        "width_s",
+        "v_x",
+        "v_y",
+        "pos_x0",
+        "pos_y0",
+        "t_init",
+        "theta",
+        "shape_index",
+    )
+
+    def __init__(
+        self,
+        amplitude: NDArray,
+        width_p: Union[float, NDArray] = 1.0,
+        width_s: Union[float, NDArray] = 1.0,
+        v_x: Union[float, NDArray] = 1.0,
+        v_y: Union[float, NDArray] = 0.0,
+        pos_x0: Union[float, NDArray] = 0.0,
+        pos_y0: Union[float, NDArray] = 0.0,
+        t_init: Union[float, NDArray] = 0.0,
+        t_drain: Union[float, NDArray] = np.inf,
+        blob_shape: Union[AbstractBlobShape, Sequence[AbstractBlobShape], None] = None,
+        shape_parameters_p: Union[Dict[str, Any], None] = None,
+        shape_parameters_s: Union[Dict[str, Any], None] = None,
+        blob_alignment: bool = False,
+        theta: Union[float, NDArray, None] = None,
+        blob_id: Union[int, NDArray, None] = None,
+    ) -> None:
+        """
+        Initialize a population of blobs from parameter columns.
+
+        Parameters
+        ----------
+        amplitude : NDArray
+            Blob amplitudes, shape (num_blobs,). Defines the number of blobs.
+        width_p, width_s, v_x, v_y, pos_x0, pos_y0, t_init : float or NDArray, optional
+            Blob parameters as in `Blob`, either one value per blob or a
+            scalar shared by all blobs.
+        t_drain : float or NDArray, optional
+            Drain time as in `Blob`: a scalar shared by all blobs, one value
+            per blob, shape (num_blobs,), or drain times varying along x,
+            either one profile per blob, shape (num_blobs, Nx), or a single
+            profile shared by all blobs, shape (1, Nx). Default ``np.inf``.
+        blob_shape : AbstractBlobShape or Sequence[AbstractBlobShape], optional
+            Shape shared by all blobs or a list of one shape per blob. Default None,
+            i.e. ``BlobShapeImpl()``.
+        shape_parameters_p, shape_parameters_s : dict, optional
+            Numeric shape parameters, each a scalar or one value per blob.
+        blob_alignment : bool, optional
+            As in `Blob`, only used where ``theta`` is None. Default False.
+        theta : float or NDArray, optional
+            Tilt angles as in `Blob`. Default None, i.e. resolved from
+            ``blob_alignment``.
+        blob_id : int or NDArray, optional
+            Blob identifiers, by default the position of each blob.
+
+        Raises
+        ------
+        TypeError
+            If a blob shape is not an ``AbstractBlobShape`` instance.
+        ValueError
+            If the columns do not have one entry per blob, if a width is not
+            positive, or if a drain time is not positive.
+        """
+        amplitude = np.asarray(amplitude, dtype=np.float64)
+        if amplitude.ndim != 1:
+            raise ValueError(
+                f"amplitude must be one-dimensional, got shape {amplitude.shape}."
+            )
+        num_blobs = amplitude.size
+
+        def column(values: Any, name: str, dtype: type = np.float64) -> np.ndarray:
+            values = np.asarray(values, dtype=dtype)
+            if values.ndim == 0:
+                return np.full(num_blobs, values, dtype=dtype)
+            if values.shape != (num_blobs,):
+                raise ValueError(
+                    f"{name} must be a scalar or of shape ({num_blobs},), "
+                    f"got shape {values.shape}."
+                )
+            return values
+
+        self.amplitude = amplitude
+        self.width_p = column(width_p, "width_p")
+        self.width_s = column(width_s, "width_s")
+        self.v_x = column(v_x, "v_x")
+        self.v_y = column(v_y, "v_y")
+        self.pos_x0 = column(pos_x0, "pos_x0")
+        self.pos_y0 = column(pos_y0, "pos_y0")
+        self.t_init = column(t_init, "t_init")
+        self.blob_id = column(
+            np.arange(num_blobs) if blob_id is None else blob_id, "blob_id", np.int64
+        )
+        self.blob_alignment = blob_alignment
+        if theta is not None:
+            self.theta = column(theta, "theta")
+        elif blob_alignment:
+            self.theta = np.angle(self.v_x + self.v_y * 1j)
+        else:
+            self.theta = np.zeros(num_blobs)
+
+        if np.any(self.width_p <= 0) or np.any(self.width_s <= 0):
+            raise ValueError(
+                "Blob widths must be positive, got width_p down to "
+                f"{self.width_p.min()} and width_s down to {self.width_s.min()}."
+            )
+        if np.any(np.asarray(t_drain) <= 0):
+            raise ValueError(f"t_drain must be positive, got t_drain = {t_drain}.")
+        t_drain = np.asarray(t_drain, dtype=np.float64)
+        if t_drain.ndim == 2 and t_drain.shape[0] == 1:
+            # A profile along x shared by all blobs, kept as a view.
+            self.t_drain = np.broadcast_to(t_drain, (num_blobs, t_drain.shape[1]))
+        elif t_drain.ndim == 2:
+            if t_drain.shape[0] != num_blobs:
+                raise ValueError(
+                    f"t_drain must have one row per blob, got shape {t_drain.shape}."
+                )
+            self.t_drain = t_drain
+        else:
+            self.t_drain = column(t_drain, "t_drain")
+
+        if blob_shape is None:
+            blob_shape = BlobShapeImpl()
+        if isinstance(blob_shape, AbstractBlobShape):
+            self.blob_shapes = [blob_shape]
+            self.shape_index = np.zeros(num_blobs, dtype=np.int64)
+        elif not isinstance(blob_shape, (list, tuple)):
+            raise TypeError(
+                f"blob_shape must be an AbstractBlobShape, got {type(blob_shape).__name__}."
+            )
+        else:
+            # Equal shapes are stored once, e.g. the distinct but equal
+            # BlobShapeImpl instances of blobs created one by one.
+            shape_positions: Dict[AbstractBlobShape, int] = {}
+            self.blob_shapes = []
+            shape_index = []
+            for shape in blob_shape:
+                if not isinstance(shape, AbstractBlobShape):
+                    raise TypeError(
+                        f"blob_shape must be an AbstractBlobShape, got {type(shape).__name__}."
+                    )
+                if shape not in shape_positions:
+                    shape_positions[shape] = len(self.blob_shapes)
+                    self.blob_shapes.append(shape)
+                shape_index.append(shape_positions[shape])
+            self.shape_index = column(shape_index, "blob_shape", np.int64)
+
+        self.shape_parameters_p = {
+            name: column(values, name)
+            for name, values in (shape_parameters_p or {}).items()
+        }
+        self.shape_parameters_s = {
+            name: column(values, name)
+            for name, values in (shape_parameters_s or {}).items()
+        }
+
+    @classmethod
+    def from_blobs(cls, blobs: Sequence[Blob]) -> "BlobBatch":
+        """
+        Collect the parameters of a list of blobs into columns.
+
+        Parameters
+        ----------
+        blobs : Sequence[Blob]
+            Blobs to collect. Their shape parameters must be numeric; a
+            parameter missing for some of the blobs is stored as NaN.
+
+        Returns
+        -------
+        BlobBatch
+            Population of the blobs, in the same order.
+
+        Raises
+        ------
+        ValueError
+            If the blobs have array-valued drain times of different lengths.
+        """
+
+        def values(attribute: str) -> list:
+            return [getattr(blob, attribute) for blob in blobs]
+
+        def floats(attribute: str) -> np.ndarray:
+            return np.array(values(attribute), dtype=np.float64).reshape(len(blobs))
+
+        def parameters(attribute: str) -> Dict[str, np.ndarray]:
+            names = sorted(
+                {name for blob in blobs for name in getattr(blob, attribute)}
+            )
+            return {
+                name: np.array(
+                    [getattr(blob, attribute).get(name, np.nan) for blob in blobs],
+                    dtype=np.float64,
+                )
+                for name in names
+            }
+
+        t_drains = values("t_drain")
+        lengths = {np.size(t_drain) for t_drain in t_drains if np.ndim(t_drain) > 0}
+        if len(lengths) > 1:
+            raise ValueError(
+                "Array-valued t_drain must have the same length for all blobs, "
+                f"got lengths {sorted(lengths)}."
+            )
+        if lengths:
+            (length,) = lengths
+            t_drain = np.stack(
+                [np.broadcast_to(t_drain, (length,)) for t_drain in t_drains]
+            )
+        else:
+            t_drain = np.array(t_drains, dtype=np.float64).reshape(len(blobs))
+
+        return cls(
+            amplitude=floats("amplitude"),
+            width_p=floats("width_p"),
+            width_s=floats("width_s"),
+            v_x=floats("v_x"),
+            v_y=floats("v_y"),
+            pos_x0=floats("pos_x0"),
+            pos_y0=floats("pos_y0"),
+            t_init=floats("t_init"),
+            t_drain=t_drain,
+            blob_shape=values("blob_shape"),
+            shape_parameters_p=parameters("shape_parameters_p"),
+            shape_parameters_s=parameters("shape_parameters_s"),
+            theta=floats("theta"),
+            blob_id=np.array(values("blob_id"), dtype=np.int64).reshape(len(blobs)),
+        )
+
+    def __len__(self) -> int:
+        """Number of blobs."""
+        return self.amplitude.size
+
+    @property
+    def is_separable(self) -> np.ndarray:
+        """np.ndarray: Per blob, True if it is untilted, see `Blob.is_separable` (read-only)."""
+        return self.theta == 0
+
+    def take(self, indices: Union[Sequence[int], np.ndarray]) -> "BlobBatch":
+        """
+        Select a subset of the blobs.
+
+        Parameters
+        ----------
+        indices : Sequence[int] or np.ndarray
+            Positions (or a boolean mask) of the blobs to select, in the
+            order they are to appear in the result.
+
+        Returns
+        -------
+        BlobBatch
+            Population of the selected blobs.
+        """
+        indices = np.asarray(indices)
+        if indices.dtype != bool:
+            indices = indices.astype(np.intp, copy=False)
+        batch = copy.copy(self)
+        for name in self._COLUMNS:
+            setattr(batch, name, getattr(self, name)[indices])
+        if self.t_drain.ndim == 2 and self.t_drain.strides[0] == 0:
+            # Keep a shared drain profile a view instead of copying it per blob.
+            batch.t_drain = np.broadcast_to(
+                self.t_drain[0], (batch.amplitude.size, self.t_drain.shape[1])
+            )
+        else:
+            batch.t_drain = self.t_drain[indices]
+        batch.shape_parameters_p = {
+            name: values[indices] for name, values in self.shape_parameters_p.items()
+        }
+        batch.shape_parameters_s = {
+            name: values[indices] for name, values in self.shape_parameters_s.items()
+        }
+        return batch
+
+    def get_shape_parameters(self, index: int) -> Tuple[dict, dict]:
+        """
+        Shape parameters of a single blob, without those it does not have.
+
+        Parameters
+        ----------
+        index : int
+            Position of the blob.
+
+        Returns
+        -------
+        Tuple[dict, dict]
+            Shape parameters in the principal and the secondary direction.
+        """
+        parameters_p, parameters_s = (
+            {
+                name: values[index]
+                for name, values in parameters.items()
+                if not np.isnan(values[index])
+            }
+            for parameters in (self.shape_parameters_p, self.shape_parameters_s)
+        )
+        return parameters_p, parameters_s
+
+    def get_group_shape_parameters(self) -> Tuple[dict, dict]:
+        """
+        Shape parameters of a batch of blobs with equal `shape_keys`, in the
+        form its blob shape takes them.
+
+        Blob shapes supporting parameter arrays (see
+        `AbstractBlobShape.supports_parameter_arrays`) get one value per
+        blob, shape (num_blobs,); other shapes get the scalar parameters of
+        the first blob, which all blobs of the batch share.
+
+        Returns
+        -------
+        Tuple[dict, dict]
+            Shape parameters in the principal and the secondary direction.
+        """
+        if not self.blob_shapes[self.shape_index[0]].supports_parameter_arrays:
+            return self.get_shape_parameters(0)
+        parameters_p, parameters_s = (
+            {
+                name: values
+                for name, values in parameters.items()
+                if not np.isnan(values[0])
+            }
+            for parameters in (self.shape_parameters_p, self.shape_parameters_s)
+        )
+        return parameters_p, parameters_s
+
+    def shape_keys(self) -> np.ndarray:
+        """
+        Keys grouping the blobs whose pulse shapes can be evaluated in one
+        call, see `get_group_shape_parameters`.
+
+        Blobs are grouped by blob shape and by which shape parameters they
+        have. The values of the shape parameters only split the groups for
+        blob shapes that take scalar parameters.
+
+        Returns
+        -------
+        np.ndarray
+            One row per blob, equal for blobs of the same group.
+        """
+        parameters = np.column_stack(
+            [np.zeros(len(self))]
+            + list(self.shape_parameters_p.values())
+            + list(self.shape_parameters_s.values())
+        )
+        scalar_parameters = ~np.array(
+            [shape.supports_parameter_arrays for shape in self.blob_shapes],
+            dtype=bool,
+        )[self.shape_index]
+        return np.column_stack(
+            [
+                self.shape_index,
+                # NaN marks a missing parameter, which np.unique would not
+                # group.
+                np.where(
+                    scalar_parameters[:, np.newaxis], np.nan_to_num(parameters), 0
+                ),
+                np.isnan(parameters),
+            ]
+        )
+
+    def to_blob(self, index: int) -> Blob:
+        """
+        Materialize a single blob.
+
+        Parameters
+        ----------
+        index : int
+            Position of the blob.
+
+        Returns
+        -------
+        Blob
+            The blob at position `index`.
+        """
+        shape_parameters_p, shape_parameters_s = self.get_shape_parameters(index)
+        return Blob(
+            blob_id=int(self.blob_id[index]),
+            blob_shape=self.blob_shapes[self.shape_index[index]],
+            amplitude=self.amplitude[index],
+            width_p=self.width_p[index],
+            width_s=self.width_s[index],
+            v_x=self.v_x[index],
+            v_y=self.v_y[index],
+            pos_x0=self.pos_x0[index],
+            pos_y0=self.pos_y0[index],
+            t_init=self.t_init[index],
+            t_drain=self.t_drain[index],
+            shape_parameters_p=shape_parameters_p,
+            shape_parameters_s=shape_parameters_s,
+            blob_alignment=self.blob_alignment,
+            theta=self.theta[index],
+        )
+
+    def to_blobs(self) -> List[Blob]:
+        """
+        Materialize all blobs.
+
+        Returns
+        -------
+        List[Blob]
+            One `Blob` per row, in order.
+        """
+        return [self.to_blob(index) for index in range(len(self))]
+
+    def get_support(
+        self, truncation_error: Union[float, NDArray]
+    ) -> Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+        """
+        Vectorized `Blob.get_support`: the extent of the region around each
+        blob centre in which the blob exceeds ``truncation_error``.
+
+        The supports of the pulse shapes are evaluated once per group of
+        `shape_keys`, with per-blob parameter arrays for the blob shapes
+        supporting them. Per-blob values of ``truncation_error`` are rounded
+        down to powers of two, which further split the groups.
+
+        Parameters
+        ----------
+        truncation_error : float or NDArray
+            Value below which the pulse shapes are neglected, scalar or of
+            shape (num_blobs,).
+
+        Returns
+        -------
+        Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+            Lower and upper offsets from the blob centres along x and along
+            y, each of shape (num_blobs,).
+        """
+        support_p = np.empty((len(self), 2))
+        support_s = np.empty((len(self), 2))
+        keys = self.shape_keys()
+        if np.ndim(truncation_error) == 0:
+            tolerances = np.full(len(self), float(truncation_error))
+        else:
+            # Vanishing and infinite tolerances are bounded by 2**-1000 and
+            # 2**1000, which are negligible and vast on any blob scale.
+            with np.errstate(divide="ignore", invalid="ignore"):
+                levels = np.floor(np.log2(np.asarray(truncation_error, dtype=float)))
+            levels = np.clip(np.nan_to_num(levels, nan=-1000.0), -1000.0, 1000.0)
+            keys = np.column_stack([keys, levels])
+            tolerances = np.exp2(levels)
+        # Group equal keys by sorting them; lexsort is stable, so the members
+        # of a group stay in order.
+        order = np.lexsort(keys.T[::-1])
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero((sorted_keys[1:] != sorted_keys[:-1]).any(axis=1))
+        for members in np.split(order, boundaries + 1):
+            group = self.take(members)
+            shape = group.blob_shapes[group.shape_index[0]]
+            shape_parameters_p, shape_parameters_s = group.get_group_shape_parameters()
+            tolerance = tolerances[members[0]]
+            # Scalar or per-blob offsets, broadcast into the members' rows.
+            support_p[members, 0], support_p[members, 1] = shape.get_support_p(
+                tolerance, **shape_parameters_p
+            )
+            support_s[members, 0], support_s[members, 1] = shape.get_support_s(
+                tolerance, **shape_parameters_s
+            )
+        extent_p = support_p * self.width_p[:, np.newaxis]
+        extent_s = support_s * self.width_s[:, np.newaxis]
+
+        def project(extent: np.ndarray, factor: np.ndarray) -> np.ndarray:
+            return np.sort(extent * factor[:, np.newaxis], axis=1)
+
+        cos, sin = np.cos(self.theta), np.sin(self.theta)
+        with np.errstate(invalid="ignore"):
+            support_x = project(extent_p, cos) + project(extent_s, -sin)
+            support_y = project(extent_p, sin) + project(extent_s, cos)
+        separable = self.is_separable[:, np.newaxis]
+        support_x = np.where(separable, extent_p, support_x)
+        support_y = np.where(separable, extent_s, support_y)
+        return (support_x[:, 0], support_x[:, 1]), (support_y[:, 0], support_y[:, 1])
+
+
+class ScratchArena:
+    """
+    Reusable scratch buffers for `discretize_blobs`.
+
+    Each named buffer is a flat array that is only reallocated when a larger
+    one is requested, and is handed out as a reshaped view of its leading
+    part otherwise. Discretizing many batches of blobs therefore reuses the
+    same few buffers instead of allocating new full-size temporaries per
+    batch. A view handed out under a name is overwritten by the next request
+    for that name, and an arena must not be shared between threads.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty arena."""
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype: Any) -> np.ndarray:
+        """
+        Scratch buffer of the given shape and dtype, with undefined content.
+
+        Parameters
+        ----------
+        name : str
+            Name of the buffer.
+        shape : Tuple[int, ...]
+            Shape of the returned view.
+        dtype : Any
+            Data type of the buffer.
+
+        Returns
+        -------
+        np.ndarray
+            View of the named buffer.
+        """
+        dtype = np.dtype(dtype)
+        size = math.prod(shape)
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.dtype != dtype or buffer.size < size:
+            buffer = np.empty(size, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer[:size].reshape(shape)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the buffers in bytes."""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
+
+
+def discretize_blobs(
+    blobs: Union[List[Blob], BlobBatch],
+    x: NDArray,
+    y: NDArray,
+    t: NDArray,
+    Ly: float,
+    periodic_y: bool = False,
+    one_dimensional: bool = False,
+    y0: float = 0,
+    out: Optional[NDArray] = None,
+    scratch: Optional[ScratchArena] = None,
+) -> NDArray:
+    """
+    Discretize a batch of blobs on a grid in one stacked computation.
+
+    Vectorized counterpart of `Blob.discretize_blob`: the blob parameters
+    are stacked along a leading batch axis, so the whole batch is evaluated
+    with a handful of large NumPy calls instead of one round of small calls
+    per blob. All blobs must share the same `blob_shape` and have equal
+    `BlobBatch.shape_keys`: blob shapes supporting parameter arrays are
+    evaluated with per-blob shape parameters, other shapes require the same
+    ``shape_parameters_p`` and ``shape_parameters_s`` for all blobs. A list
+    of blobs must either all have a scalar or all an array-valued
+    ``t_drain``.
+
+    Besides the result, the computation holds at most two arrays of the size
+    of the result (three for ``periodic_y``), taken from ``scratch``, when
+    the blob shape writes into preallocated buffers (see
+    `AbstractBlobShape.supports_out`).
+
+    Parameters
+    ----------
+    blobs : List[Blob] or BlobBatch
+        Blobs to discretize.
+    x : NDArray
+        1D array of grid coordinates in the x-direction, shape (Nx,).
+    y : NDArray
+        Grid coordinates in the y-direction: either a 1D array of shape
+        (Ny,) shared by all blobs, or the coordinates of each blob's own y
+        window, shape (batch, y window).
+    t : NDArray
+        Time coordinates of each blob's time window, shape (batch, window).
+        Every blob is evaluated on its own row.
+    Ly : float
+        Length of domain in the y-direction.
+    periodic_y : bool, optional
+        Flag indicating periodicity in the y-direction (default: False).
+    one_dimensional : bool, optional
+        Flag indicating one-dimensional blobs (default: False).
+    y0 : float, optional
+        Origin of the domain in the y-direction (default: 0), as in
+        `Blob.discretize_blob`.
+    out : NDArray, optional
+        Buffer of the shape of the result to write it into, by default a new
+        array.
+    scratch : ScratchArena, optional
+        Arena providing the intermediate arrays, by default a new one. Pass
+        the same arena to consecutive calls to reuse its buffers.
+
+    Returns
+    -------
+    discretized_blobs : NDArray
+        Discretized blobs on a 4D array with dimensions (blob, y, x, t),
+        i.e. shape (batch, Ny, Nx, window) (with Ny replaced by the y window
+        length for a 2D ``y``). Entry ``k`` equals
+        ``blobs[k].discretize_blob`` evaluated on ``t[k]``.
+
+    Raises
+    ------
+    ValueError
+        If ``one_dimensional`` is True and ``Ly`` is not 0.
+    """
+    if one_dimensional and Ly != 0:
+        raise ValueError(f"One dimensional blobs require Ly == 0, got Ly = {Ly}.")
+
+    # Floating point dtype of the grid, which the computation is kept in.
+    dtype = _float_dtype(x, y, t)
+
+    if not isinstance(blobs, BlobBatch):
+        blobs = BlobBatch.from_blobs(blobs)
+
+    def column(attribute: str) -> NDArray:
+        # Per-blob scalar parameter, shaped to broadcast against the
+        # (batch, Ny, Nx, window) grid.
+        values = getattr(blobs, attribute).astype(dtype, copy=False)
+        return values[:, np.newaxis, np.newaxis, np.newaxis]
+
+    blob_shape = blobs.blob_shapes[blobs.shape_index[0]]
+    shape_parameters_p, shape_parameters_s = (
+        {
+            name: (
+                values.astype(dtype)[:, np.newaxis, np.newaxis, np.newaxis]
+                if np.ndim(values) > 0
+                else values
+            )
+            for name, values in parameters.items()
+        }
+        for parameters in blobs.get_group_shape_parameters()
+    )
+    amplitude, theta = column("amplitude"), column("theta")
+    width_p, width_s = column("width_p"), column("width_s")
+
+    x = x[np.newaxis, np.newaxis, :, np.newaxis]
+    y = (
+        y[..., :, np.newaxis, np.newaxis]
+        if np.ndim(y) == 2
+        else y[np.newaxis, :, np.newaxis, np.newaxis]
+    )
+    t = t[:, np.newaxis, np.newaxis, :]
+    shape = np.broadcast_shapes(x.shape, y.shape, t.shape)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    if scratch is None:
+        scratch = ScratchArena()
+
+    # Everything up to the pulse shapes is computed on arrays without the
+    # y or without the x axis, which are small compared to the result.
+    elapsed = t - column("t_init")
+    v_y = column("v_y")
+    pos_x = column("pos_x0") + column("v_x") * elapsed
+    # As in Blob._blob_trajectory_y, blobs at rest vertically keep a
+    # time-independent position, which keeps their y factor free of t.
+    pos_y = column("pos_y0") + (v_y * elapsed if np.any(v_y != 0) else 0)
+    if periodic_y and not one_dimensional:
+        # Wrap the blob positions into the domain [y0, y0 + Ly).
+        pos_y = pos_y - ((pos_y - y0) // Ly) * Ly
+    x_offset = x - pos_x
+
+    if blobs.t_drain.ndim == 2:
+        t_drain = blobs.t_drain.astype(dtype)
+        drain = np.exp(-elapsed / t_drain[:, np.newaxis, :, np.newaxis])
+    else:
+        drain = np.exp(-elapsed / column("t_drain"))
+    amplitude_drain = amplitude * drain
+
+    separable = not np.any(theta)
+    cos, sin = np.cos(theta), np.sin(theta)
+
+    def pulse_shape(get_blob_shape, theta_buffer, shape_parameters):
+        # The pulse shape overwrites its argument where the shape allows it.
+        if blob_shape.supports_out:
+            return get_blob_shape(theta_buffer, out=theta_buffer, **shape_parameters)
+        return get_blob_shape(theta_buffer, **shape_parameters)
+
+    def single_blob(y_shifted: NDArray, result: NDArray) -> NDArray:
+        y_offset = y_shifted - pos_y
+        if separable:
+            # Separable fast path, see Blob._single_blob.
+            theta_p = np.divide(
+                x_offset,
+                width_p,
+                out=scratch.get("theta_p", x_offset.shape, dtype),
+            )
+        else:
+            theta_p = np.multiply(
+                cos, x_offset, out=scratch.get("theta_p", shape, dtype)
+            )
+            theta_p += sin * y_offset
+            theta_p /= width_p
+        primary_axis_shape = pulse_shape(
+            blob_shape.get_blob_shape_p, theta_p, shape_parameters_p
+        )
+        if one_dimensional:
+            return np.multiply(amplitude_drain, primary_axis_shape, out=result)
+        # Without the y axis in the separable case, so that only the product
+        # with the secondary shape is of the size of the result.
+        primary_axis_shape = np.multiply(
+            amplitude_drain, primary_axis_shape, out=theta_p
+        )
+        if separable:
+            theta_s = np.divide(
+                y_offset,
+                width_s,
+                out=scratch.get("theta_s", y_offset.shape, dtype),
+            )
+        else:
+            theta_s = np.multiply(
+                -sin, x_offset, out=scratch.get("theta_s", shape, dtype)
+            )
+            theta_s += cos * y_offset
+            theta_s /= width_s
+        return np.multiply(
+            primary_axis_shape,
+            pulse_shape(blob_shape.get_blob_shape_s, theta_s, shape_parameters_s),
+            out=result,
+        )
+
+    single_blob(y, out)
+    if periodic_y and not one_dimensional:
+        # Sum of a centered blob and two "ghost blobs" at vertical positions
+        # +-Ly.
+        ghost = scratch.get("ghost", shape, dtype)
+        out += single_blob(y + Ly, ghost)
+        out += single_blob(y - Ly, ghost)
+    return out
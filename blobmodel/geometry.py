@@ -1,7 +1,6 @@
 """This module defines the Geometry class for creating a grid for the Model."""
 
-from typing import Any, Literal
-from nptyping import NDArray
+from numpy.typing import NDArray
 import numpy as np
 
 
@@ -85,16 +84,16 @@ class Geometry:
         self.y0 = y0
 
         # calculate x, y and t coordinates
-        self.x: NDArray[Literal[64], Any] = np.linspace(
+        self.x: NDArray[np.float64] = np.linspace(
             self.x0, self.x0 + self.Lx, num=self.Nx, endpoint=False
         )
         if self.Ly == 0:
-            self.y: NDArray[Literal[64], Any] = np.array([self.y0], dtype="float64")
+            self.y: NDArray[np.float64] = np.array([self.y0], dtype="float64")
         else:
             self.y = np.linspace(
                 self.y0, self.y0 + self.Ly, num=self.Ny, endpoint=False
             )
-        self.t: NDArray[Literal[64], Any] = np.arange(t_init, self.T, self.dt)
+        self.t: NDArray[np.float64] = np.arange(t_init, self.T, self.dt)
 
     @classmethod
     def from_arrays(
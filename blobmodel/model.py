@@ -1,15 +1,101 @@
 """This module defines a 2D model of propagating blobs."""
 
+import cProfile
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import xarray as xr
-from tqdm import tqdm
-from typing import List, Union
-from .blobs import Blob
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Union,
+)
+from .blobs import Blob, BlobBatch, ScratchArena, discretize_blobs
+from .profiling import PhaseTimer, WorkCounters
+from .progress import ProgressReporter, SilentReporter, TqdmReporter
+from .shot_noise import sum_up_homogeneous_blobs
+from .statistics import PointStatisticsReducer, Reducer
 from .stochasticality import BlobFactory, BlobListFactory, DefaultBlobFactory
 from .geometry import Geometry
 import warnings
 from .blob_shape import AbstractBlobShape, BlobShapeImpl
 
+if TYPE_CHECKING:
+    import xarray as xr
+
+# Upper bound on the number of grid cells (batch * Ny * Nx * window) evaluated
+# in one stacked call of the batched engine. Large grids fall back to batches
+# of a single blob, small grids stack many blobs per call.
+_MAX_BATCH_CELLS = 2**20
+
+# Number of blob partitions per worker process in parallel realizations.
+_PARTITIONS_PER_WORKER = 4
+
+# Memory of the evaluation of a batch of blobs, in arrays of the size of the
+# batch, for untilted and tilted blobs. Tilted blobs need full-size arguments
+# of both pulse shapes and their temporaries. Measured with tracemalloc for
+# the built-in blob shapes, with some margin.
+_TEMPORARIES_PER_CELL = 3
+_TILTED_TEMPORARIES_PER_CELL = 8
+
+
+class _Segments(NamedTuple):
+    """Pieces of the time windows of blobs that are summed up separately,
+    see `Model._compute_segments`."""
+
+    positions: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+    y_starts: np.ndarray
+    y_stops: np.ndarray
+    wraps: np.ndarray
+
+
+class RealizationPlan(NamedTuple):
+    """
+    Predicted resources of a realization, as returned by `Model.plan`: the
+    number of blobs and of culled blobs (empty window), the number of time
+    steps each blob is evaluated on, the number of grid cells evaluated in
+    total, the size in bytes of the density field, of the labels field (0 if
+    labels are off) and of the temporaries of the blob evaluation, the
+    expected peak memory in bytes, and the number of time steps the fields
+    cover at once (Nt unless the realization is chunked).
+    """
+
+    num_blobs: int
+    culled_blobs: int
+    window_lengths: np.ndarray
+    cells: int
+    density_bytes: int
+    labels_bytes: int
+    temporary_bytes: int
+    peak_bytes: int
+    chunk_size: int
+
+    def seconds(self, cells_per_second: float) -> float:
+        """
+        Estimated run time of the blob summation.
+
+        Parameters
+        ----------
+        cells_per_second : float
+            Throughput of the blob summation on the target machine, e.g.
+            ``last_counters.cells_evaluated`` over the time of the
+            "discretization" and "accumulation" phases in ``last_profile``
+            after a small profiled realization.
+
+        Returns
+        -------
+        float
+            Estimated run time in seconds.
+        """
+        return self.cells / cells_per_second
+
 
 class Model:
     """
@@ -31,6 +117,8 @@ class Model:
         one_dimensional: bool = False,
         verbose: bool = True,
         seed: Union[int, np.random.Generator, None] = None,
+        dtype: Union[str, type, np.dtype] = np.float64,
+        progress: Union[ProgressReporter, None] = None,
     ) -> None:
         """
         Initialize the 2D Model of propagating blobs.
@@ -62,6 +150,7 @@ class Model:
             Used for creating training data for supervised machine learning algorithms
         label_border : float, optional
             Defines region of blob as region where density >= label_border * amplitude of Blob
+            and density >= truncation_error of the realization.
             Only used if labels = "same" or "individual"
         one_dimensional : bool, optional
             If True, the perpendicular shape of the blobs will be discarded
@@ -79,6 +168,20 @@ class Model:
             constructed with; custom factories only honor it if they draw from
             `self.rng`. By default None, i.e. the factory's own generator is
             kept (non-reproducible unless the factory was seeded).
+        dtype : str, type or np.dtype, optional
+            Floating point type the realizations are computed and returned
+            in, ``np.float64`` (the default) or ``np.float32``. Single
+            precision halves the memory and bandwidth needed by the density
+            and labels fields, the blob kernels and the netCDF output, at
+            the cost of a relative accuracy of about 1e-7. The "fft" engine of
+            `make_realization` computes in double precision and rounds the
+            result.
+        progress : ProgressReporter, optional
+            Receives the progress of realizations, e.g. a `LoggingReporter`
+            in batch jobs or a `CallbackReporter`. By default a
+            `TqdmReporter` showing a progress bar if ``verbose`` is True,
+            none otherwise. With several workers the progress of the worker
+            processes is aggregated and reported per finished partition.
 
         Notes
         -----
@@ -94,9 +197,9 @@ class Model:
             AbstractBlobShape instance or blob_factory is not a BlobFactory
             instance.
         ValueError
-            If ``labels`` is not one of the values listed above, or if the
-            model is one-dimensional and the geometry does not have Ny=1 and
-            Ly=0.
+            If ``labels`` is not one of the values listed above, if ``dtype``
+            is neither float32 nor float64, or if the model is
+            one-dimensional and the geometry does not have Ny=1 and Ly=0.
 
         Warns
         -----
@@ -125,6 +228,10 @@ class Model:
             raise ValueError(
                 f'labels must be "off", "same" or "individual", got labels = "{labels}".'
             )
+        if np.dtype(dtype) not in {np.dtype(np.float32), np.dtype(np.float64)}:
+            raise ValueError(
+                f'dtype must be float32 or float64, got dtype = "{np.dtype(dtype)}".'
+            )
         if seed is not None:
             blob_factory.set_rng(np.random.default_rng(seed))
         self._one_dimensional = one_dimensional
@@ -143,12 +250,26 @@ class Model:
         self.blob_shape = blob_shape
         self.num_blobs: int = num_blobs
 
-        self._blobs: List[Blob] = []
-        self._blob_factory = blob_factory
+        # Empty until sampled, see _sample_blobs.
+        self._blobs = BlobBatch.from_blobs([])
+        # None in copies that only sum up blobs, see _worker_copy.
+        self._blob_factory: Union[BlobFactory, None] = blob_factory
         self._labels = labels
         self._label_border = label_border
-        self._reset_fields()
+        self._dtype = np.dtype(dtype)
+        # The fields are allocated by the realizations, which may only cover
+        # a chunk of the time axis at a time.
+        self._density: Union[np.ndarray, None] = None
+        self._labels_field: Union[np.ndarray, None] = None
+        self._time_window = (0, self._geometry.t.size)
+        # Buffers of the batched engine, reused across batches of blobs.
+        self._scratch = ScratchArena()
+        # Record the phases and the work of profiled realizations, see
+        # make_realization.
+        self._timer = PhaseTimer(enabled=False)
+        self._counters = WorkCounters(enabled=False)
         self._verbose = verbose
+        self._progress = progress
 
     def __str__(self) -> str:
         """
@@ -170,6 +291,8 @@ class Model:
         label_border: float = 0.75,
         one_dimensional: bool = False,
         verbose: bool = True,
+        dtype: Union[str, type, np.dtype] = np.float64,
+        progress: Union[ProgressReporter, None] = None,
     ) -> "Model":
         """
         Create a Model that realizes a pre-built list of blobs.
@@ -194,6 +317,10 @@ class Model:
             `Model.__init__`.
         verbose : bool, optional
             If True, print a loading bar.
+        dtype : str, type or np.dtype, optional
+            Floating point type of the realizations, as in `Model.__init__`.
+        progress : ProgressReporter, optional
+            Receives the progress of realizations, as in `Model.__init__`.
 
         Returns
         -------
@@ -208,6 +335,8 @@ class Model:
             label_border=label_border,
             one_dimensional=one_dimensional,
             verbose=verbose,
+            dtype=dtype,
+            progress=progress,
         )
 
     @property
@@ -215,10 +344,34 @@ class Model:
         """Geometry: The grid the model discretizes the blobs on (read-only)."""
         return self._geometry
 
+    @property
+    def dtype(self) -> np.dtype:
+        """np.dtype: Floating point type of the realizations (read-only)."""
+        return self._dtype
+
+    @property
+    def last_profile(self) -> Union[PhaseTimer, None]:
+        """
+        PhaseTimer: Time spent in each phase of the last realization, if it
+        was made with ``profile`` (read-only), None otherwise.
+        """
+        return self._timer if self._timer.enabled else None
+
+    @property
+    def last_counters(self) -> Union[WorkCounters, None]:
+        """
+        WorkCounters: Work done to sum up the blobs of the last realization,
+        if it was made with ``profile`` (read-only), None otherwise.
+        """
+        return self._counters if self._counters.enabled else None
+
     def get_blobs(self) -> List[Blob]:
         """
         Return the list of blobs summed up in the last realization.
 
+        The blobs are kept in columnar form (see `BlobBatch`) and only
+        materialized as `Blob` objects by this call.
+
         Returns
         -------
         List[Blob]
@@ -236,7 +389,7 @@ class Model:
                 "No blobs have been sampled yet: blobs are sampled by "
                 "make_realization(), call it first."
             )
-        return self._blobs
+        return self._blobs.to_blobs()
 
     def make_realization(
         self,
@@ -244,7 +397,14 @@ class Model:
         speed_up: bool = True,
         truncation_error: float = 1e-10,
         layout: str = "default",
-    ) -> xr.Dataset:
+        engine: str = "batched",
+        workers: int = 1,
+        chunk_size: Union[int, None] = None,
+        lazy: bool = False,
+        chunks: Union[Dict[str, int], None] = None,
+        profile: Union[bool, str] = False,
+        max_memory: Union[int, None] = None,
+    ) -> "xr.Dataset":
         """
         Integrate the Model over time and write out data as an xarray dataset.
 
@@ -255,9 +415,12 @@ class Model:
         speed_up : bool, optional
             Speed up the code by summing up each blob only over the time
             window where its amplitude on the grid exceeds
-            ``truncation_error``; the rest of the blob is discarded.
-            Enabled by default; set to False for blob shapes with
-            slowly-decaying tails (see Notes).
+            ``truncation_error`` and, in non-periodic two-dimensional
+            domains, only over the rows along y it reaches during that
+            window; the rest of the blob is discarded. Blobs that never enter
+            the domain are skipped entirely.
+            Enabled by default; the windows follow the support of the blob
+            shape (see Notes).
         truncation_error : float, optional
             Amplitude below which a blob is truncated when ``speed_up`` is
             enabled.
@@ -267,6 +430,90 @@ class Model:
             "imaging": the GPI/APD imaging format `frames(y, x, time)` with
             2D coordinates `R(y, x)`, `Z(y, x)`, as returned by
             `to_imaging_dataset`. Requires a two-dimensional geometry.
+        engine : str, optional
+            Algorithm used to sum up the blobs. Possible values:
+            "batched": blobs sharing a blob shape, shape parameters and time
+            window length are stacked and discretized together with
+            `discretize_blobs`, which removes most of the per-blob
+            interpreter overhead for large numbers of blobs.
+            "per_blob": each blob is discretized on its own with
+            `Blob.discretize_blob` on the whole grid, ignoring ``speed_up``.
+            This is the reference implementation, which the "batched"
+            engine agrees with to floating-point round-off without
+            ``speed_up`` and to the truncation error with it.
+            "fft": for homogeneous blob populations, i.e. a
+            `DefaultBlobFactory` for which `DefaultBlobFactory.is_homogeneous`
+            holds (all parameters but the amplitude degenerate), the
+            realization is computed as the FFT convolution of a single pulse
+            kernel with the amplitude-weighted train of arrivals, see
+            `sum_up_homogeneous_blobs`. The cost no longer scales with the
+            number of blobs, and the result matches the other engines to
+            second order in the sub-sample spacing the arrivals are
+            interpolated with. Pulse shapes with a jump (see
+            `AbstractBlobShape.get_jumps_p`) are only supported in one
+            dimension, where the samples next to the jumps are computed
+            exactly. Requires ``labels="off"``; ``speed_up`` and ``workers``
+            are ignored.
+        workers : int, optional
+            Number of worker processes the blobs are summed up on. By default
+            1, i.e. everything runs in the calling process. With more workers
+            the sampled blobs are split into contiguous partitions which are
+            summed up into private fields by a `ProcessPoolExecutor` and then
+            reduced. The result matches the serial one to floating-point
+            round-off (the blob labels match exactly) and is reproducible for
+            a given seed and number of workers. The blobs and the blob shape
+            must be picklable; on platforms that spawn worker processes the
+            calling script needs an ``if __name__ == "__main__":`` guard.
+        chunk_size : int, optional
+            If given together with ``file_name``, the realization is written
+            to disk while it is computed instead of being built in memory:
+            the netCDF file is created with an unlimited time dimension and
+            each chunk of ``chunk_size`` time steps of `iter_realization` is
+            appended as soon as all blobs contributing to it are summed up.
+            The memory needed for the fields is then bounded by
+            (Ny, Nx, chunk_size), which allows for files larger than the
+            available memory. Only supported with the "batched" and
+            "per_blob" engines and a single worker.
+        lazy : bool, optional
+            If True, the blobs are sampled but not summed up: the density
+            (and the blob labels) of the returned dataset are dask arrays,
+            chunked along ``t`` as given by ``chunks``, whose chunks are
+            computed on demand from the blobs whose time window (see
+            `_compute_windows`) overlaps them. Selections and reductions
+            of the dataset then only compute the chunks they need, scheduled
+            by dask, and the realization is never held in memory in full.
+            Requires the optional dependency dask (``pip install
+            blobmodel[dask]``). Only supported with the "batched" and
+            "per_blob" engines and a single worker. False by default.
+        chunks : Dict[str, int], optional
+            Chunk sizes of a lazy realization, e.g. ``{"t": 1000}``. Only
+            ``"t"`` is supported; by default the time axis is a single chunk.
+        profile : bool or str, optional
+            If True, the wall time and number of calls of each phase of the
+            realization are recorded in a `PhaseTimer`, available as
+            `last_profile` afterwards. The phases are "sampling" and
+            "validation" of the blobs, the computation of their time and y
+            "windows", their "discretization", the "accumulation" into the
+            density field, the computation of the blob "labels", the
+            construction of the "dataset" and its netCDF "write". With
+            several workers the blobs are summed up in a single "summation"
+            phase, and the blobs of lazy realizations, summed up on demand,
+            are not recorded. If a file name is given, the realization is
+            in addition run under `cProfile` and the statistics are dumped
+            to that file, to be read with `pstats`. The work done to sum up
+            the blobs, e.g. the number of evaluated grid cells and how many
+            of them exceed ``truncation_error``, is counted in
+            `WorkCounters`, available as `last_counters`; it is not counted
+            for the "fft" engine, several workers or lazy realizations.
+            False by default.
+        max_memory : int, optional
+            Memory budget of the realization in bytes. The peak memory is
+            first predicted as with `plan` (in an additional "planning"
+            phase), from the blobs the realization then sums up. If it
+            exceeds the budget, the realization is written to ``file_name``
+            in time chunks as with ``chunk_size``, choosing the largest
+            chunks whose fields fit the budget. By default None, i.e. no
+            budget.
 
         Returns
         -------
@@ -282,15 +529,35 @@ class Model:
             and `n` has dimensions (x, t).
             With ``layout="imaging"`` the density is instead the `DataArray`
             `frames` with dimensions (y, x, time), see `to_imaging_dataset`.
-
+            With ``chunk_size``, or when ``max_memory`` makes the realization
+            be written in chunks, the dataset is opened lazily from
+            ``file_name``, so its data is only read from disk when accessed,
+            even if it does not fit in memory. The file then stays open, and
+            can not be written to, until the dataset is closed, e.g. by using
+            it as a context manager in a ``with`` block.
+            With ``lazy`` the data variables are dask arrays.
 
         Raises
         ------
         ValueError
-            If ``layout`` is not one of the values listed above, if
-            ``layout="imaging"`` is requested for a one-dimensional model, or
-            if a sampled blob has an array-valued t_drain whose length does
-            not match the geometry's Nx.
+            If ``layout`` or ``engine`` is not one of the values listed
+            above, if ``engine="fft"`` is requested for a blob factory that
+            does not sample a homogeneous population, together with blob
+            labels or for two-dimensional blobs with a jump in their pulse
+            shape, if ``workers`` is smaller than 1, if ``chunk_size`` is
+            given without ``file_name``, together with the "fft" engine or
+            with several workers, if ``lazy`` is requested together with
+            ``chunk_size``, the "fft" engine or several workers, if ``chunks``
+            holds keys other than "t" or sizes smaller than 1, if
+            ``layout="imaging"`` is requested for a one-dimensional model, if
+            ``max_memory`` is given together with ``chunk_size`` or ``lazy``,
+            or the realization exceeds it and can not be written in chunks
+            (no ``file_name``, the "fft" engine, several workers or a budget
+            smaller than one time step), or if a sampled blob has an
+            array-valued t_drain whose length does not match the geometry's
+            Nx.
+        ImportError
+            If ``lazy`` is requested and dask is not installed.
 
         Warns
         -----
@@ -301,10 +568,63 @@ class Model:
 
         Notes
         -----
-        - The truncation window used by speed_up assumes an exponentially
-          decaying pulse shape (blob_shape="exp"). For shapes with more
-          slowly decaying tails (e.g. lorentz) pass ``speed_up=False``.
+        - The truncation window used by speed_up is the support of the blob
+          shape for ``truncation_error``, as reported by
+          `AbstractBlobShape.get_support_p` and
+          `AbstractBlobShape.get_support_s`. Custom blob shapes should
+          override these for tight and correct windows; the default assumes
+          a shape decaying at least exponentially. Before ``t_init`` the
+          drain factor exceeds one, so the window of a drained blob opens
+          earlier, by the distance over which its pulse shape falls below
+          ``truncation_error`` relative to the grown amplitude (using the
+          smallest drain time if ``t_drain`` varies along x).
+        - The time window also ends once the drained amplitude
+          ``amplitude * exp(-(t - t_init) / t_drain)`` has fallen below
+          ``truncation_error``, using the largest drain time if ``t_drain``
+          varies along x, which keeps realizations with strongly drained
+          blobs cheap.
+        - The time window covers the times the blob overlaps the domain in
+          both x and y (unless ``periodic_y`` is set), so blobs at rest
+          along x that cross the domain vertically are truncated as well.
         """
+        self._timer = PhaseTimer(enabled=bool(profile))
+        self._counters = WorkCounters(enabled=bool(profile))
+        arguments = (
+            file_name,
+            speed_up,
+            truncation_error,
+            layout,
+            engine,
+            workers,
+            chunk_size,
+            lazy,
+            chunks,
+            max_memory,
+        )
+        if not isinstance(profile, str):
+            return self._make_realization(*arguments)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(self._make_realization, *arguments)
+        finally:
+            profiler.dump_stats(profile)
+
+    def _make_realization(
+        self,
+        file_name: Union[str, None],
+        speed_up: bool,
+        truncation_error: float,
+        layout: str,
+        engine: str,
+        workers: int,
+        chunk_size: Union[int, None],
+        lazy: bool,
+        chunks: Union[Dict[str, int], None],
+        max_memory: Union[int, None],
+    ) -> "xr.Dataset":
+        """Body of `make_realization`, see there."""
+        import xarray as xr
+
         # Validate the layout before doing any expensive work.
         if layout not in {"default", "imaging"}:
             raise ValueError(
@@ -314,241 +634,2312 @@ class Model:
             raise ValueError(
                 'layout="imaging" requires a two-dimensional geometry (Ly > 0).'
             )
+        if engine not in {"batched", "per_blob", "fft"}:
+            raise ValueError(
+                f'engine must be "batched", "per_blob" or "fft", got engine = "{engine}".'
+            )
+        if engine == "fft":
+            if not (
+                isinstance(self._blob_factory, DefaultBlobFactory)
+                and self._blob_factory.is_homogeneous()
+            ):
+                raise ValueError(
+                    'engine="fft" requires a DefaultBlobFactory sampling a '
+                    "homogeneous blob population, see DefaultBlobFactory.is_homogeneous."
+                )
+            if self._labels != "off":
+                raise ValueError('engine="fft" does not support blob labels.')
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got workers = {workers}.")
+        chunks = {} if chunks is None else chunks
+        if lazy:
+            if chunk_size is not None or engine == "fft" or workers > 1:
+                raise ValueError(
+                    'lazy is only supported with the "batched" and "per_blob" '
+                    "engines, a single worker and without chunk_size."
+                )
+            if set(chunks) - {"t"}:
+                raise ValueError(
+                    f'chunks only supports the key "t", got chunks = "{chunks}".'
+                )
+            if chunks.get("t", 1) < 1:
+                raise ValueError(
+                    f'chunk sizes must be at least 1, got chunks = "{chunks}".'
+                )
+        if max_memory is not None:
+            if chunk_size is not None or lazy:
+                raise ValueError(
+                    "max_memory can not be combined with chunk_size or lazy."
+                )
+            # The realization sums up the blobs sampled for its plan.
+            self._sample_blobs()
+            with self._timer.phase("planning"):
+                chunk_size = self._chunk_size_within(
+                    self._blobs,
+                    max_memory,
+                    file_name,
+                    speed_up,
+                    truncation_error,
+                    engine,
+                    workers,
+                )
+        if chunk_size is not None:
+            if file_name is None:
+                raise ValueError(
+                    "chunk_size requires a file_name to write the realization "
+                    "to, use iter_realization to process chunks in memory."
+                )
+            if engine == "fft" or workers > 1:
+                raise ValueError(
+                    'chunk_size is only supported with the "batched" and '
+                    '"per_blob" engines and a single worker.'
+                )
+            datasets = (
+                self.iter_realization(chunk_size, speed_up, truncation_error, engine)
+                if max_memory is None
+                else self._iter_chunks(
+                    chunk_size, speed_up, truncation_error, engine, sample=False
+                )
+            )
+            if layout == "imaging":
+                datasets = map(to_imaging_dataset, datasets)
+            # The phases of the chunks, computed while they are written, are
+            # excluded from the time of the write.
+            with self._timer.phase("write"):
+                _write_chunks_to_netcdf(
+                    datasets, file_name, "time" if layout == "imaging" else "t"
+                )
+            # Loading the file would defeat the chunks, so it is left open
+            # for the caller to close, see the returned dataset.
+            return xr.open_dataset(file_name)
+
+        if lazy:
+            self._sample_blobs()
+            self._create_lazy_fields(
+                chunks.get("t", self._geometry.t.size),
+                speed_up,
+                truncation_error,
+                engine,
+            )
+            with self._timer.phase("dataset"):
+                dataset = self._create_xr_dataset()
+                if layout == "imaging":
+                    dataset = to_imaging_dataset(dataset)
+            if file_name is not None:
+                with self._timer.phase("write"):
+                    dataset.to_netcdf(file_name)
+            return dataset
 
         # Reset density field
         self._reset_fields()
 
-        self._blobs = self._blob_factory.sample_blobs(
-            Ly=self._geometry.Ly,
-            T=self._geometry.T,
-            num_blobs=self.num_blobs,
-            blob_shape=self.blob_shape,
-        )
-
-        # Array-valued t_drain (drain time varying along x) must match the
-        # grid; only the model knows Nx, so this cannot be checked by the
-        # factory or the blob itself. Blob normalizes t_drain to a float
-        # scalar or a float array at construction.
-        for blob in self._blobs:
-            if (
-                isinstance(blob.t_drain, np.ndarray)
-                and blob.t_drain.size != self._geometry.Nx
-            ):
-                raise ValueError(
-                    f"t_drain must be a scalar or of length Nx = {self._geometry.Nx}, "
-                    f"got length {blob.t_drain.size}."
-                )
+        if max_memory is None:
+            self._sample_blobs()
 
-        if self._geometry.periodic_y and not self._one_dimensional and self._blobs:
-            max_width = max(max(blob.width_p, blob.width_s) for blob in self._blobs)
-            if max_width > self._geometry.Ly / 3:
-                warnings.warn(
-                    f"Blob width up to {max_width:.3g} is big compared to "
-                    f"Ly = {self._geometry.Ly:.3g}, mirrored blobs might become apparent."
+        progress = self._start_progress(len(self._blobs), "Summing up Blobs")
+        if engine == "fft":
+            self._sum_up_blobs_fft(truncation_error)
+            if progress is not None:
+                progress.update(len(self._blobs))
+        elif workers == 1:
+            self._sum_up_blob_list(
+                self._blobs,
+                range(len(self._blobs)),
+                speed_up,
+                truncation_error,
+                engine,
+                progress,
+            )
+        else:
+            with self._timer.phase("summation"):
+                self._sum_up_blobs_parallel(
+                    workers, speed_up, truncation_error, engine, progress
                 )
+        if progress is not None:
+            progress.close()
 
-        iterable = (
-            tqdm(self._blobs, desc="Summing up Blobs") if self._verbose else self._blobs
-        )
-        for blob_index, blob in enumerate(iterable):
-            self._sum_up_blobs(blob, blob_index, speed_up, truncation_error)
-
-        dataset = self._create_xr_dataset()
-        if layout == "imaging":
-            dataset = to_imaging_dataset(dataset)
+        with self._timer.phase("dataset"):
+            dataset = self._create_xr_dataset()
+            if layout == "imaging":
+                dataset = to_imaging_dataset(dataset)
 
         if file_name is not None:
-            dataset.to_netcdf(file_name)
+            with self._timer.phase("write"):
+                dataset.to_netcdf(file_name)
 
         return dataset
 
-    def _create_xr_dataset(self) -> xr.Dataset:
+    def plan(
+        self,
+        speed_up: bool = True,
+        truncation_error: float = 1e-10,
+        engine: str = "batched",
+        workers: int = 1,
+        chunk_size: Union[int, None] = None,
+    ) -> RealizationPlan:
         """
-        Create an xarray dataset from the density field.
+        Predict the memory and work of the next realization before running
+        it.
+
+        The blobs are sampled from a copy of the blob factory, so that the
+        next realization sums up the same blobs, and their windows are
+        computed as in `make_realization`. The work is the number of grid
+        cells the blobs are evaluated on, i.e. the whole grid for each blob
+        with the "per_blob" engine. The peak memory is the size of the
+        density and labels fields plus the temporaries of the largest batch
+        of blobs evaluated at once; with several workers, every worker holds
+        fields of its own and the temporaries of its largest batch. The
+        dataset wrapping the fields and the netCDF write are not included.
+
+        Parameters
+        ----------
+        speed_up : bool, optional
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+        truncation_error : float, optional
+            Amplitude below which the blob is truncated.
+        engine : str, optional
+            "batched" or "per_blob", see `make_realization`.
+        workers : int, optional
+            Number of worker processes, see `make_realization`.
+        chunk_size : int, optional
+            Number of time steps of the chunks of a chunked realization, see
+            `make_realization`. By default the fields cover the whole time
+            axis.
 
         Returns
         -------
-        xr.Dataset
-            xarray dataset with the density field data.
+        RealizationPlan
+            Predicted resources of the realization.
+
+        Raises
+        ------
+        ValueError
+            If ``engine`` is not "batched" or "per_blob", or if ``workers``
+            or ``chunk_size`` is smaller than 1.
         """
-        if self._geometry.Ly == 0:
-            # 1D output: drop the size-1 y dimension entirely, so consumers
-            # get n(x, t) without having to .squeeze().
-            dataset = xr.Dataset(
-                data_vars=dict(
-                    n=(["x", "t"], self._density[0]),
-                ),
-                coords=dict(
-                    x=(["x"], self._geometry.x),
-                    t=(["t"], self._geometry.t),
-                ),
-                attrs=dict(description="1D propagating blobs."),
+        if engine not in {"batched", "per_blob"}:
+            raise ValueError(
+                f'plan supports the engines "batched" and "per_blob", got engine = "{engine}".'
             )
-            if self._labels in {"same", "individual"}:
-                dataset = dataset.assign(
-                    blob_labels=(["x", "t"], self._labels_field[0])
-                )
-        else:
-            dataset = xr.Dataset(
-                data_vars=dict(
-                    n=(["y", "x", "t"], self._density),
-                ),
-                coords=dict(
-                    x=(["x"], self._geometry.x),
-                    y=(["y"], self._geometry.y),
-                    t=(["t"], self._geometry.t),
-                ),
-                attrs=dict(description="2D propagating blobs."),
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got workers = {workers}.")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(
+                f"chunk_size must be at least 1, got chunk_size = {chunk_size}."
             )
-            if self._labels in {"same", "individual"}:
-                dataset = dataset.assign(
-                    blob_labels=(["y", "x", "t"], self._labels_field)
-                )
-
-        return dataset
+        sampler = self._worker_copy()
+        sampler._blob_factory = copy.deepcopy(self._blob_factory)
+        sampler._sample_blobs()
+        return self._plan_blobs(
+            sampler._blobs, speed_up, truncation_error, engine, workers, chunk_size
+        )
 
-    def _sum_up_blobs(
+    def _plan_blobs(
         self,
-        blob: Blob,
-        blob_index: int,
+        blobs: BlobBatch,
         speed_up: bool,
         truncation_error: float,
-    ):
+        engine: str,
+        workers: int,
+        chunk_size: Union[int, None],
+    ) -> RealizationPlan:
         """
-        Sum up the contribution of a single blob to the density field.
+        Body of `plan` for blobs that are already sampled, see there.
 
         Parameters
         ----------
-        blob : Blob
-            Blob object.
-        blob_index : int
-            Position of the blob in the factory output; used to assign the
-            blob label when ``labels="individual"``.
-        speed_up : bool
-            Flag for speeding up the code by discretizing each single blob at a smaller time window.
-        truncation_error : float
-            Amplitude below which the blob is truncated.
+        blobs : BlobBatch
+            Blobs of the realization.
+
+        Returns
+        -------
+        RealizationPlan
+            Predicted resources of the realization.
         """
-        _start, _stop = self._compute_start_stop(blob, speed_up, truncation_error)
-        # 1D coordinate arrays shaped to broadcast against each other as
-        # (Ny, Nx, Nt) — avoids materializing three full meshgrids.
-        _single_blob = blob.discretize_blob(
-            x=self._geometry.x[np.newaxis, :, np.newaxis],
-            y=self._geometry.y[:, np.newaxis, np.newaxis],
-            t=self._geometry.t[np.newaxis, np.newaxis, _start:_stop],
-            periodic_y=self._geometry.periodic_y,
-            Ly=self._geometry.Ly,
-            one_dimensional=self._one_dimensional,
-            y0=self._geometry.y0,
+        planner = self._worker_copy()
+        planner._time_window = (0, self._geometry.t.size)
+        if engine == "per_blob":
+            # Every blob is evaluated on the whole grid, see `_sum_up_blobs`.
+            window_lengths = np.full(len(blobs), self._geometry.t.size)
+            segment_cells = window_lengths * self._geometry.Ny * self._geometry.Nx
+            positions = np.arange(len(blobs))
+            # One blob at a time.
+            keys = positions[:, np.newaxis]
+        else:
+            segments = planner._compute_segments(blobs, speed_up, truncation_error)
+            windows = segments.stops - segments.starts
+            segment_cells = (
+                windows * (segments.y_stops - segments.y_starts) * self._geometry.Nx
+            )
+            window_lengths = np.bincount(
+                segments.positions, weights=windows, minlength=len(blobs)
+            ).astype(int)
+            positions = segments.positions
+            # The groups of `_sum_up_blobs_batched`.
+            keys = planner._batch_keys(
+                planner._segment_blobs(blobs, segments),
+                windows,
+                segments.y_stops - segments.y_starts,
+            )
+        # The largest batch of blobs evaluated at once, by a single worker
+        # when the blobs are split up between several.
+        partitions = (
+            _partition_indices(len(blobs), workers)
+            if workers > 1
+            else [np.arange(len(blobs))]
         )
+        batch_cells = 0
+        for indices in partitions:
+            in_partition = np.isin(positions, indices)
+            if segment_cells[in_partition].sum() == 0:
+                continue
+            _, first, counts = np.unique(
+                keys[in_partition], axis=0, return_index=True, return_counts=True
+            )
+            group_cells = segment_cells[in_partition][first]
+            batch_sizes = np.minimum(
+                counts, np.maximum(1, _MAX_BATCH_CELLS // group_cells)
+            )
+            batch_cells = max(batch_cells, int((batch_sizes * group_cells).max()))
+        cells = int(segment_cells.sum())
 
-        self._density[:, :, _start:_stop] += _single_blob
-
-        if self._labels == "same":
-            __max_amplitudes = np.max(_single_blob, axis=(0, 1))
-            __max_amplitudes[__max_amplitudes == 0] = np.inf
-            self._labels_field[:, :, _start:_stop][
-                _single_blob >= __max_amplitudes * self._label_border
-            ] = 1
-        elif self._labels == "individual":
-            __max_amplitudes = np.max(_single_blob, axis=(0, 1))
-            __max_amplitudes[__max_amplitudes == 0] = np.inf
-            self._labels_field[:, :, _start:_stop][
-                _single_blob >= __max_amplitudes * self._label_border
-            ] = (blob_index + 1)
+        steps = self._geometry.t.size
+        if chunk_size is not None:
+            steps = min(steps, chunk_size)
+        itemsize = np.dtype(self._dtype).itemsize
+        density_bytes = self._geometry.Ny * self._geometry.Nx * steps * itemsize
+        labels_bytes = density_bytes if self._labels in {"same", "individual"} else 0
+        temporaries = (
+            _TEMPORARIES_PER_CELL
+            if np.all(blobs.is_separable)
+            else _TILTED_TEMPORARIES_PER_CELL
+        )
+        temporary_bytes = temporaries * batch_cells * itemsize
+        fields_bytes = density_bytes + labels_bytes
+        peak_bytes = fields_bytes + temporary_bytes
+        if workers > 1:
+            # Every busy worker holds fields and temporaries of its own, the
+            # fields of the model hold their reduction.
+            peak_bytes = fields_bytes + min(workers, len(partitions)) * peak_bytes
+        return RealizationPlan(
+            num_blobs=len(blobs),
+            culled_blobs=int(np.count_nonzero(window_lengths == 0)),
+            window_lengths=window_lengths,
+            cells=cells,
+            density_bytes=density_bytes,
+            labels_bytes=labels_bytes,
+            temporary_bytes=temporary_bytes,
+            peak_bytes=peak_bytes,
+            chunk_size=steps,
+        )
 
-    def _compute_start_stop(self, blob: Blob, speed_up: bool, truncation_error: float):
+    def _chunk_size_within(
+        self,
+        blobs: BlobBatch,
+        max_memory: int,
+        file_name: Union[str, None],
+        speed_up: bool,
+        truncation_error: float,
+        engine: str,
+        workers: int,
+    ) -> Union[int, None]:
         """
-        Compute the start and stop indices for summing up the contribution of a single blob.
+        Number of time steps of the chunks a realization is written in to
+        stay within a memory budget, see ``max_memory`` in
+        `make_realization`.
 
         Parameters
         ----------
-        blob : Blob
-            Blob object.
-        speed_up : bool
-            Flag for speeding up the code by discretizing each single blob at a smaller time window.
-        truncation_error : float
-            Amplitude below which the blob is truncated.
+        blobs : BlobBatch
+            Blobs of the realization, see `_plan_blobs`.
 
         Returns
         -------
-        Tuple[int, int]
-            Start and stop indices.
-        """
-        if not speed_up or blob.v_x == 0:
-            return 0, self._geometry.t.size
+        int or None
+            The largest chunk size whose plan fits the budget, None if the
+            whole realization fits.
 
-        dt, t0 = self._geometry.dt, self._geometry.t[0]
-        idx_x0 = (blob.t_init - t0) / dt + (self._geometry.x[0] - blob.pos_x0) / (
-            blob.v_x * dt
-        )
-        idx_Lx = idx_x0 + self._geometry.Lx / (blob.v_x * dt)
-        # Decay length of the blob along the x-axis: the blob-frame widths
-        # projected onto x through the tilt angle (width_p for an untilted
-        # blob, width_s at theta = pi/2).
-        width_x = (
-            np.abs(np.cos(blob.theta)) * blob.width_p
-            + np.abs(np.sin(blob.theta)) * blob.width_s
+        Raises
+        ------
+        ValueError
+            If the realization exceeds the budget and can not be written in
+            chunks within it.
+        """
+        if engine == "fft":
+            raise ValueError('max_memory is not supported with engine="fft".')
+        plan = self._plan_blobs(
+            blobs, speed_up, truncation_error, engine, workers, None
         )
-        margin = (
-            -width_x * np.log(truncation_error * np.sqrt(np.pi)) / np.abs(blob.v_x * dt)
+        if plan.peak_bytes <= max_memory:
+            return None
+        message = (
+            f"The realization needs about {plan.peak_bytes} bytes, more than "
+            f"max_memory = {max_memory}"
         )
-        start = int(np.clip(min(idx_x0, idx_Lx) - margin, 0, self._geometry.t.size))
-        stop = int(np.clip(max(idx_x0, idx_Lx) + margin, 0, self._geometry.t.size))
+        if file_name is None or workers > 1:
+            raise ValueError(
+                f"{message}; writing it in chunks requires a file_name and a "
+                "single worker."
+            )
+        step_bytes = (plan.density_bytes + plan.labels_bytes) // plan.chunk_size
+        chunk_size = (max_memory - plan.temporary_bytes) // step_bytes
+        if chunk_size < 1:
+            raise ValueError(f"{message}, even when written in chunks.")
+        return int(chunk_size)
+
+    def run_ensemble(
+        self,
+        num_realizations: int,
+        reducers: Sequence[Reducer],
+        seed: Union[int, np.random.SeedSequence, None] = None,
+        workers: int = 1,
+        speed_up: bool = True,
+        truncation_error: float = 1e-10,
+        engine: str = "batched",
+    ) -> "xr.Dataset":
+        """
+        Compute an ensemble of realizations of the model and aggregate them
+        into statistics, without keeping the individual realizations.
 
-        return start, stop
+        Each realization samples its blobs from a generator seeded with its
+        own child of ``np.random.SeedSequence(seed).spawn(num_realizations)``,
+        so the ensemble does not depend on the number of workers. The
+        realizations are split into contiguous partitions, each computed by
+        a worker process that streams its realizations into fresh copies of
+        `reducers`; the copies are then merged in partition order.
 
-    def _reset_fields(self):
-        """Reset the density and labels fields."""
-        self._density = np.zeros(
-            shape=(self._geometry.Ny, self._geometry.Nx, self._geometry.t.size)
+        Parameters
+        ----------
+        num_realizations : int
+            Number of realizations in the ensemble.
+        reducers : Sequence[Reducer]
+            Statistics to accumulate, e.g. `MeanReducer`, `VarianceReducer`
+            or `HistogramReducer`. They serve as templates and are left
+            untouched; pass fresh reducers.
+        seed : int or np.random.SeedSequence, optional
+            Root seed of the ensemble. By default None, i.e. fresh entropy
+            (non-reproducible). Replaces any seed of the model's blob factory.
+        workers : int, optional
+            Number of worker processes, by default 1, i.e. everything runs in
+            the calling process. The model, its blob factory and the
+            reducers must be picklable, see `make_realization`.
+        speed_up : bool, optional
+            As in `make_realization`.
+        truncation_error : float, optional
+            As in `make_realization`.
+        engine : str, optional
+            As in `make_realization`.
+
+        Returns
+        -------
+        xr.Dataset
+            The results of all reducers, merged into a single dataset. A
+            variable computed by several reducers is taken from the first.
+
+        Raises
+        ------
+        ValueError
+            If ``num_realizations`` or ``workers`` is smaller than 1, if the
+            model is built from a fixed list of blobs, or for invalid
+            realization arguments, see `make_realization`.
+        """
+        import xarray as xr
+
+        if num_realizations < 1:
+            raise ValueError(
+                f"num_realizations must be at least 1, got num_realizations = {num_realizations}."
+            )
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got workers = {workers}.")
+        if self._blob_factory is None or isinstance(
+            self._blob_factory, BlobListFactory
+        ):
+            raise ValueError(
+                "An ensemble requires a blob factory sampling random blobs, "
+                "the model realizes a fixed list of blobs."
+            )
+
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        seed_sequences = seed.spawn(num_realizations)
+        ensemble_model = self._worker_copy()
+        realization_kwargs = dict(
+            speed_up=speed_up, truncation_error=truncation_error, engine=engine
+        )
+        num_partitions = min(num_realizations, _PARTITIONS_PER_WORKER * workers)
+        partitions = [
+            [seed_sequences[i] for i in indices]
+            for indices in np.array_split(np.arange(num_realizations), num_partitions)
+        ]
+
+        progress = self._start_progress(
+            num_realizations, "Running ensemble", "realizations"
         )
-        if self._labels in {"same", "individual"}:
-            self._labels_field = np.zeros(
-                shape=(self._geometry.Ny, self._geometry.Nx, self._geometry.t.size)
+        results: Iterator[List[Reducer]]
+        if workers == 1:
+            results = (
+                _run_ensemble_partition(
+                    ensemble_model,
+                    self._blob_factory,
+                    partition,
+                    reducers,
+                    realization_kwargs,
+                )
+                for partition in partitions
             )
+            merged = self._merge_reducers(partitions, results, progress)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    _run_ensemble_partition,
+                    itertools.repeat(ensemble_model),
+                    itertools.repeat(self._blob_factory),
+                    partitions,
+                    itertools.repeat(reducers),
+                    itertools.repeat(realization_kwargs),
+                )
+                merged = self._merge_reducers(partitions, results, progress)
+        if progress is not None:
+            progress.close()
+        # Reducers sharing a variable (e.g. the mean of `MeanReducer` and
+        # `VarianceReducer`) agree up to round-off, the first one is kept.
+        return xr.merge([reducer.result() for reducer in merged], compat="override")
 
+    @staticmethod
+    def _merge_reducers(
+        partitions: List[list], results: Iterator[List[Reducer]], progress=None
+    ) -> List[Reducer]:
+        """Merge the reducers of all partitions, in partition order."""
+        merged: List[Reducer] = []
+        for partition, reducers in zip(partitions, results):
+            if not merged:
+                merged = reducers
+            else:
+                for accumulator, reducer in zip(merged, reducers):
+                    accumulator.merge(reducer)
+            if progress is not None:
+                progress.update(len(partition))
+        return merged
 
-def to_imaging_dataset(dataset: xr.Dataset) -> xr.Dataset:
-    """
-    Convert a blobmodel output dataset to the GPI/APD imaging format.
+    def iter_realization(
+        self,
+        chunk_size: int,
+        speed_up: bool = True,
+        truncation_error: float = 1e-10,
+        engine: str = "batched",
+    ) -> Iterator["xr.Dataset"]:
+        """
+        Integrate the Model over time in consecutive chunks of time steps.
 
-    Downstream analysis tooling for experimental gas-puff-imaging (GPI) and
-    avalanche-photodiode (APD) data standardizes on a dataset with the density
-    stored as ``frames(y, x, time)`` and the grid stored as two-dimensional
-    coordinate arrays ``R(y, x)``, ``Z(y, x)``. This helper converts the
-    default blobmodel output ``n(y, x, t)`` (1D coordinates ``x``, ``y``,
-    ``t``) into that format. It is also available directly from the model via
-    ``make_realization(..., layout="imaging")``.
+        Unlike `make_realization`, which allocates the density field for the
+        whole time axis up front, the realization is produced one chunk of
+        ``chunk_size`` time steps at a time, so that the memory needed for
+        the fields never exceeds (Ny, Nx, chunk_size). The blobs are sampled
+        once and sorted by the start of their time window (see ``speed_up``
+        in `make_realization`). The chunks are then swept in order, keeping
+        the set of blobs whose window overlaps the current chunk; only these
+        are summed up. Concatenating the chunks along ``t`` gives the same
+        realization as `make_realization` with the same seed, up to
+        floating-point round-off.
 
-    Parameters
-    ----------
-    dataset : xr.Dataset
-        Dataset as returned by `Model.make_realization` with the default
-        layout. Must be two-dimensional, i.e. contain a `y` coordinate.
-        A `blob_labels` variable, if present, is carried over.
+        Parameters
+        ----------
+        chunk_size : int
+            Number of time steps per chunk. The last chunk may be shorter.
+        speed_up : bool, optional
+            Sum up each blob only over its time (and y) window, as in
+            `make_realization`. Without it every blob is active in every
+            chunk.
+        truncation_error : float, optional
+            Amplitude below which a blob is truncated when ``speed_up`` is
+            enabled.
+        engine : str, optional
+            "batched" or "per_blob", see `make_realization`.
 
-    Returns
-    -------
-    xr.Dataset
-        Dataset with the density as `frames` with dimension order
-        (y, x, time), coordinates `R` and `Z` of shape (Ny, Nx) holding the
-        meshgrid of the `x` and `y` coordinates, and the coordinate `time`.
+        Returns
+        -------
+        Iterator[xr.Dataset]
+            Generator of datasets in the format of `make_realization`
+            (``layout="default"``), each covering one chunk of the time axis.
+            Use `to_imaging_dataset` to convert them to the imaging layout.
+
+        Raises
+        ------
+        ValueError
+            If ``chunk_size`` is smaller than 1 or ``engine`` is neither
+            "batched" nor "per_blob". Errors of the blob sampling, see
+            `make_realization`, are raised when the first chunk is requested.
+        """
+        if chunk_size < 1:
+            raise ValueError(
+                f"chunk_size must be at least 1, got chunk_size = {chunk_size}."
+            )
+        if engine not in {"batched", "per_blob"}:
+            raise ValueError(
+                f'engine must be "batched" or "per_blob", got engine = "{engine}".'
+            )
+        return self._iter_chunks(chunk_size, speed_up, truncation_error, engine)
+
+    def make_statistics(
+        self,
+        chunk_size: int,
+        bins: Union[Sequence[float], np.ndarray, None] = None,
+        speed_up: bool = True,
+        truncation_error: float = 1e-10,
+        engine: str = "batched",
+    ) -> "xr.Dataset":
+        """
+        Compute the statistics of a realization at every grid point without
+        holding the realization in memory.
+
+        The realization is computed in chunks of ``chunk_size`` time steps
+        with `iter_realization`, and each chunk is added to a
+        `PointStatisticsReducer` as soon as it is completed, so the memory
+        needed is bounded by (Ny, Nx, chunk_size) plus the statistics.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of time steps per chunk.
+        bins : Sequence[float], optional
+            Bin edges of the per-point probability density functions, see
+            `PointStatisticsReducer`. By default None, i.e. no histograms.
+        speed_up : bool, optional
+            As in `make_realization`.
+        truncation_error : float, optional
+            As in `make_realization`.
+        engine : str, optional
+            "batched" or "per_blob", as in `make_realization`.
+
+        Returns
+        -------
+        xr.Dataset
+            Mean, variance, skewness, flatness and, with ``bins``, the
+            probability density of the density at every grid point, see
+            `PointStatisticsReducer.result`.
+
+        Raises
+        ------
+        ValueError
+            If ``chunk_size`` is smaller than 1, ``engine`` is neither
+            "batched" nor "per_blob" or ``bins`` are not monotonically
+            increasing.
+        """
+        statistics = PointStatisticsReducer(bins)
+        for chunk in self.iter_realization(
+            chunk_size, speed_up, truncation_error, engine
+        ):
+            statistics.update(chunk)
+        return statistics.result()
+
+    def _iter_chunks(
+        self,
+        chunk_size: int,
+        speed_up: bool,
+        truncation_error: float,
+        engine: str,
+        sample: bool = True,
+    ) -> Iterator["xr.Dataset"]:
+        """
+        Generator behind `iter_realization`, summing up the blobs already
+        sampled if ``sample`` is False.
+        """
+        if sample:
+            self._sample_blobs()
+        progress = self._start_progress(
+            self._geometry.t.size, "Summing up chunks", "time steps"
+        )
+        for chunk_start, chunk_stop, active in self._active_blobs_per_chunk(
+            chunk_size, speed_up, truncation_error
+        ):
+            self._reset_fields(chunk_start, chunk_stop)
+            self._sum_up_blob_list(
+                self._blobs.take(active),
+                active,
+                speed_up,
+                truncation_error,
+                engine,
+            )
+            if progress is not None:
+                progress.update(chunk_stop - chunk_start)
+            with self._timer.phase("dataset"):
+                chunk = self._create_xr_dataset()
+            yield chunk
+        if progress is not None:
+            progress.close()
+
+    def _active_blobs_per_chunk(
+        self, chunk_size: int, speed_up: bool, truncation_error: float
+    ) -> Iterator[Tuple[int, int, List[int]]]:
+        """
+        Sweep the time axis in chunks, keeping the set of sampled blobs whose
+        time window overlaps the current chunk.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of time steps per chunk.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+
+        Returns
+        -------
+        Iterator[Tuple[int, int, List[int]]]
+            Start and stop index of each chunk and the positions of its
+            active blobs in factory order.
+        """
+        starts, stops = self._compute_windows(self._blobs, speed_up, truncation_error)
+        by_start = np.argsort(starts, kind="stable")
+        sorted_starts = starts[by_start]
+
+        num_steps = self._geometry.t.size
+        next_blob = 0
+        active = np.zeros(0, dtype=int)
+        for chunk_start in range(0, num_steps, chunk_size):
+            chunk_stop = min(num_steps, chunk_start + chunk_size)
+            # Blobs whose window starts before the end of the chunk become
+            # active, blobs whose window ended before the chunk are dropped.
+            first_inactive = np.searchsorted(sorted_starts, chunk_stop)
+            active = np.concatenate([active, by_start[next_blob:first_inactive]])
+            next_blob = int(first_inactive)
+            active = np.sort(active[stops[active] > chunk_start])
+            yield chunk_start, chunk_stop, active.tolist()
+
+    def _create_lazy_fields(
+        self,
+        chunk_size: int,
+        speed_up: bool,
+        truncation_error: float,
+        engine: str,
+    ):
+        """
+        Set the density and labels fields to dask arrays chunked along time,
+        each chunk summing up the sampled blobs active in it when computed.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of time steps per chunk.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+        engine : str
+            Algorithm used to sum up the blobs, "batched" or "per_blob".
+        """
+        try:
+            import dask
+            import dask.array as da
+        except ImportError as error:
+            raise ImportError(
+                "Lazy realizations require dask, install it with "
+                "pip install blobmodel[dask]."
+            ) from error
+
+        worker_model = self._worker_copy()
+        density_chunks, labels_chunks = [], []
+        for chunk_start, chunk_stop, active in self._active_blobs_per_chunk(
+            chunk_size, speed_up, truncation_error
+        ):
+            fields = dask.delayed(_sum_up_blob_partition, nout=3, pure=False)(
+                worker_model,
+                self._blobs.take(active),
+                active,
+                speed_up,
+                truncation_error,
+                engine,
+                chunk_start,
+                chunk_stop,
+            )
+            shape = (self._geometry.Ny, self._geometry.Nx, chunk_stop - chunk_start)
+            density_chunks.append(
+                da.from_delayed(fields[0], shape=shape, dtype=self._dtype)
+            )
+            labels_chunks.append(
+                da.from_delayed(fields[1], shape=shape, dtype=self._dtype)
+            )
+
+        self._time_window = (0, self._geometry.t.size)
+        self._density = da.concatenate(density_chunks, axis=2)
+        self._labels_field = (
+            da.concatenate(labels_chunks, axis=2)
+            if self._labels in {"same", "individual"}
+            else None
+        )
+
+    def make_probe_realization(
+        self,
+        points: Union[Sequence[Sequence[float]], np.ndarray],
+        file_name: Union[str, None] = None,
+        speed_up: bool = True,
+        truncation_error: float = 1e-10,
+    ) -> "xr.Dataset":
+        """
+        Integrate the Model over time at a set of probe points only.
+
+        Synthetic point diagnostics (e.g. Langmuir probes or single APD
+        channels) only need the time series at a few positions. Instead of
+        the full grid of the geometry, every blob is evaluated at the probe
+        points with `Blob.discretize_blob`, so that the cost scales with the
+        number of probes times the number of time steps. The time axis,
+        periodicity and y-extent of the domain are taken from the geometry,
+        and each blob is only evaluated over the time window in which it
+        reaches the probes (see ``speed_up`` in `make_realization`).
+
+        Parameters
+        ----------
+        points : Sequence[Sequence[float]] or np.ndarray
+            Positions (x, y) of the probes, shape (num_probes, 2). The y
+            positions are ignored by one-dimensional models.
+        file_name : str, optional
+            File name for the .nc file containing data as an xarray dataset.
+        speed_up : bool, optional
+            Sum up each blob only over the time window where its amplitude
+            at the probes exceeds ``truncation_error``.
+        truncation_error : float, optional
+            Amplitude below which a blob is truncated when ``speed_up`` is
+            enabled.
+
+        Returns
+        -------
+        xr.Dataset
+            xarray dataset with the density at the probes as the `DataArray`
+            `n` with dimensions (probe, t), and the coordinates `x` and `y`
+            of the probes along the `probe` dimension. Blob labels are not
+            computed.
+
+        Raises
+        ------
+        ValueError
+            If ``points`` is not of shape (num_probes, 2), or if a sampled
+            blob has an array-valued t_drain whose length does not match the
+            geometry's Nx.
+
+        Notes
+        -----
+        - An array-valued t_drain, given on the grid of the geometry, is
+          linearly interpolated to the x positions of the probes.
+        """
+        import xarray as xr
+
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise ValueError(
+                f"points must be of shape (num_probes, 2), got shape {points.shape}."
+            )
+        self._sample_blobs()
+
+        x, y, t = (
+            coordinate.astype(self._dtype)
+            for coordinate in (points[:, 0], points[:, 1], self._geometry.t)
+        )
+        if self._one_dimensional:
+            y = np.zeros_like(y)
+        density = np.zeros(shape=(x.size, t.size), dtype=self._dtype)
+        if x.size == 0:
+            indices = np.zeros(0, dtype=int)
+        else:
+            starts, stops = self._compute_windows(
+                self._blobs,
+                speed_up,
+                truncation_error,
+                (x.min(), x.max()),
+                (y.min(), y.max()),
+            )
+            indices = np.flatnonzero(stops > starts)
+        progress = self._start_progress(len(indices), "Summing up Blobs")
+        for index in indices:
+            start, stop = starts[index], stops[index]
+            blob = self._blobs.to_blob(index)
+            if isinstance(blob.t_drain, np.ndarray):
+                blob = copy.copy(blob)
+                blob.t_drain = np.interp(x, self._geometry.x, blob.t_drain)
+            density[:, start:stop] += blob.discretize_blob(
+                x=x[np.newaxis, :, np.newaxis],
+                y=y[np.newaxis, :, np.newaxis],
+                t=t[np.newaxis, np.newaxis, start:stop],
+                periodic_y=self._geometry.periodic_y,
+                Ly=self._geometry.Ly,
+                one_dimensional=self._one_dimensional,
+                y0=self._geometry.y0,
+            )[0]
+            if progress is not None:
+                progress.update(1, x.size * (stop - start))
+        if progress is not None:
+            progress.close()
+
+        dataset = xr.Dataset(
+            data_vars=dict(n=(["probe", "t"], density)),
+            coords=dict(
+                x=(["probe"], points[:, 0]),
+                y=(["probe"], points[:, 1]),
+                t=(["t"], self._geometry.t),
+            ),
+            attrs=dict(description="Propagating blobs at probe points."),
+        )
+        if file_name is not None:
+            dataset.to_netcdf(file_name)
+        return dataset
+
+    def _start_progress(
+        self, total: int, description: str, unit: str = "blobs"
+    ) -> Union[ProgressReporter, None]:
+        """
+        Start reporting the progress of a task to the reporter of the model,
+        see ``progress`` in `Model.__init__`.
+
+        Parameters
+        ----------
+        total : int
+            Number of items of the task.
+        description : str
+            Description of the task.
+        unit : str, optional
+            Unit of the items, "blobs" by default.
+
+        Returns
+        -------
+        ProgressReporter or None
+            The started reporter, None if the progress is not reported.
+        """
+        progress = self._progress
+        if progress is None and self._verbose:
+            progress = TqdmReporter()
+        if progress is not None:
+            progress.start(total, description, unit)
+        return progress
+
+    def _sample_blobs(self):
+        """
+        Sample the blobs of a realization from the blob factory and check
+        them against the geometry.
+
+        Raises
+        ------
+        ValueError
+            If a sampled blob has an array-valued t_drain whose length does
+            not match the geometry's Nx.
+
+        Warns
+        -----
+        UserWarning
+            If periodic_y is set and a sampled blob width is large compared to
+            the domain size Ly.
+        """
+        if self._blob_factory is None:
+            raise ValueError("The model has no blob factory to sample blobs from.")
+        with self._timer.phase("sampling"):
+            self._blobs = self._blob_factory.sample_blob_batch(
+                Ly=self._geometry.Ly,
+                T=self._geometry.T,
+                num_blobs=self.num_blobs,
+                blob_shape=self.blob_shape,
+            )
+        with self._timer.phase("validation"):
+            self._validate_blobs()
+
+    def _validate_blobs(self):
+        """Check the sampled blobs against the geometry, see `_sample_blobs`."""
+        # Array-valued t_drain (drain time varying along x) must match the
+        # grid; only the model knows Nx, so this cannot be checked by the
+        # factory or the blob itself.
+        if self._blobs.t_drain.ndim == 2 and (
+            self._blobs.t_drain.shape[1] != self._geometry.Nx
+        ):
+            raise ValueError(
+                f"t_drain must be a scalar or of length Nx = {self._geometry.Nx}, "
+                f"got length {self._blobs.t_drain.shape[1]}."
+            )
+
+        if self._geometry.periodic_y and not self._one_dimensional and self._blobs:
+            max_width = max(self._blobs.width_p.max(), self._blobs.width_s.max())
+            if max_width > self._geometry.Ly / 3:
+                warnings.warn(
+                    f"Blob width up to {max_width:.3g} is big compared to "
+                    f"Ly = {self._geometry.Ly:.3g}, mirrored blobs might become apparent."
+                )
+
+    def _create_xr_dataset(self) -> "xr.Dataset":
+        """
+        Create an xarray dataset from the density field.
+
+        Returns
+        -------
+        xr.Dataset
+            xarray dataset with the density field data.
+        """
+        import xarray as xr
+
+        density, labels_field = self._fields()
+        if self._geometry.Ly == 0:
+            # 1D output: drop the size-1 y dimension entirely, so consumers
+            # get n(x, t) without having to .squeeze().
+            dataset = xr.Dataset(
+                data_vars=dict(
+                    n=(["x", "t"], density[0]),
+                ),
+                coords=dict(
+                    x=(["x"], self._geometry.x),
+                    t=(["t"], self._geometry.t[slice(*self._time_window)]),
+                ),
+                attrs=dict(description="1D propagating blobs."),
+            )
+            if labels_field is not None:
+                dataset = dataset.assign(blob_labels=(["x", "t"], labels_field[0]))
+        else:
+            dataset = xr.Dataset(
+                data_vars=dict(
+                    n=(["y", "x", "t"], density),
+                ),
+                coords=dict(
+                    x=(["x"], self._geometry.x),
+                    y=(["y"], self._geometry.y),
+                    t=(["t"], self._geometry.t[slice(*self._time_window)]),
+                ),
+                attrs=dict(description="2D propagating blobs."),
+            )
+            if labels_field is not None:
+                dataset = dataset.assign(blob_labels=(["y", "x", "t"], labels_field))
+
+        return dataset
+
+    def _sum_up_blobs(
+        self,
+        blob: Blob,
+        blob_index: int,
+        speed_up: bool,
+        truncation_error: float,
+    ) -> int:
+        """
+        Sum up the contribution of a single blob to the density field.
+
+        This is the reference the other engines are checked against: the
+        blob is discretized with `Blob.discretize_blob` on all rows and time
+        steps of the fields, without any of the windows of
+        `_compute_segments`, so ``speed_up`` and ``truncation_error`` only
+        enter through the selection of the blobs of a chunk, see
+        `_active_blobs_per_chunk`.
+
+        Parameters
+        ----------
+        blob : Blob
+            Blob object.
+        blob_index : int
+            Position of the blob in the factory output; used to assign the
+            blob label when ``labels="individual"``.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+            Ignored, see above.
+        truncation_error : float
+            Amplitude below which the blob is truncated. Only used for the
+            labels, see `_label_blob`, and the work counters.
+
+        Returns
+        -------
+        int
+            Number of grid cells the blob was evaluated on.
+        """
+        _start, _stop = self._time_window
+        if self._counters.enabled:
+            self._counters.add_blobs(np.array([_stop - _start]))
+        # 1D coordinate arrays shaped to broadcast against each other as
+        # (Ny, Nx, Nt) — avoids materializing three full meshgrids.
+        x, y, t = self._grid_coordinates()
+        with self._timer.phase("discretization"):
+            _single_blob = blob.discretize_blob(
+                x=x[np.newaxis, :, np.newaxis],
+                y=y[:, np.newaxis, np.newaxis],
+                t=t[np.newaxis, np.newaxis, _start:_stop],
+                periodic_y=self._geometry.periodic_y,
+                Ly=self._geometry.Ly,
+                one_dimensional=self._one_dimensional,
+                y0=self._geometry.y0,
+            )
+        if self._counters.enabled:
+            self._count_cells(
+                _single_blob[np.newaxis],
+                np.array([0]),
+                np.array([self._geometry.Ny]),
+                truncation_error,
+            )
+        self._add_to_fields(
+            _single_blob,
+            blob_index,
+            truncation_error,
+            _start,
+            _stop,
+            0,
+            self._geometry.Ny,
+        )
+        return _single_blob.size
+
+    def _sum_up_blob_list(
+        self,
+        blobs: BlobBatch,
+        blob_indices: Sequence[int],
+        speed_up: bool,
+        truncation_error: float,
+        engine: str,
+        progress=None,
+    ):
+        """
+        Sum up the contribution of a population of blobs to the density field.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to sum up.
+        blob_indices : Sequence[int]
+            Position of each blob in the factory output; used to assign the
+            blob labels when ``labels="individual"``.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+        engine : str
+            "batched" or "per_blob", see `make_realization`.
+        progress : ProgressReporter, optional
+            Reporter advanced by one per blob summed up.
+        """
+        if engine == "batched":
+            self._sum_up_blobs_batched(
+                blobs, blob_indices, speed_up, truncation_error, progress
+            )
+            return
+        for position, blob_index in enumerate(blob_indices):
+            cells = self._sum_up_blobs(
+                blobs.to_blob(position), blob_index, speed_up, truncation_error
+            )
+            if progress is not None:
+                progress.update(1, cells)
+
+    def _sum_up_blobs_fft(self, truncation_error: float):
+        """
+        Sum up a homogeneous population of sampled blobs with FFT
+        convolutions, see `sum_up_homogeneous_blobs`.
+
+        Parameters
+        ----------
+        truncation_error : float
+            Amplitude below which the pulse kernel is truncated.
+        """
+        if not self._blobs:
+            return
+        # The support of the pulse kernel is the time window of a blob with
+        # the largest amplitude of the population, padded like all windows
+        # for the growth of the drain factor before its arrival (see
+        # `_blob_time_support`). The blob arrives at the last time step, so
+        # that the padding reaches back over all lags of the time axis.
+        t_last = self._geometry.t[-1]
+        prototype = self._blobs.take([0])
+        prototype.t_init = np.full(1, t_last)
+        prototype.amplitude = np.abs(self._blobs.amplitude).max(keepdims=True)
+        t_start, t_stop = self._blob_time_support(prototype, truncation_error)
+        with self._timer.phase("discretization"):
+            self._density += sum_up_homogeneous_blobs(
+                self._blobs,
+                self._geometry,
+                (t_start[0] - t_last, t_stop[0] - t_last),
+                self._one_dimensional,
+            )
+
+    def _sum_up_blobs_parallel(
+        self,
+        workers: int,
+        speed_up: bool,
+        truncation_error: float,
+        engine: str,
+        progress=None,
+    ):
+        """
+        Sum up the contribution of all sampled blobs to the density field on
+        a pool of worker processes.
+
+        The blobs are split into contiguous partitions (in factory order),
+        each summed up by a worker into a private density (and labels)
+        field. The fields are then reduced in partition order: the densities
+        are added up, the labels fields are combined with `np.maximum`, which
+        keeps the label of the blob that comes last in the factory output as
+        in the serial path.
+
+        Parameters
+        ----------
+        workers : int
+            Number of worker processes.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+        engine : str
+            "batched" or "per_blob", see `make_realization`.
+        progress : ProgressReporter, optional
+            Reporter advanced as partitions are completed.
+        """
+        partitions = _partition_indices(len(self._blobs), workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _sum_up_blob_partition,
+                itertools.repeat(self._worker_copy()),
+                [self._blobs.take(indices) for indices in partitions],
+                [indices.tolist() for indices in partitions],
+                itertools.repeat(speed_up),
+                itertools.repeat(truncation_error),
+                itertools.repeat(engine),
+            )
+            total_density, total_labels_field = self._fields()
+            for indices, (density, labels_field, cells) in zip(partitions, results):
+                total_density += density
+                if total_labels_field is not None and labels_field is not None:
+                    np.maximum(total_labels_field, labels_field, out=total_labels_field)
+                if progress is not None:
+                    progress.update(indices.size, cells)
+
+    def _worker_copy(self) -> "Model":
+        """
+        Copy of the model for summing up blobs outside of it, e.g. in worker
+        processes: without the blob factory (which need not be picklable),
+        the sampled blobs and the fields.
+
+        Returns
+        -------
+        Model
+            Shallow copy of the model.
+        """
+        worker_model = copy.copy(self)
+        worker_model._blob_factory = None
+        worker_model._blobs = BlobBatch.from_blobs([])
+        worker_model._density = None
+        worker_model._labels_field = None
+        worker_model._scratch = ScratchArena()
+        worker_model._timer = PhaseTimer(enabled=False)
+        worker_model._counters = WorkCounters(enabled=False)
+        worker_model._verbose = False
+        worker_model._progress = None
+        return worker_model
+
+    def _sum_up_blobs_batched(
+        self,
+        blobs: BlobBatch,
+        blob_indices: Sequence[int],
+        speed_up: bool,
+        truncation_error: float,
+        progress=None,
+    ):
+        """
+        Sum up the contribution of a population of blobs to the density
+        field, discretizing groups of compatible blobs in stacked batches.
+
+        The windows of all blobs are computed at once, split into segments
+        at the instants the blobs wrap around periodic domains (see
+        `_compute_segments`). Segments are then grouped by blob shape, shape
+        parameters and time and y window lengths (see `_batch_keys`), so that each group can be evaluated as one
+        ``(batch, y window, Nx, window)`` computation by `discretize_blobs`.
+        Each batch is then scatter-added into the density field at the
+        segments' own windows. Blobs with an empty window are skipped.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to sum up.
+        blob_indices : Sequence[int]
+            Position of each blob in the factory output; used to assign the
+            blob labels when ``labels="individual"``.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+        progress : ProgressReporter, optional
+            Reporter advanced by one per blob summed up.
+        """
+        with self._timer.phase("windows"):
+            segments = self._compute_segments(blobs, speed_up, truncation_error)
+        factory_indices = np.asarray(blob_indices)
+        # The last segment of each blob completes it for the progress.
+        completes = segments.positions[1:] != segments.positions[:-1]
+        completes = np.append(completes, True)[: len(segments.positions)]
+
+        if progress is not None:
+            # Culled blobs are done without any work.
+            progress.update(len(blobs) - np.count_nonzero(completes))
+        if self._counters.enabled:
+            self._counters.add_blobs(
+                np.bincount(
+                    segments.positions,
+                    weights=segments.stops - segments.starts,
+                    minlength=len(blobs),
+                )
+            )
+        if not completes.size:
+            return
+
+        with self._timer.phase("windows"):
+            segment_blobs = self._segment_blobs(blobs, segments)
+            windows = segments.stops - segments.starts
+            y_windows = segments.y_stops - segments.y_starts
+            keys = self._batch_keys(segment_blobs, windows, y_windows)
+            _, inverse, counts = np.unique(
+                keys, axis=0, return_inverse=True, return_counts=True
+            )
+            # Segments of each group, in factory order.
+            groups = np.split(
+                np.argsort(inverse.reshape(-1), kind="stable"),
+                np.cumsum(counts)[:-1],
+            )
+
+        x, _, t = self._grid_coordinates()
+        for group in groups:
+            window, y_window = windows[group[0]], y_windows[group[0]]
+            batch_size = max(
+                1, _MAX_BATCH_CELLS // (y_window * self._geometry.Nx * window)
+            )
+            for first in range(0, len(group), batch_size):
+                batch = group[first : first + batch_size]
+                with self._timer.phase("discretization"):
+                    _blobs = discretize_blobs(
+                        segment_blobs.take(batch),
+                        out=self._scratch.get(
+                            "blobs",
+                            (len(batch), y_window, self._geometry.Nx, window),
+                            self._dtype,
+                        ),
+                        scratch=self._scratch,
+                        x=x,
+                        y=self._window_y_coordinates(
+                            segments.y_starts[batch, np.newaxis] + np.arange(y_window)
+                        ),
+                        t=t[segments.starts[batch, np.newaxis] + np.arange(window)],
+                        Ly=self._geometry.Ly,
+                        one_dimensional=self._one_dimensional,
+                    )
+                if self._counters.enabled:
+                    self._count_cells(
+                        _blobs,
+                        segments.y_starts[batch],
+                        segments.y_stops[batch],
+                        truncation_error,
+                    )
+                for _single_blob, segment in zip(_blobs, batch):
+                    _start = segments.starts[segment]
+                    _y_start = segments.y_starts[segment]
+                    self._add_to_fields(
+                        _single_blob,
+                        factory_indices[segments.positions[segment]],
+                        truncation_error,
+                        _start,
+                        _start + window,
+                        _y_start,
+                        _y_start + y_window,
+                    )
+                if progress is not None:
+                    progress.update(np.count_nonzero(completes[batch]), _blobs.size)
+
+    def _count_cells(
+        self,
+        _blobs: np.ndarray,
+        y_starts: np.ndarray,
+        y_stops: np.ndarray,
+        truncation_error: float,
+    ):
+        """
+        Count the grid cells of a batch of discretized blobs in the work
+        counters.
+
+        Parameters
+        ----------
+        _blobs : np.ndarray
+            Discretized blobs, shape (batch, y window, Nx, window).
+        y_starts : np.ndarray
+            Start indices of the blobs' y windows, which may lie outside the
+            y-axis in periodic domains, see `_compute_periodic_y_windows`.
+        y_stops : np.ndarray
+            Stop indices of the blobs' y windows.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+        """
+        Ny = self._geometry.Ny
+        mirror_rows = np.maximum(np.minimum(y_stops, 0) - y_starts, 0) + np.maximum(
+            y_stops - np.maximum(y_starts, Ny), 0
+        )
+        self._counters.add_cells(
+            _blobs.size,
+            np.count_nonzero(np.abs(_blobs) > truncation_error),
+            mirror_rows.sum() * _blobs.shape[2] * _blobs.shape[3],
+        )
+
+    @staticmethod
+    def _batch_keys(
+        blobs: BlobBatch,
+        windows: np.ndarray,
+        y_windows: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Keys grouping the blobs that `discretize_blobs` can evaluate together.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to group.
+        windows : np.ndarray
+            Length of each blob's time window.
+        y_windows : np.ndarray
+            Length of each blob's y window.
+
+        Returns
+        -------
+        np.ndarray
+            One row per blob, equal for blobs of the same group, starting
+            with the time and y window lengths.
+        """
+        return np.column_stack(
+            [
+                windows,
+                y_windows,
+                blobs.shape_keys(),
+                # Batches of untilted blobs at rest vertically take the
+                # separable fast path of discretize_blobs.
+                blobs.is_separable,
+                blobs.v_y == 0,
+            ]
+        )
+
+    def _add_to_fields(
+        self,
+        _single_blob: np.ndarray,
+        blob_index: int,
+        truncation_error: float,
+        _start: int,
+        _stop: int,
+        _y_start: int,
+        _y_stop: int,
+    ):
+        """
+        Add a single discretized blob to the density field and mark it in
+        the labels field.
+
+        In periodic domains the y window may extend beyond the y-axis (see
+        `_compute_periodic_y_windows`); its rows are then wrapped around the
+        domain. A y window longer than the y-axis is first folded onto it,
+        so that the labels are computed from the sum of the overlapping
+        mirrors.
+
+        Parameters
+        ----------
+        _single_blob : np.ndarray
+            Discretized blob, shape (_y_stop - _y_start, Nx, _stop - _start).
+        blob_index : int
+            Position of the blob in the factory output.
+        truncation_error : float
+            Amplitude below which the blob is truncated, see `_label_blob`.
+        _start : int
+            Start index of the blob's time window.
+        _stop : int
+            Stop index of the blob's time window.
+        _y_start : int
+            Start index of the blob's y window.
+        _y_stop : int
+            Stop index of the blob's y window.
+        """
+        Ny = self._geometry.Ny
+        density, _ = self._fields()
+        with self._timer.phase("accumulation"):
+            if _y_stop - _y_start > Ny:
+                folded = np.zeros((Ny,) + _single_blob.shape[1:], _single_blob.dtype)
+                for rows, window_rows in self._row_blocks(_y_start, _y_stop):
+                    folded[rows] += _single_blob[window_rows]
+                _single_blob, _y_start, _y_stop = folded, 0, Ny
+            offset = self._time_window[0]
+            for rows, window_rows in self._row_blocks(_y_start, _y_stop):
+                density[rows, :, _start - offset : _stop - offset] += _single_blob[
+                    window_rows
+                ]
+        self._label_blob(
+            _single_blob, blob_index, truncation_error, _start, _stop, _y_start, _y_stop
+        )
+
+    def _row_blocks(self, _y_start: int, _y_stop: int) -> List[Tuple[slice, slice]]:
+        """
+        Split a y window, which may extend beyond the y-axis in periodic
+        domains, into blocks of consecutive rows of the y-axis.
+
+        Parameters
+        ----------
+        _y_start : int
+            Start index of the y window.
+        _y_stop : int
+            Stop index of the y window.
+
+        Returns
+        -------
+        List[Tuple[slice, slice]]
+            The rows of each block on the y-axis and in the y window.
+        """
+        Ny = self._geometry.Ny
+        blocks = []
+        row = _y_start
+        while row < _y_stop:
+            block_stop = min(_y_stop, (row // Ny + 1) * Ny)
+            blocks.append(
+                (
+                    slice(row % Ny, row % Ny + block_stop - row),
+                    slice(row - _y_start, block_stop - _y_start),
+                )
+            )
+            row = block_stop
+        return blocks
+
+    def _window_y_coordinates(self, rows: np.ndarray) -> np.ndarray:
+        """
+        The y coordinates of rows of y windows, continued periodically by
+        multiples of Ly beyond the y-axis, in the model's dtype.
+        """
+        Ny, Ly = self._geometry.Ny, self._geometry.Ly
+        _, y, _ = self._grid_coordinates()
+        if Ny == 0 or (np.all(rows >= 0) and np.all(rows < Ny)):
+            return y[rows]
+        return (y[rows % Ny] + (rows // Ny) * Ly).astype(y.dtype)
+
+    def _label_blob(
+        self,
+        _single_blob: np.ndarray,
+        blob_index: int,
+        truncation_error: float,
+        _start: int,
+        _stop: int,
+        _y_start: int = 0,
+        _y_stop: Union[int, None] = None,
+    ):
+        """
+        Mark the region of a single discretized blob in the labels field.
+
+        The region of the blob is where its density is at least
+        ``label_border`` times its maximum over the grid at the same time,
+        and at least ``truncation_error``. The latter keeps the labels
+        independent of the windows the blob is discretized on, which leave
+        out the times and rows where the blob is below ``truncation_error``
+        when ``speed_up`` is enabled. With ``labels="individual"``
+        overlapping regions keep the highest label, i.e. the blob that comes
+        last in the factory output, no matter in which order the blobs are
+        summed up.
+
+        Parameters
+        ----------
+        _single_blob : np.ndarray
+            Discretized blob, shape (_y_stop - _y_start, Nx, _stop - _start).
+        blob_index : int
+            Position of the blob in the factory output.
+        truncation_error : float
+            Density below which no cell is labeled.
+        _start : int
+            Start index of the blob's time window on the time axis of the
+            geometry.
+        _stop : int
+            Stop index of the blob's time window on the time axis of the
+            geometry.
+        _y_start : int, optional
+            Start index of the blob's y window, which may lie below the
+            y-axis in periodic domains, see `_row_blocks`.
+        _y_stop : int, optional
+            Stop index of the blob's y window, by default Ny. At most Ny
+            rows after `_y_start`.
+        """
+        _, labels_field = self._fields()
+        if labels_field is None:
+            return
+        with self._timer.phase("labels"):
+            if _y_stop is None:
+                _y_stop = self._geometry.Ny
+            __max_amplitudes = np.max(_single_blob, axis=(0, 1))
+            __max_amplitudes[__max_amplitudes == 0] = np.inf
+            __region = _single_blob >= np.maximum(
+                __max_amplitudes * self._label_border, truncation_error
+            )
+            offset = self._time_window[0]
+            for rows, window_rows in self._row_blocks(_y_start, _y_stop):
+                _labels_field = labels_field[rows, :, _start - offset : _stop - offset]
+                _region = __region[window_rows]
+                if self._labels == "same":
+                    _labels_field[_region] = 1
+                else:
+                    _labels_field[_region] = np.maximum(
+                        _labels_field[_region], blob_index + 1
+                    )
+
+    def _compute_windows(
+        self,
+        blobs: BlobBatch,
+        speed_up: bool,
+        truncation_error: float,
+        x_range: Union[Tuple[float, float], None] = None,
+        y_range: Union[Tuple[float, float], None] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the start and stop indices of the time windows of all blobs
+        of a population.
+
+        With ``speed_up``, a window covers the times the blob overlaps the
+        domain along x and, unless the domain is periodic along y or the
+        model one-dimensional, along y (see `_blob_time_support`), including
+        the growth of the drain factor before ``t_init``. It ends once the
+        drained amplitude has fallen below ``truncation_error`` (see
+        `_blob_drain_end`).
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to compute the windows of.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+        x_range : Tuple[float, float], optional
+            Interval along x the blobs are evaluated on, by default the
+            domain of the geometry, see `_blob_time_support`.
+        y_range : Tuple[float, float], optional
+            Interval along y the blobs are evaluated on, by default the
+            domain of the geometry, see `_blob_time_support`.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Start and stop indices, shape (num_blobs,) each.
+        """
+        num_steps = self._geometry.t.size
+        starts = np.zeros(len(blobs), dtype=int)
+        stops = np.full(len(blobs), num_steps)
+        if not speed_up or len(blobs) == 0:
+            return starts, stops
+
+        if self._geometry.periodic_y or self._one_dimensional:
+            y_range = None
+        elif y_range is None:
+            y_range = (self._geometry.y[0], self._geometry.y[0] + self._geometry.Ly)
+        dt, t0 = self._geometry.dt, self._geometry.t[0]
+        t_start, t_stop = self._blob_time_support(
+            blobs, truncation_error, x_range, y_range
+        )
+        t_stop = np.fmin(t_stop, self._blob_drain_end(blobs, truncation_error))
+        starts = np.clip(np.ceil((t_start - t0) / dt), 0, num_steps)
+        stops = np.clip(np.floor((t_stop - t0) / dt) + 1, starts, num_steps)
+        return starts.astype(int), stops.astype(int)
+
+    def _clip_to_time_window(
+        self, start: np.ndarray, stop: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Restrict blob time windows to the time window covered by the
+        fields (the whole time axis unless a chunk is being summed up, see
+        `_reset_fields`).
+
+        The y window is computed from the unrestricted time window, which
+        keeps chunked realizations identical to whole ones.
+
+        Parameters
+        ----------
+        start : np.ndarray
+            Start indices of the blob time windows.
+        stop : np.ndarray
+            Stop indices of the blob time windows.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Start and stop indices, empty (start == stop) where the windows
+            do not overlap.
+        """
+        window_start, window_stop = self._time_window
+        start = np.minimum(np.maximum(start, window_start), window_stop)
+        return start, np.maximum(np.minimum(stop, window_stop), start)
+
+    def _blob_time_support(
+        self,
+        blobs: BlobBatch,
+        truncation_error: float,
+        x_range: Union[Tuple[float, float], None] = None,
+        y_range: Union[Tuple[float, float], None] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the time intervals during which the blobs contribute more
+        than ``truncation_error`` to the domain along x and, if ``y_range``
+        is given, along y.
+
+        Along each direction, the blob centre has to be within the support
+        of the blob shape (see `BlobBatch.get_support`) of the interval, for
+        the tolerance ``truncation_error`` relative to the drained amplitude
+        (see `_blob_gain`). A blob at rest along a direction either always or
+        never is.
+
+        Before ``t_init`` the drain factor grows backwards in time, by
+        ``exp(distance / (|v| * t_drain))`` over the distance the blob
+        travels, so the leading flank of an arriving blob is the fixed point
+        of ``distance = support(tolerance * exp(-distance / (|v| * t_drain)))``.
+        It is found by iteration over the tolerance levels of
+        `BlobBatch.get_support`, which stops early once the blob would enter
+        before the first time step.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to compute the intervals of.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+        x_range : Tuple[float, float], optional
+            Interval along x the blobs are evaluated on, by default the
+            domain of the geometry, ``(x[0], x[0] + Lx)``.
+        y_range : Tuple[float, float], optional
+            Interval along y the blobs are evaluated on, by default the
+            blobs are not restricted along y.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Start and end times, not restricted to the time grid. Infinite
+            for blobs at rest within the intervals, and empty (start after
+            end) for blobs that never reach them.
+        """
+        if x_range is None:
+            x_range = (self._geometry.x[0], self._geometry.x[0] + self._geometry.Lx)
+        t0 = self._geometry.t[0]
+        t_drain = (
+            blobs.t_drain.min(axis=1) if blobs.t_drain.ndim == 2 else blobs.t_drain
+        )
+
+        def crossing(axis, pos_0, v, interval):
+            speed = np.abs(v)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_edges = (
+                    blobs.t_init[:, np.newaxis]
+                    + (np.array(interval)[np.newaxis, :] - pos_0[:, np.newaxis])
+                    / v[:, np.newaxis]
+                )
+            # Times the blob centre enters and leaves the interval.
+            t_in, t_out = np.fmin(*t_edges.T), np.fmax(*t_edges.T)
+
+            def flanks(tolerance, members=None):
+                # Offsets of the leading and the trailing edge of the blobs
+                # (or of the members) from their centres, in their direction
+                # of motion.
+                subset = blobs if members is None else blobs.take(members)
+                lo, hi = subset.get_support(tolerance)[axis]
+                forward = (v if members is None else v[members]) >= 0
+                return np.where(forward, hi, -lo), np.where(forward, -lo, hi)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                tolerance = truncation_error / self._blob_gain(blobs, t_in)
+                leading, _ = flanks(tolerance)
+                _, trailing = flanks(truncation_error / self._blob_gain(blobs, t_out))
+                pending = np.flatnonzero(
+                    (t_in - leading / speed > t0) & (t_drain < np.inf)
+                )
+                while pending.size:
+                    previous = leading[pending]
+                    leading[pending], _ = flanks(
+                        tolerance[pending]
+                        * np.exp(-previous / (speed[pending] * t_drain[pending])),
+                        pending,
+                    )
+                    pending = pending[
+                        (leading[pending] > previous)
+                        & (t_in[pending] - leading[pending] / speed[pending] > t0)
+                    ]
+                t_start = t_in - leading / speed
+                t_stop = t_out + trailing / speed
+
+            # Blobs at rest are bounded by their largest drained amplitude,
+            # at the first time step.
+            at_rest = np.flatnonzero(v == 0)
+            if at_rest.size:
+                resting = blobs.take(at_rest)
+                with np.errstate(divide="ignore"):
+                    lo, hi = resting.get_support(
+                        truncation_error
+                        / self._blob_gain(resting, np.full(at_rest.size, t0))
+                    )[axis]
+                inside = (pos_0[at_rest] >= interval[0] - hi) & (
+                    pos_0[at_rest] <= interval[1] - lo
+                )
+                t_start[at_rest] = np.where(inside, -np.inf, np.inf)
+                t_stop[at_rest] = np.where(inside, np.inf, -np.inf)
+            return t_start, t_stop
+
+        t_start, t_stop = crossing(0, blobs.pos_x0, blobs.v_x, x_range)
+        if y_range is not None:
+            y_start, y_stop = crossing(1, blobs.pos_y0, blobs.v_y, y_range)
+            t_start, t_stop = np.maximum(t_start, y_start), np.minimum(t_stop, y_stop)
+        return t_start, t_stop
+
+    @staticmethod
+    def _blob_gain(blobs: BlobBatch, t: np.ndarray) -> np.ndarray:
+        """
+        Compute bounds on the drained amplitudes of the blobs,
+        ``|amplitude| * exp(-(t' - t_init) / t_drain)``, at all times
+        ``t' >= t``.
+
+        The drain factor exceeds 1 before ``t_init``, where drain times
+        varying along x are bounded by their minimum, which grows fastest.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to compute the bounds of.
+        t : np.ndarray
+            Times, shape (num_blobs,).
+
+        Returns
+        -------
+        np.ndarray
+            Bounds, shape (num_blobs,). Infinite where they overflow.
+        """
+        t_drain = (
+            blobs.t_drain.min(axis=1) if blobs.t_drain.ndim == 2 else blobs.t_drain
+        )
+        with np.errstate(over="ignore", invalid="ignore"):
+            growth = np.exp(np.maximum(blobs.t_init - t, 0) / t_drain)
+            gain = np.abs(blobs.amplitude) * np.where(np.isinf(t_drain), 1.0, growth)
+        return np.nan_to_num(gain, nan=np.inf, posinf=np.inf)
+
+    @staticmethod
+    def _blob_drain_end(blobs: BlobBatch, truncation_error: float) -> np.ndarray:
+        """
+        Compute the times after which the drained amplitudes of the blobs,
+        ``|amplitude| * exp(-(t - t_init) / t_drain)``, stay below
+        ``truncation_error``.
+
+        Drain times varying along x are bounded by their maximum, which
+        drains slowest.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to compute the times of.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+
+        Returns
+        -------
+        np.ndarray
+            End times, not restricted to the time grid. Infinite for blobs
+            that do not drain (``t_drain == inf``).
+        """
+        t_drain = (
+            blobs.t_drain.max(axis=1) if blobs.t_drain.ndim == 2 else blobs.t_drain
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_ratio = np.log(np.abs(blobs.amplitude) / truncation_error)
+            return np.where(
+                np.isinf(t_drain), np.inf, blobs.t_init + t_drain * log_ratio
+            )
+
+    def _compute_y_windows(
+        self,
+        blobs: BlobBatch,
+        starts: np.ndarray,
+        stops: np.ndarray,
+        speed_up: bool,
+        truncation_error: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the start and stop indices along y of the rows the blobs
+        contribute to during their time windows.
+
+        The centre of a blob moves from ``pos_y(t[start])`` to
+        ``pos_y(t[stop - 1])``; the rows within the blob's support along y
+        (see `BlobBatch.get_support`) of that path are kept, for the
+        tolerance relative to the largest drained amplitude in the window
+        (see `_blob_gain`).
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to compute the windows of.
+        starts : np.ndarray
+            Start indices of the blobs' time windows.
+        stops : np.ndarray
+            Stop indices of the blobs' time windows.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller y window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Start and stop indices, shape (num_blobs,) each. A window is
+            empty (start == stop) if the blob never enters the domain
+            vertically. The whole y-axis is returned for empty time windows,
+            for periodic, one-dimensional and zero-width (Ly = 0) domains, or
+            if ``speed_up`` is disabled.
+        """
+        Ny = self._geometry.Ny
+        y_starts = np.zeros(len(blobs), dtype=int)
+        y_stops = np.full(len(blobs), Ny)
+        if (
+            not speed_up
+            or self._geometry.periodic_y
+            or self._one_dimensional
+            or self._geometry.Ly == 0
+        ):
+            return y_starts, y_stops
+        nonempty = np.flatnonzero(stops > starts)
+        if nonempty.size == 0:
+            return y_starts, y_stops
+
+        blobs = blobs.take(nonempty)
+        t = self._geometry.t
+        pos_y = blobs.pos_y0[:, np.newaxis] + blobs.v_y[:, np.newaxis] * (
+            t[np.column_stack([starts[nonempty], stops[nonempty] - 1])]
+            - blobs.t_init[:, np.newaxis]
+        )
+        with np.errstate(divide="ignore"):
+            _, (y_lo, y_hi) = blobs.get_support(
+                truncation_error / self._blob_gain(blobs, t[starts[nonempty]])
+            )
+        dy, y_first = self._geometry.Ly / Ny, self._geometry.y[0]
+        y_starts[nonempty] = np.clip(
+            np.ceil((pos_y.min(axis=1) + y_lo - y_first) / dy), 0, Ny
+        )
+        y_stops[nonempty] = np.clip(
+            np.floor((pos_y.max(axis=1) + y_hi - y_first) / dy) + 1,
+            y_starts[nonempty],
+            Ny,
+        )
+        return y_starts, y_stops
+
+    def _compute_segments(
+        self, blobs: BlobBatch, speed_up: bool, truncation_error: float
+    ) -> _Segments:
+        """
+        Split the time windows of the blobs into the segments they are
+        summed up in.
+
+        Without periodicity along y, every blob is one segment with the time
+        window of `_compute_windows` and the y window of `_compute_y_windows`.
+        In periodic domains, the time window of a blob is split at the
+        instants its centre wraps around the domain (see `_split_at_wraps`).
+        Within a segment the blob is displaced by a fixed number of domain
+        lengths, and its y window may extend beyond the y-axis, so that the
+        mirrors at ``-Ly`` and ``+Ly`` are only evaluated on the rows they
+        reach (see `_compute_periodic_y_windows`).
+
+        The segments are computed from the unrestricted time windows and then
+        restricted to the time window of the fields, which keeps chunked
+        realizations identical to whole ones. Empty segments are dropped.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to compute the segments of.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller time window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+
+        Returns
+        -------
+        _Segments
+            For each segment, ordered by blob and time: the position of its
+            blob in `blobs`, the start and stop indices of its time and y
+            windows, and the number of domain lengths ``wraps`` subtracted
+            from the vertical position of the blob.
+        """
+        starts, stops = self._compute_windows(blobs, speed_up, truncation_error)
+        if self._geometry.periodic_y and not self._one_dimensional:
+            positions, starts, stops, wraps = self._split_at_wraps(blobs, starts, stops)
+            y_starts, y_stops = self._compute_periodic_y_windows(
+                blobs.take(positions),
+                starts,
+                stops,
+                wraps,
+                speed_up,
+                truncation_error,
+            )
+        else:
+            y_starts, y_stops = self._compute_y_windows(
+                blobs, starts, stops, speed_up, truncation_error
+            )
+            positions = np.arange(len(blobs))
+            wraps = np.zeros(len(blobs), dtype=int)
+        starts, stops = self._clip_to_time_window(starts, stops)
+        nonempty = (stops > starts) & (y_stops > y_starts)
+        return _Segments(
+            *(
+                column[nonempty]
+                for column in (positions, starts, stops, y_starts, y_stops, wraps)
+            )
+        )
+
+    def _split_at_wraps(
+        self, blobs: BlobBatch, starts: np.ndarray, stops: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Split the time windows of the blobs at the instants their centres
+        wrap around the periodic y-axis.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to split the windows of.
+        starts : np.ndarray
+            Start indices of the blobs' time windows.
+        stops : np.ndarray
+            Stop indices of the blobs' time windows.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+            Position of the blob of each piece, start and stop indices of the
+            pieces, and the number of domain lengths ``wraps`` to subtract
+            from the vertical position of the blob, such that its centre lies
+            in the domain ``[y0, y0 + Ly)`` during the piece (up to the
+            rounding of the wrap instants to the time grid).
+        """
+        Ly, y0 = self._geometry.Ly, self._geometry.y0
+        t, dt = self._geometry.t, self._geometry.dt
+
+        def wraps_at(indices: np.ndarray) -> np.ndarray:
+            pos_y = blobs.pos_y0 + blobs.v_y * (t[indices] - blobs.t_init)
+            return np.floor((pos_y - y0) / Ly).astype(int)
+
+        first_wraps = wraps_at(np.minimum(starts, t.size - 1))
+        last_wraps = np.where(
+            stops > starts, wraps_at(np.clip(stops - 1, 0, t.size - 1)), first_wraps
+        )
+        counts = np.abs(last_wraps - first_wraps) + 1
+        positions = np.repeat(np.arange(len(blobs)), counts)
+        # Number of wraps since the start of the window.
+        index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        direction = np.sign(last_wraps - first_wraps)[positions]
+        wraps = first_wraps[positions] + direction * index
+
+        # The centre enters a piece through y0 + wraps * Ly when moving up,
+        # through y0 + (wraps + 1) * Ly when moving down.
+        level = y0 + (wraps + (direction < 0)) * Ly
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = (
+                blobs.t_init[positions]
+                + (level - blobs.pos_y0[positions]) / blobs.v_y[positions]
+            )
+            piece_starts = np.where(
+                index == 0,
+                starts[positions],
+                np.clip(
+                    np.ceil((crossing - t[0]) / dt),
+                    starts[positions],
+                    stops[positions],
+                ),
+            ).astype(int)
+        piece_stops = np.append(piece_starts[1:], 0)
+        last = np.append(positions[1:] != positions[:-1], True)
+        piece_stops[last] = stops[positions[last]]
+        return positions, piece_starts, piece_stops, wraps
+
+    def _compute_periodic_y_windows(
+        self,
+        blobs: BlobBatch,
+        starts: np.ndarray,
+        stops: np.ndarray,
+        wraps: np.ndarray,
+        speed_up: bool,
+        truncation_error: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the y windows of blobs in a periodic domain.
+
+        The y windows are given in rows of the y-axis continued periodically
+        beyond the domain, from ``-Ny`` to ``2 * Ny``, which hold the mirrors
+        of the blob at ``-Ly`` and ``+Ly``. The centre of a blob, displaced by
+        ``-wraps * Ly``, moves from ``pos_y(t[start])`` to
+        ``pos_y(t[stop - 1])``; the y window covers the rows within its
+        support along y (see `BlobBatch.get_support`) of that path, such that
+        a mirror is only evaluated on the rows it reaches. The rows are
+        wrapped back onto the y-axis when the blob is added to the fields,
+        see `_add_to_fields`.
+
+        Parameters
+        ----------
+        blobs : BlobBatch
+            Blobs to compute the windows of.
+        starts : np.ndarray
+            Start indices of the blobs' time windows.
+        stops : np.ndarray
+            Stop indices of the blobs' time windows.
+        wraps : np.ndarray
+            Number of domain lengths subtracted from the vertical positions.
+        speed_up : bool
+            Flag for speeding up the code by discretizing each single blob at a smaller y window.
+        truncation_error : float
+            Amplitude below which the blob is truncated.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Start and stop indices of the y windows, between ``-Ny`` and
+            ``2 * Ny``. Without ``speed_up`` the y windows cover the y-axis
+            and both mirrors.
+        """
+        Ny, Ly = self._geometry.Ny, self._geometry.Ly
+        if not speed_up:
+            return np.full(len(blobs), -Ny), np.full(len(blobs), 2 * Ny)
+        t = self._geometry.t
+        first = np.minimum(starts, t.size - 1)
+        last = np.clip(stops - 1, first, t.size - 1)
+        pos_y = (blobs.pos_y0 - wraps * Ly)[:, np.newaxis] + blobs.v_y[
+            :, np.newaxis
+        ] * (t[np.column_stack([first, last])] - blobs.t_init[:, np.newaxis])
+        with np.errstate(divide="ignore"):
+            _, (y_lo, y_hi) = blobs.get_support(
+                truncation_error / self._blob_gain(blobs, t[first])
+            )
+        dy, y_first = Ly / Ny, self._geometry.y[0]
+        y_starts = np.clip(
+            np.ceil((pos_y.min(axis=1) + y_lo - y_first) / dy), -Ny, 2 * Ny
+        )
+        y_stops = np.clip(
+            np.floor((pos_y.max(axis=1) + y_hi - y_first) / dy) + 1,
+            y_starts,
+            2 * Ny,
+        )
+        return y_starts.astype(int), y_stops.astype(int)
+
+    def _segment_blobs(self, blobs: BlobBatch, segments: _Segments) -> BlobBatch:
+        """
+        The blob of each segment, displaced vertically by the segment's
+        number of wraps around the domain, see `_compute_segments`.
+        """
+        segment_blobs = blobs.take(segments.positions)
+        segment_blobs.pos_y0 = segment_blobs.pos_y0 - segments.wraps * self._geometry.Ly
+        return segment_blobs
+
+    def _grid_coordinates(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The x, y and t coordinates of the geometry in the model's dtype."""
+        x, y, t = (
+            coordinate.astype(self._dtype, copy=False)
+            for coordinate in (self._geometry.x, self._geometry.y, self._geometry.t)
+        )
+        return x, y, t
+
+    def _fields(self) -> Tuple[np.ndarray, Union[np.ndarray, None]]:
+        """
+        The density and labels fields the blobs are summed up into.
+
+        Returns
+        -------
+        Tuple[np.ndarray, Union[np.ndarray, None]]
+            Density field and labels field, None if labels are off.
+
+        Raises
+        ------
+        RuntimeError
+            If the fields have not been allocated, see `_reset_fields`.
+        """
+        if self._density is None:
+            raise RuntimeError("No fields have been allocated by a realization yet.")
+        return self._density, self._labels_field
+
+    def _reset_fields(self, start: int = 0, stop: Union[int, None] = None):
+        """
+        Reset the density and labels fields.
+
+        Parameters
+        ----------
+        start : int, optional
+            Index of the first time step covered by the fields, by default 0.
+        stop : int, optional
+            Index one past the last time step covered by the fields, by
+            default the end of the time axis. Blobs are only summed up within
+            this time window, see `_compute_windows`.
+        """
+        if stop is None:
+            stop = self._geometry.t.size
+        self._time_window = (start, stop)
+        self._density = np.zeros(
+            shape=(self._geometry.Ny, self._geometry.Nx, stop - start),
+            dtype=self._dtype,
+        )
+        self._labels_field = (
+            np.zeros(
+                shape=(self._geometry.Ny, self._geometry.Nx, stop - start),
+                dtype=self._dtype,
+            )
+            if self._labels in {"same", "individual"}
+            else None
+        )
+
+
+def _partition_indices(num_blobs: int, workers: int) -> List[np.ndarray]:
+    """
+    Split the indices of the blobs into the contiguous partitions summed up
+    by the workers of `Model._sum_up_blobs_parallel`. A few partitions per
+    worker balance the load and give the progress some granularity.
+
+    Returns
+    -------
+    List[np.ndarray]
+        Non-empty arrays of blob indices, in factory order.
+    """
+    num_partitions = max(1, min(num_blobs, _PARTITIONS_PER_WORKER * workers))
+    return [
+        indices
+        for indices in np.array_split(np.arange(num_blobs), num_partitions)
+        if indices.size > 0
+    ]
+
+
+def _sum_up_blob_partition(
+    model: Model,
+    blobs: BlobBatch,
+    blob_indices: List[int],
+    speed_up: bool,
+    truncation_error: float,
+    engine: str,
+    start: int = 0,
+    stop: Union[int, None] = None,
+) -> Tuple[np.ndarray, Union[np.ndarray, None], int]:
+    """
+    Sum up a partition of the blobs into fresh fields of `model`, covering
+    the time steps from `start` to `stop`.
+
+    Runs in a worker process of `Model._sum_up_blobs_parallel` and computes
+    the chunks of lazy realizations, possibly in several threads at once, so
+    the fields are reset on a copy of `model`.
+
+    Returns
+    -------
+    Tuple[np.ndarray, Union[np.ndarray, None], int]
+        Density field, labels field (None if labels are off) and number of
+        grid cells the blobs were evaluated on.
+    """
+    model = copy.copy(model)
+    model._scratch = ScratchArena()
+    model._reset_fields(start, stop)
+    progress = SilentReporter()
+    progress.start(len(blob_indices), "Summing up Blobs")
+    model._sum_up_blob_list(
+        blobs, blob_indices, speed_up, truncation_error, engine, progress
+    )
+    density, labels_field = model._fields()
+    return density, labels_field, progress.cells
+
+
+def _run_ensemble_partition(
+    model: Model,
+    blob_factory: BlobFactory,
+    seed_sequences: List[np.random.SeedSequence],
+    reducers: Sequence[Reducer],
+    realization_kwargs: dict,
+) -> List[Reducer]:
+    """
+    Stream the realizations of a partition of an ensemble, sampled from a
+    copy of `blob_factory`, into fresh copies of `reducers`.
+
+    Runs in a worker process of `Model.run_ensemble`.
+
+    Returns
+    -------
+    List[Reducer]
+        Reducers filled with the realizations of the partition.
+    """
+    model = copy.copy(model)
+    blob_factory = copy.deepcopy(blob_factory)
+    model._blob_factory = blob_factory
+    partition_reducers = copy.deepcopy(list(reducers))
+    for seed_sequence in seed_sequences:
+        blob_factory.set_rng(np.random.default_rng(seed_sequence))
+        dataset = model.make_realization(**realization_kwargs)
+        for reducer in partition_reducers:
+            reducer.update(dataset)
+    return partition_reducers
+
+
+def _write_chunks_to_netcdf(
+    chunks: Iterator["xr.Dataset"], file_name: str, time_dimension: str
+):
+    """
+    Write consecutive chunks of a realization along the time dimension to a
+    netCDF file.
+
+    The first chunk creates the file through xarray, with an unlimited time
+    dimension; the variables along the time dimension of the following
+    chunks are appended with netCDF4, so that only one chunk is held in
+    memory at a time.
+
+    Parameters
+    ----------
+    chunks : Iterator[xr.Dataset]
+        Datasets sharing all variables and coordinates but those along the
+        time dimension, in time order.
+    file_name : str
+        Name of the netCDF file, overwritten if it exists.
+    time_dimension : str
+        Name of the time dimension.
+    """
+    import netCDF4
+
+    chunks = iter(chunks)
+    first = next(chunks)
+    first.to_netcdf(file_name, unlimited_dims=[time_dimension])
+    written = first.sizes[time_dimension]
+    with netCDF4.Dataset(file_name, "a") as file:
+        for chunk in chunks:
+            size = chunk.sizes[time_dimension]
+            for name, variable in chunk.variables.items():
+                if time_dimension not in variable.dims:
+                    continue
+                index = tuple(
+                    (
+                        slice(written, written + size)
+                        if dimension == time_dimension
+                        else slice(None)
+                    )
+                    for dimension in variable.dims
+                )
+                file.variables[str(name)][index] = variable.values
+            written += size
+
+
+def to_imaging_dataset(dataset: "xr.Dataset") -> "xr.Dataset":
+    """
+    Convert a blobmodel output dataset to the GPI/APD imaging format.
+
+    Downstream analysis tooling for experimental gas-puff-imaging (GPI) and
+    avalanche-photodiode (APD) data standardizes on a dataset with the density
+    stored as ``frames(y, x, time)`` and the grid stored as two-dimensional
+    coordinate arrays ``R(y, x)``, ``Z(y, x)``. This helper converts the
+    default blobmodel output ``n(y, x, t)`` (1D coordinates ``x``, ``y``,
+    ``t``) into that format. It is also available directly from the model via
+    ``make_realization(..., layout="imaging")``.
+
+    Parameters
+    ----------
+    dataset : xr.Dataset
+        Dataset as returned by `Model.make_realization` with the default
+        layout. Must be two-dimensional, i.e. contain a `y` coordinate.
+        A `blob_labels` variable, if present, is carried over.
+
+    Returns
+    -------
+    xr.Dataset
+        Dataset with the density as `frames` with dimension order
+        (y, x, time), coordinates `R` and `Z` of shape (Ny, Nx) holding the
+        meshgrid of the `x` and `y` coordinates, and the coordinate `time`.
+
+    Raises
+    ------
+    ValueError
+        If the dataset has no `y` coordinate (one-dimensional model output).
+    """
+    import xarray as xr
 
-    Raises
-    ------
-    ValueError
-        If the dataset has no `y` coordinate (one-dimensional model output).
-    """
     if "y" not in dataset.coords:
         raise ValueError(
             "The imaging layout requires two-dimensional model output "
             "with a y coordinate."
         )
     grid_r, grid_z = np.meshgrid(dataset.x.values, dataset.y.values)
-    data_vars = {"frames": (["y", "x", "time"], dataset.n.values)}
+    data_vars = {"frames": (["y", "x", "time"], dataset.n.data)}
     if "blob_labels" in dataset:
-        data_vars["blob_labels"] = (["y", "x", "time"], dataset.blob_labels.values)
+        data_vars["blob_labels"] = (["y", "x", "time"], dataset.blob_labels.data)
     return xr.Dataset(
         data_vars,
         coords={
@@ -1,14 +1,14 @@
 """This module provides functions to create and display animations of model output."""
 
 from typing import Union, Any, TYPE_CHECKING
-import xarray as xr
 
 if TYPE_CHECKING:
+    import xarray as xr
     from matplotlib import animation
 
 
 def show_model(
-    dataset: xr.Dataset,
+    dataset: "xr.Dataset",
     variable: str = "n",
     interval: int = 100,
     gif_name: Union[str, None] = None,
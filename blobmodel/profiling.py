@@ -0,0 +1,256 @@
+"""This module defines the instrumentation recording where the time and work of a realization are spent."""
+
+import contextlib
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+import numpy as np
+
+
+class PhaseTimer:
+    """
+    Records the wall time and number of calls of the phases of a
+    realization, e.g. the blob sampling, the discretization of the blobs or
+    the netCDF write, see ``profile`` in `Model.make_realization`.
+
+    Phases may be nested: the time of a phase excludes the time spent in the
+    phases entered within it, so that the times of all phases add up to the
+    time spent in any of them.
+
+    A disabled timer records nothing, and entering its phases costs no more
+    than entering an empty context manager.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """
+        Initialize an empty timer.
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            If False, phases are not recorded. True by default.
+        """
+        self.enabled = enabled
+        self._seconds: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        # Phases currently entered, innermost last, and the time the
+        # innermost phase was (re)entered.
+        self._stack: List[str] = []
+        self._resumed = 0.0
+
+    def phase(self, name: str) -> contextlib.AbstractContextManager:
+        """
+        Context manager recording the time spent in a phase.
+
+        Parameters
+        ----------
+        name : str
+            Name of the phase.
+
+        Returns
+        -------
+        contextlib.AbstractContextManager
+            Context manager timing the code run within it.
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._record(name)
+
+    @contextlib.contextmanager
+    def _record(self, name: str) -> Iterator[None]:
+        self._pause()
+        self._stack.append(name)
+        self._calls[name] = self._calls.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            self._pause()
+            self._stack.pop()
+
+    def _pause(self):
+        """Add the time since the innermost phase was (re)entered to it."""
+        now = time.perf_counter()
+        if self._stack:
+            name = self._stack[-1]
+            self._seconds[name] = self._seconds.get(name, 0.0) + now - self._resumed
+        self._resumed = now
+
+    @property
+    def total(self) -> float:
+        """Wall time spent in all phases, in seconds."""
+        return sum(self._seconds.values())
+
+    def report(self) -> Dict[str, Tuple[float, int]]:
+        """
+        The recorded phases.
+
+        Returns
+        -------
+        Dict[str, Tuple[float, int]]
+            Wall time, in seconds, and number of calls of each phase, in the
+            order the phases were first entered.
+        """
+        return {
+            name: (self._seconds.get(name, 0.0), calls)
+            for name, calls in self._calls.items()
+        }
+
+    def __str__(self) -> str:
+        total = self.total
+        lines = [f"{'phase':<16}{'seconds':>10}{'share':>8}{'calls':>10}"]
+        for name, (seconds, calls) in sorted(
+            self.report().items(), key=lambda item: -item[1][0]
+        ):
+            share = seconds / total if total > 0 else 0.0
+            lines.append(f"{name:<16}{seconds:>10.4f}{share:>8.1%}{calls:>10}")
+        lines.append(f"{'total':<16}{total:>10.4f}")
+        return "\n".join(lines)
+
+
+class WorkCounters:
+    """
+    Counts the work done to sum up the blobs of a realization, to measure
+    how well the truncation of the blobs to their time and y windows (see
+    ``speed_up`` in `Model.make_realization`) avoids evaluating them where
+    they are negligible, see ``profile`` in `Model.make_realization`.
+
+    The counters are:
+
+    - ``num_blobs``: number of blobs summed up,
+    - ``culled_blobs``: number of blobs with an empty window, which are
+      skipped entirely,
+    - ``cells_evaluated``: number of grid cells (y, x, t) the blobs are
+      evaluated on, i.e. the sum of the window sizes times Nx,
+    - ``cells_above_truncation``: number of these cells where the blob
+      exceeds the truncation error,
+    - ``mirror_cells``: number of evaluated cells on rows of the mirrors of
+      blobs in periodic domains,
+    - ``window_lengths``: number of time steps each blob is evaluated on.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """
+        Initialize zeroed counters.
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            If False, the model does not record any work. True by default.
+        """
+        self.enabled = enabled
+        self.num_blobs = 0
+        self.culled_blobs = 0
+        self.cells_evaluated = 0
+        self.cells_above_truncation = 0
+        self.mirror_cells = 0
+        self._window_lengths: List[np.ndarray] = []
+
+    def add_blobs(self, window_lengths: np.ndarray) -> None:
+        """
+        Count blobs about to be summed up.
+
+        Parameters
+        ----------
+        window_lengths : np.ndarray
+            Number of time steps each blob is evaluated on, 0 for blobs that
+            are culled.
+        """
+        window_lengths = np.asarray(window_lengths, dtype=int)
+        self.num_blobs += window_lengths.size
+        self.culled_blobs += int(np.count_nonzero(window_lengths == 0))
+        self._window_lengths.append(window_lengths)
+
+    def add_cells(self, evaluated: int, above_truncation: int, mirrors: int) -> None:
+        """
+        Count evaluated grid cells.
+
+        Parameters
+        ----------
+        evaluated : int
+            Number of grid cells blobs were evaluated on.
+        above_truncation : int
+            Number of these cells where the blob exceeds the truncation
+            error.
+        mirrors : int
+            Number of these cells on rows of the mirrors of blobs.
+        """
+        self.cells_evaluated += int(evaluated)
+        self.cells_above_truncation += int(above_truncation)
+        self.mirror_cells += int(mirrors)
+
+    @property
+    def window_lengths(self) -> np.ndarray:
+        """np.ndarray: Number of time steps each blob is evaluated on."""
+        if not self._window_lengths:
+            return np.zeros(0, dtype=int)
+        return np.concatenate(self._window_lengths)
+
+    def window_length_histogram(
+        self, bins: Union[int, Sequence[int]] = 10
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Histogram of the number of time steps the blobs are evaluated on.
+
+        Parameters
+        ----------
+        bins : int or Sequence[int], optional
+            Number of bins or bin edges, see `np.histogram`. 10 by default.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Number of blobs in each bin, and the bin edges.
+        """
+        return np.histogram(self.window_lengths, bins=bins)
+
+    @property
+    def efficiency(self) -> float:
+        """float: Share of the evaluated cells above the truncation error."""
+        if self.cells_evaluated == 0:
+            return 0.0
+        return self.cells_above_truncation / self.cells_evaluated
+
+    @property
+    def mirror_share(self) -> float:
+        """float: Share of the evaluated cells spent on mirrors of blobs."""
+        if self.cells_evaluated == 0:
+            return 0.0
+        return self.mirror_cells / self.cells_evaluated
+
+    def report(self) -> Dict[str, Union[int, float]]:
+        """
+        The counters and the shares derived from them.
+
+        Returns
+        -------
+        Dict[str, Union[int, float]]
+            Counters by name, without the window lengths.
+        """
+        return dict(
+            num_blobs=self.num_blobs,
+            culled_blobs=self.culled_blobs,
+            cells_evaluated=self.cells_evaluated,
+            cells_above_truncation=self.cells_above_truncation,
+            efficiency=self.efficiency,
+            mirror_cells=self.mirror_cells,
+            mirror_share=self.mirror_share,
+        )
+
+    def __str__(self) -> str:
+        lines = [
+            (
+                f"{name:<24}{value:>14.1%}"
+                if isinstance(value, float)
+                else f"{name:<24}{value:>14}"
+            )
+            for name, value in self.report().items()
+        ]
+        counts, edges = self.window_length_histogram()
+        lines.append("window lengths (time steps)")
+        lines.extend(
+            f"  [{lower:>8.0f}, {upper:>8.0f}){count:>14}"
+            for lower, upper, count in zip(edges[:-1], edges[1:], counts)
+        )
+        return "\n".join(lines)
+
+
+_NULL_CONTEXT = contextlib.nullcontext()
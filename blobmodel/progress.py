@@ -0,0 +1,260 @@
+"""This module defines the reporters receiving the progress of realizations."""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, NamedTuple, Union
+
+
+class ProgressState(NamedTuple):
+    """
+    Progress of a task, as passed to `ProgressReporter.report`: its
+    description, the unit, number done and total number of its items, the
+    number of grid cells evaluated, the elapsed time and the estimated time
+    left (ETA) in seconds, infinite before any item is done.
+    """
+
+    description: str
+    unit: str
+    done: int
+    total: int
+    cells: int
+    elapsed: float
+    eta: float
+
+
+class ProgressReporter(ABC):
+    """
+    Abstract class for receivers of the progress of realizations, e.g. the
+    number of blobs summed up so far by `Model.make_realization`.
+
+    A task, e.g. summing up the blobs of a realization, is started with
+    `start`, advanced with `update` and finished with `close`. The reporter
+    keeps track of the items done, the grid cells evaluated and the elapsed
+    time, and passes them to `report` at most once per ``interval`` seconds,
+    and once more when the task is finished, so that frequent updates stay
+    cheap. Reporters may be reused for several tasks.
+    """
+
+    def __init__(self, interval: float = 0.0) -> None:
+        """
+        Initialize the reporter.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Minimum time in seconds between two calls of `report`. By
+            default 0, i.e. every update is reported.
+        """
+        self.interval = interval
+        self.description = ""
+        self.unit = "blobs"
+        self.done = 0
+        self.total = 0
+        self.cells = 0
+        self._started = 0.0
+        self._reported = 0.0
+
+    def start(self, total: int, description: str, unit: str = "blobs") -> None:
+        """
+        Start a task.
+
+        Parameters
+        ----------
+        total : int
+            Number of items of the task.
+        description : str
+            Description of the task, e.g. "Summing up Blobs".
+        unit : str, optional
+            Unit of the items, "blobs" by default.
+        """
+        self.description = description
+        self.unit = unit
+        self.done = 0
+        self.total = total
+        self.cells = 0
+        self._started = self._reported = time.monotonic()
+
+    def update(self, done: int = 1, cells: int = 0) -> None:
+        """
+        Advance the task.
+
+        Parameters
+        ----------
+        done : int, optional
+            Number of items completed since the last update, 1 by default.
+        cells : int, optional
+            Number of grid cells evaluated since the last update.
+        """
+        self.done += int(done)
+        self.cells += int(cells)
+        now = time.monotonic()
+        if now - self._reported >= self.interval or self.done >= self.total:
+            self._reported = now
+            self.report(self.state(now))
+
+    def close(self) -> None:
+        """Finish the task."""
+
+    def state(self, now: Union[float, None] = None) -> ProgressState:
+        """
+        The progress of the current task.
+
+        Parameters
+        ----------
+        now : float, optional
+            Current value of `time.monotonic`.
+
+        Returns
+        -------
+        ProgressState
+            Progress of the current task.
+        """
+        elapsed = (time.monotonic() if now is None else now) - self._started
+        eta = (
+            elapsed * (self.total - self.done) / self.done
+            if self.done > 0
+            else float("inf")
+        )
+        return ProgressState(
+            self.description,
+            self.unit,
+            self.done,
+            self.total,
+            self.cells,
+            elapsed,
+            eta,
+        )
+
+    @abstractmethod
+    def report(self, state: ProgressState) -> None:
+        """
+        Receive the progress of the current task.
+
+        Parameters
+        ----------
+        state : ProgressState
+            Progress of the current task.
+        """
+        raise NotImplementedError
+
+
+class SilentReporter(ProgressReporter):
+    """Reporter that keeps track of the progress without reporting it."""
+
+    def __init__(self) -> None:
+        super().__init__(interval=float("inf"))
+
+    def report(self, state: ProgressState) -> None:
+        pass
+
+
+class CallbackReporter(ProgressReporter):
+    """Reporter passing the progress to a callable."""
+
+    def __init__(
+        self, callback: Callable[[ProgressState], None], interval: float = 1.0
+    ) -> None:
+        """
+        Initialize the reporter.
+
+        Parameters
+        ----------
+        callback : Callable[[ProgressState], None]
+            Called with the progress of the current task.
+        interval : float, optional
+            Minimum time in seconds between two calls of `callback`, 1 by
+            default.
+        """
+        super().__init__(interval)
+        self.callback = callback
+
+    def report(self, state: ProgressState) -> None:
+        self.callback(state)
+
+
+class LoggingReporter(ProgressReporter):
+    """Reporter writing the progress to a `logging.Logger`, e.g. in batch jobs."""
+
+    def __init__(
+        self,
+        logger: Union[logging.Logger, None] = None,
+        level: int = logging.INFO,
+        interval: float = 10.0,
+    ) -> None:
+        """
+        Initialize the reporter.
+
+        Parameters
+        ----------
+        logger : logging.Logger, optional
+            Logger the progress is written to, by default the logger of the
+            `blobmodel` package.
+        level : int, optional
+            Level of the log records, `logging.INFO` by default.
+        interval : float, optional
+            Minimum time in seconds between two log records, 10 by default.
+        """
+        super().__init__(interval)
+        self.logger = logging.getLogger("blobmodel") if logger is None else logger
+        self.level = level
+
+    def report(self, state: ProgressState) -> None:
+        share = state.done / state.total if state.total > 0 else 1.0
+        message = "%s: %d/%d %s (%.0f%%), %.3g cells, %.1f s elapsed"
+        arguments = [
+            state.description,
+            state.done,
+            state.total,
+            state.unit,
+            100 * share,
+            state.cells,
+            state.elapsed,
+        ]
+        if state.done < state.total:
+            message += ", ETA %.1f s"
+            arguments.append(state.eta)
+        self.logger.log(self.level, message, *arguments)
+
+
+class TqdmReporter(ProgressReporter):
+    """
+    Reporter showing the progress in a `tqdm` progress bar, the default of
+    verbose models. tqdm is only imported once a task is started.
+    """
+
+    def __init__(self, **tqdm_kwargs) -> None:
+        """
+        Initialize the reporter.
+
+        Parameters
+        ----------
+        **tqdm_kwargs
+            Further keyword arguments of the progress bar, e.g. ``leave``.
+        """
+        super().__init__()
+        self.tqdm_kwargs = tqdm_kwargs
+        self._bar = None
+
+    def start(self, total: int, description: str, unit: str = "blobs") -> None:
+        from tqdm import tqdm
+
+        super().start(total, description, unit)
+        self._bar = tqdm(
+            total=total, desc=description, **{"unit": unit, **self.tqdm_kwargs}
+        )
+
+    def update(self, done: int = 1, cells: int = 0) -> None:
+        # The bar throttles its own refreshes.
+        self.done += int(done)
+        self.cells += int(cells)
+        if self._bar is not None:
+            self._bar.update(done)
+
+    def close(self) -> None:
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+
+    def report(self, state: ProgressState) -> None:
+        pass
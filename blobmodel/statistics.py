@@ -0,0 +1,465 @@
+"""This module defines reducers aggregating statistics over ensembles of realizations."""
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Sequence, Tuple, TypeVar, Union
+import numpy as np
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+_ReducerT = TypeVar("_ReducerT", bound="Reducer")
+
+
+class Reducer(ABC):
+    """
+    Abstract class for statistics that are accumulated one dataset at a
+    time, e.g. the realizations of `Model.run_ensemble` or the time chunks of
+    `Model.make_statistics`.
+
+    A reducer only keeps its running statistics, never the datasets
+    themselves. Reducers filled from disjoint sets of datasets (e.g. in
+    different worker processes) are combined with `merge`.
+    """
+
+    @abstractmethod
+    def update(self, dataset: "xr.Dataset") -> None:
+        """
+        Add a dataset to the statistics.
+
+        Parameters
+        ----------
+        dataset : xr.Dataset
+            Realization as returned by `Model.make_realization` with the
+            default layout, or a chunk of one as returned by
+            `Model.iter_realization`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def merge(self, other: "Reducer") -> None:
+        """
+        Add the statistics of another reducer of the same kind and
+        configuration, filled from a disjoint set of realizations.
+
+        Parameters
+        ----------
+        other : Reducer
+            Reducer to merge into this one.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def result(self) -> "xr.Dataset":
+        """
+        Return the accumulated statistics.
+
+        Returns
+        -------
+        xr.Dataset
+            Statistics as an xarray dataset.
+        """
+        raise NotImplementedError
+
+    def _check_mergeable(self: _ReducerT, other: "Reducer") -> _ReducerT:
+        """Check that `other` is of the same kind as this reducer and return it."""
+        if type(other) is not type(self):
+            raise ValueError(
+                f"Cannot merge a {type(other).__name__} into a {type(self).__name__}."
+            )
+        return other
+
+
+class _FieldReducer(Reducer):
+    """Reducer of statistics of the density field ``n``, point by point."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._dims: Union[Tuple[Hashable, ...], None] = None
+        self._coords: Union[Dict[Hashable, Tuple[Any, np.ndarray]], None] = None
+
+    def _density(self, dataset: "xr.Dataset") -> np.ndarray:
+        """Density of `dataset` in double precision, remembering its grid."""
+        if self._dims is None:
+            self._dims = dataset.n.dims
+            self._coords = {
+                name: (coord.dims, coord.values)
+                for name, coord in dataset.n.coords.items()
+            }
+        elif dataset.n.dims != self._dims:
+            raise ValueError(
+                f"All realizations must have the dimensions {self._dims}, "
+                f"got {dataset.n.dims}."
+            )
+        return np.asarray(dataset.n.data, dtype=np.float64)
+
+    def _merge_grid(self, other: "_FieldReducer"):
+        """Check that the grid of `other` matches and adopt it if unset."""
+        if (
+            self._dims is not None
+            and other._dims is not None
+            and self._dims != other._dims
+        ):
+            raise ValueError(
+                f"Cannot merge statistics over the dimensions {other._dims} "
+                f"into statistics over {self._dims}."
+            )
+        if self._dims is None:
+            self._dims, self._coords = other._dims, other._coords
+
+    def _check_not_empty(self):
+        if self.count == 0:
+            raise ValueError("No realization has been added to the reducer.")
+
+    def _field(self, name: str, values: Union[float, np.ndarray]) -> "xr.Dataset":
+        import xarray as xr
+
+        return xr.Dataset({name: (self._dims, values)}, coords=self._coords)
+
+
+class MeanReducer(_FieldReducer):
+    """Ensemble mean of the density ``n`` at every grid point and time step."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._sum: Union[float, np.ndarray] = 0.0
+
+    def update(self, dataset: "xr.Dataset") -> None:
+        self._sum = self._sum + self._density(dataset)
+        self.count += 1
+
+    def merge(self, other: Reducer) -> None:
+        other = self._check_mergeable(other)
+        self._merge_grid(other)
+        self._sum = self._sum + other._sum
+        self.count += other.count
+
+    def result(self) -> "xr.Dataset":
+        """
+        Return the ensemble mean.
+
+        Returns
+        -------
+        xr.Dataset
+            Dataset with the mean density as `n_mean`, on the grid of the
+            realizations.
+        """
+        self._check_not_empty()
+        return self._field("n_mean", self._sum / self.count)
+
+
+class VarianceReducer(_FieldReducer):
+    """
+    Ensemble mean and variance of the density ``n`` at every grid point and
+    time step.
+
+    The moments are updated with Welford's algorithm and merged with the
+    pairwise formula of Chan et al., which avoids the cancellation of the
+    naive sum of squares.
+
+    Parameters
+    ----------
+    ddof : int, optional
+        Delta degrees of freedom of the variance, as in `np.var`. By default
+        0; pass 1 for the unbiased estimate.
+    """
+
+    def __init__(self, ddof: int = 0) -> None:
+        super().__init__()
+        self.ddof = ddof
+        self._mean: Union[float, np.ndarray] = 0.0
+        self._m2: Union[float, np.ndarray] = 0.0
+
+    def update(self, dataset: "xr.Dataset") -> None:
+        density = self._density(dataset)
+        self.count += 1
+        delta = density - self._mean
+        self._mean = self._mean + delta / self.count
+        self._m2 = self._m2 + delta * (density - self._mean)
+
+    def merge(self, other: Reducer) -> None:
+        other = self._check_mergeable(other)
+        self._merge_grid(other)
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._mean = self._mean + delta * (other.count / count)
+        self._m2 = self._m2 + other._m2 + delta**2 * (self.count * other.count / count)
+        self.count = count
+
+    def result(self) -> "xr.Dataset":
+        """
+        Return the ensemble mean and variance.
+
+        Returns
+        -------
+        xr.Dataset
+            Dataset with the mean density as `n_mean` and its variance as
+            `n_variance`, on the grid of the realizations.
+
+        Raises
+        ------
+        ValueError
+            If fewer than ``ddof + 1`` realizations have been added.
+        """
+        self._check_not_empty()
+        if self.count <= self.ddof:
+            raise ValueError(
+                f"The variance with ddof = {self.ddof} needs more than "
+                f"{self.ddof} realizations, got {self.count}."
+            )
+        return self._field("n_mean", self._mean).assign(
+            n_variance=(self._dims, self._m2 / (self.count - self.ddof))
+        )
+
+
+class HistogramReducer(Reducer):
+    """
+    Probability density function of the density ``n``, pooled over all grid
+    points, time steps and realizations, on fixed bins.
+
+    Parameters
+    ----------
+    bins : Sequence[float]
+        Monotonically increasing bin edges. Values outside of the bins are
+        not counted, as in `np.histogram`.
+    """
+
+    def __init__(self, bins: Union[Sequence[float], np.ndarray]) -> None:
+        self.bins = np.asarray(bins, dtype=np.float64)
+        if self.bins.ndim != 1 or self.bins.size < 2 or np.any(np.diff(self.bins) <= 0):
+            raise ValueError(
+                "bins must be at least two monotonically increasing bin edges."
+            )
+        self.counts = np.zeros(self.bins.size - 1, dtype=np.int64)
+
+    def update(self, dataset: "xr.Dataset") -> None:
+        self.counts += np.histogram(np.asarray(dataset.n.data), bins=self.bins)[0]
+
+    def merge(self, other: Reducer) -> None:
+        other = self._check_mergeable(other)
+        if not np.array_equal(self.bins, other.bins):
+            raise ValueError("Cannot merge histograms with different bins.")
+        self.counts += other.counts
+
+    def result(self) -> "xr.Dataset":
+        """
+        Return the probability density function.
+
+        Returns
+        -------
+        xr.Dataset
+            Dataset with the probability density of the counted values as
+            `n_pdf`, normalized to unit integral over the bins as
+            ``np.histogram(..., density=True)``, the raw `n_counts`, and the
+            bin centres as coordinate `n_bin`.
+
+        Raises
+        ------
+        ValueError
+            If no value has been counted.
+        """
+        import xarray as xr
+
+        total = self.counts.sum()
+        if total == 0:
+            raise ValueError("No value has been counted by the histogram.")
+        bin_centres = (self.bins[1:] + self.bins[:-1]) / 2
+        return xr.Dataset(
+            {
+                "n_pdf": (["n_bin"], self.counts / (total * np.diff(self.bins))),
+                "n_counts": (["n_bin"], self.counts.copy()),
+            },
+            coords={"n_bin": (["n_bin"], bin_centres)},
+        )
+
+
+class PointStatisticsReducer(Reducer):
+    """
+    Statistics of the density ``n`` over time at every grid point: mean,
+    variance, skewness, flatness and, optionally, the probability density
+    function on fixed bins.
+
+    The datasets may be consecutive time chunks of a realization (see
+    `Model.make_statistics`) or whole realizations, in which case the
+    statistics are pooled over time and realizations. The central moments of
+    every dataset are computed directly and combined with the running ones
+    with the pairwise update formulas of Pébay (2008), a block-wise
+    generalization of Welford's algorithm.
+
+    Parameters
+    ----------
+    bins : Sequence[float], optional
+        Monotonically increasing bin edges of the per-point histograms.
+        Values outside of the bins are not counted, as in `np.histogram`.
+        By default None, i.e. no histograms.
+    """
+
+    def __init__(self, bins: Union[Sequence[float], np.ndarray, None] = None) -> None:
+        self.bins: Union[np.ndarray, None] = (
+            None if bins is None else HistogramReducer(bins).bins
+        )
+        self.count = 0
+        self.counts: Union[np.ndarray, None] = None
+        # Mean and second to fourth central moment times the count, None
+        # until a time step has been added.
+        self._moments: Union[Tuple[np.ndarray, ...], None] = None
+        self._dims: Union[Tuple[Hashable, ...], None] = None
+        self._coords: Union[Dict[Hashable, Tuple[Any, np.ndarray]], None] = None
+
+    def update(self, dataset: "xr.Dataset") -> None:
+        density = dataset.n
+        if "t" not in density.dims:
+            raise ValueError("The density must have a time dimension t.")
+        dims = tuple(dim for dim in density.dims if dim != "t")
+        if self._dims is None:
+            self._dims = dims
+            self._coords = {
+                name: (coord.dims, coord.values)
+                for name, coord in density.coords.items()
+                if "t" not in coord.dims
+            }
+        elif dims != self._dims:
+            raise ValueError(
+                f"All datasets must have the dimensions {self._dims} besides t, "
+                f"got {dims}."
+            )
+        values = np.asarray(density.transpose(*dims, "t").data, dtype=np.float64)
+        if values.shape[-1] == 0:
+            return
+
+        mean = values.mean(axis=-1)
+        deviations = values - mean[..., np.newaxis]
+        squares = deviations**2
+        moments = (
+            mean,
+            squares.sum(axis=-1),
+            (squares * deviations).sum(axis=-1),
+            (squares**2).sum(axis=-1),
+        )
+        self._combine(values.shape[-1], moments)
+        if self.bins is not None:
+            self._count_values(values, self.bins)
+
+    def merge(self, other: Reducer) -> None:
+        other = self._check_mergeable(other)
+        same_bins = (
+            other.bins is None
+            if self.bins is None
+            else other.bins is not None and np.array_equal(self.bins, other.bins)
+        )
+        if not same_bins:
+            raise ValueError("Cannot merge histograms with different bins.")
+        if other._moments is None:
+            return
+        if self._dims is None:
+            self._dims, self._coords = other._dims, other._coords
+        elif other._dims != self._dims:
+            raise ValueError(
+                f"Cannot merge statistics over the dimensions {other._dims} "
+                f"into statistics over {self._dims}."
+            )
+        self._combine(other.count, other._moments)
+        if other.counts is not None:
+            self.counts = (
+                other.counts.copy()
+                if self.counts is None
+                else self.counts + other.counts
+            )
+
+    def result(self) -> "xr.Dataset":
+        """
+        Return the statistics of every grid point.
+
+        Returns
+        -------
+        xr.Dataset
+            Dataset on the grid of the density without its time dimension,
+            holding `n_mean`, `n_variance`, `n_skewness` (third central
+            moment over the variance to the power 3/2) and `n_flatness`
+            (fourth central moment over the squared variance). The skewness
+            and flatness are NaN where the variance vanishes. With ``bins``,
+            also the per-point probability density `n_pdf` and the raw
+            `n_counts` along the additional dimension `n_bin` holding the bin
+            centres; the density is NaN at points without counted values.
+
+        Raises
+        ------
+        ValueError
+            If no time step has been added.
+        """
+        import xarray as xr
+
+        if self._moments is None or self._dims is None or self._coords is None:
+            raise ValueError("No time step has been added to the reducer.")
+        mean, m2, m3, m4 = self._moments
+        variance = m2 / self.count
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skewness = np.where(variance > 0, m3 / self.count / variance**1.5, np.nan)
+            flatness = np.where(variance > 0, m4 / self.count / variance**2, np.nan)
+        data_vars = {
+            "n_mean": (self._dims, mean),
+            "n_variance": (self._dims, variance),
+            "n_skewness": (self._dims, skewness),
+            "n_flatness": (self._dims, flatness),
+        }
+        coords = dict(self._coords)
+        if self.bins is not None and self.counts is not None:
+            totals = self.counts.sum(axis=-1, keepdims=True)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pdf = np.where(
+                    totals > 0, self.counts / (totals * np.diff(self.bins)), np.nan
+                )
+            data_vars["n_pdf"] = (self._dims + ("n_bin",), pdf)
+            data_vars["n_counts"] = (self._dims + ("n_bin",), self.counts.copy())
+            coords["n_bin"] = (["n_bin"], (self.bins[1:] + self.bins[:-1]) / 2)
+        return xr.Dataset(data_vars, coords=coords)
+
+    def _combine(self, count: int, moments: Tuple[np.ndarray, ...]):
+        """Combine the running moments with those of `count` further values."""
+        if self._moments is None:
+            self.count = count
+            self._moments = tuple(np.copy(moment) for moment in moments)
+            return
+        mean_a, m2_a, m3_a, m4_a = self._moments
+        mean_b, m2_b, m3_b, m4_b = moments
+        count_a, count_b = self.count, count
+        total = count_a + count_b
+        delta = mean_b - mean_a
+        delta_over_total = delta / total
+        product = count_a * count_b
+        self._moments = (
+            mean_a + delta_over_total * count_b,
+            m2_a + m2_b + delta * delta_over_total * product,
+            m3_a
+            + m3_b
+            + delta * delta_over_total**2 * product * (count_a - count_b)
+            + 3 * delta_over_total * (count_a * m2_b - count_b * m2_a),
+            m4_a
+            + m4_b
+            + delta
+            * delta_over_total**3
+            * product
+            * (count_a**2 - product + count_b**2)
+            + 6 * delta_over_total**2 * (count_a**2 * m2_b + count_b**2 * m2_a)
+            + 4 * delta_over_total * (count_a * m3_b - count_b * m3_a),
+        )
+        self.count = total
+
+    def _count_values(self, values: np.ndarray, bins: np.ndarray):
+        """Add the values of every grid point (last axis) to its histogram on
+        `bins`."""
+        num_bins = bins.size - 1
+        bin_indices = np.searchsorted(bins, values, side="right") - 1
+        # The last bin includes its right edge, as in np.histogram.
+        bin_indices[values == bins[-1]] = num_bins - 1
+        points = np.broadcast_to(
+            np.arange(values[..., 0].size).reshape(values.shape[:-1] + (1,)),
+            values.shape,
+        )
+        inside = (bin_indices >= 0) & (bin_indices < num_bins)
+        counts = np.bincount(
+            (points[inside] * num_bins + bin_indices[inside]),
+            minlength=values[..., 0].size * num_bins,
+        ).reshape(values.shape[:-1] + (num_bins,))
+        self.counts = counts if self.counts is None else self.counts + counts
@@ -1,10 +1,11 @@
 """This module defines a class for generating blob parameters."""
 
 from abc import ABC, abstractmethod
-from nptyping import NDArray
+import functools
+from numpy.typing import NDArray
 from typing import List, Union, Callable
 import numpy as np
-from .blobs import Blob
+from .blobs import Blob, BlobBatch
 from .blob_shape import AbstractBlobShape
 from .distributions import DISTRIBUTIONS, DistributionEnum
 
@@ -34,6 +35,41 @@ class BlobFactory(ABC):
         """
         raise NotImplementedError
 
+    def sample_blob_batch(
+        self,
+        Ly: float,
+        T: float,
+        num_blobs: int,
+        blob_shape: AbstractBlobShape,
+    ) -> BlobBatch:
+        """
+        Creates the blobs used in Model in columnar form.
+
+        `Model` samples its blobs through this method. The default
+        implementation collects the output of `sample_blobs` into a
+        `BlobBatch`; factories sampling large populations should override it
+        to build the columns directly, without creating `Blob` objects.
+
+        Parameters
+        ----------
+        Ly : float
+            Size of the domain in the y-direction.
+        T : float
+            End time of the simulation.
+        num_blobs : int
+            Number of blobs to generate.
+        blob_shape : AbstractBlobShape
+            Object representing the shape of the blobs.
+
+        Returns
+        -------
+        BlobBatch
+            The sampled blobs.
+        """
+        return BlobBatch.from_blobs(
+            self.sample_blobs(Ly=Ly, T=T, num_blobs=num_blobs, blob_shape=blob_shape)
+        )
+
     @abstractmethod
     def is_one_dimensional(self) -> bool:
         """returns True if the BlobFactory is compatible with a one_dimensional
@@ -329,10 +365,12 @@ class DefaultBlobFactory(BlobFactory):
             dist_function = DISTRIBUTIONS[sampler]
             self._dists[parameter] = sampler
             self._free_parameters[parameter] = free_parameter
-            self._samplers[parameter] = (
-                lambda rng, num_blobs, _dist_function=dist_function, _free_parameter=free_parameter: _dist_function(
-                    num_blobs, rng, free_param=_free_parameter
-                )
+            # A partial of a module-level function (unlike a lambda) keeps
+            # the factory picklable, e.g. for Model.run_ensemble.
+            self._samplers[parameter] = functools.partial(
+                _draw_from_distribution,
+                dist_function=dist_function,
+                free_parameter=free_parameter,
             )
         elif callable(sampler):
             if free_parameter is not None:
@@ -390,6 +428,44 @@ class DefaultBlobFactory(BlobFactory):
         List[Blob]
             List of Blob objects generated for the Model.
 
+        Raises
+        ------
+        TypeError
+            If blob_shape is not an AbstractBlobShape instance.
+        """
+        return self.sample_blob_batch(
+            Ly=Ly, T=T, num_blobs=num_blobs, blob_shape=blob_shape
+        ).to_blobs()
+
+    def sample_blob_batch(
+        self,
+        Ly: float,
+        T: float,
+        num_blobs: int,
+        blob_shape: AbstractBlobShape,
+    ) -> BlobBatch:
+        """
+        Creates the blobs used in the Model in columnar form, drawing every
+        parameter as one vectorized column. `sample_blobs` returns the same
+        blobs as a list.
+
+        Parameters
+        ----------
+        Ly : float
+            Size of the domain in the y-direction.
+        T : float
+            End time of the simulation. Blob arrival times are sampled
+            uniformly in [0, T).
+        num_blobs : int
+            Number of blobs to generate.
+        blob_shape : AbstractBlobShape
+            Object representing the shape of the blobs.
+
+        Returns
+        -------
+        BlobBatch
+            The sampled blobs, sorted by amplitude.
+
         Raises
         ------
         TypeError
@@ -407,36 +483,40 @@ class DefaultBlobFactory(BlobFactory):
         vys = self._draw_random_variables("vy", num_blobs)
         spxs = self._draw_random_variables("spp", num_blobs)
         spys = self._draw_random_variables("sps", num_blobs)
-        # For now, only a lambda parameter is implemented
-        spxs_dict = [{"lam": s} for s in spxs]
-        spys_dict = [{"lam": s} for s in spys]
         posxs = np.zeros(num_blobs)
         posys = self.rng.uniform(low=0.0, high=Ly, size=num_blobs)
         t_inits = self.rng.uniform(low=0, high=T, size=num_blobs)
 
-        blobs = [
-            Blob(
-                blob_id=i,
-                blob_shape=blob_shape,
-                amplitude=amps[i],
-                width_p=wxs[i],
-                width_s=wys[i],
-                v_x=vxs[i],
-                v_y=vys[i],
-                pos_x0=posxs[i],
-                pos_y0=posys[i],
-                t_init=t_inits[i],
-                t_drain=self.t_drain,
-                shape_parameters_p=spxs_dict[i],
-                shape_parameters_s=spys_dict[i],
-                blob_alignment=self.blob_alignment,
-                theta=self.theta_setter() if self.theta_setter is not None else None,
-            )
-            for i in range(num_blobs)
-        ]
+        blobs = BlobBatch(
+            amplitude=amps,
+            width_p=wxs,
+            width_s=wys,
+            v_x=vxs,
+            v_y=vys,
+            pos_x0=posxs,
+            pos_y0=posys,
+            t_init=t_inits,
+            # An array-valued drain time is a profile along x shared by all
+            # blobs.
+            t_drain=(
+                self.t_drain
+                if np.ndim(self.t_drain) == 0
+                else np.asarray(self.t_drain, dtype=np.float64)[np.newaxis]
+            ),
+            blob_shape=blob_shape,
+            # For now, only a lambda parameter is implemented
+            shape_parameters_p={"lam": spxs},
+            shape_parameters_s={"lam": spys},
+            blob_alignment=self.blob_alignment,
+            theta=(
+                np.array([self.theta_setter() for _ in range(num_blobs)])
+                if self.theta_setter is not None
+                else None
+            ),
+        )
 
         # sort blobs by amplitude
-        return sorted(blobs, key=lambda x: x.amplitude)
+        return blobs.take(np.argsort(blobs.amplitude, kind="stable"))
 
     def set_theta_setter(self, theta_setter):
         """
@@ -446,6 +526,33 @@ class DefaultBlobFactory(BlobFactory):
         """
         self.theta_setter = theta_setter
 
+    def is_homogeneous(self) -> bool:
+        """
+        Returns True if the sampled blobs only differ in amplitude, arrival
+        time and vertical position.
+
+        That is the case if every parameter but the amplitude has a degenerate
+        (``DistributionEnum.deg``) or zero distribution and no tilt angle
+        setter is registered. Such populations can be summed up by
+        `Model.make_realization` with ``engine="fft"``.
+
+        Returns
+        -------
+        bool
+            True if the factory samples a homogeneous blob population, False
+            otherwise.
+
+        Notes
+        -----
+        - Custom callable samplers are assumed to produce varying values even
+          if they always return the same one.
+        """
+        return self.theta_setter is None and all(
+            self._dists[parameter] in (DistributionEnum.deg, DistributionEnum.zeros)
+            for parameter in self._dists
+            if parameter != "amplitude"
+        )
+
     def is_one_dimensional(self) -> bool:
         """
         Returns True if the BlobFactory is compatible with a one-dimensional model.
@@ -465,3 +572,13 @@ class DefaultBlobFactory(BlobFactory):
 
         """
         return self._dists["vy"] == DistributionEnum.zeros
+
+
+def _draw_from_distribution(
+    rng: np.random.Generator,
+    num_blobs: int,
+    dist_function: Callable,
+    free_parameter: float,
+) -> np.ndarray:
+    """Sampler drawing `num_blobs` values from a built-in distribution."""
+    return dist_function(num_blobs, rng, free_param=free_parameter)
@@ -0,0 +1,179 @@
+import numpy as np
+import pytest
+from blobmodel import (
+    AbstractBlobShape,
+    Blob,
+    BlobBatch,
+    BlobShapeEnum,
+    BlobShapeImpl,
+    DefaultBlobFactory,
+    DistributionEnum,
+    Geometry,
+    Model,
+)
+from blobmodel.blobs import ScratchArena, discretize_blobs
+
+
+def _realize(engine, **model_kwargs):
+    model_kwargs.setdefault(
+        "geometry", Geometry(Nx=8, Ny=6, Lx=10, Ly=10, dt=0.5, T=20, periodic_y=True)
+    )
+    model = Model(verbose=False, seed=1, **model_kwargs)
+    return model.make_realization(engine=engine)
+
+
+MODEL_CONFIGS = [
+    dict(num_blobs=50),
+    dict(num_blobs=50, labels="same"),
+    dict(num_blobs=50, labels="individual"),
+    dict(
+        num_blobs=50,
+        blob_factory=DefaultBlobFactory(blob_alignment=True)
+        .set_sampler("vy", DistributionEnum.normal, 1.0)
+        .set_sampler("vx", DistributionEnum.uniform, 1.0),
+    ),
+    dict(
+        num_blobs=50,
+        blob_shape=BlobShapeImpl(BlobShapeEnum.double_exp, BlobShapeEnum.exp),
+        blob_factory=DefaultBlobFactory().set_sampler(
+            "spp", lambda rng, num_blobs: rng.uniform(0.2, 0.8, num_blobs)
+        ),
+    ),
+    dict(
+        num_blobs=20,
+        geometry=Geometry(Nx=8, Ny=1, Lx=10, Ly=0, dt=0.5, T=20),
+        blob_factory=DefaultBlobFactory(t_drain=np.linspace(1, 3, 8)),
+        one_dimensional=True,
+        labels="individual",
+    ),
+]
+
+
+@pytest.mark.parametrize("model_kwargs", MODEL_CONFIGS)
+def test_batched_engine_matches_per_blob(model_kwargs):
+    """The batched engine is checked against the per-blob reference engine."""
+    ds_reference = _realize("per_blob", **model_kwargs)
+    ds_batched = _realize("batched", **model_kwargs)
+    assert ds_reference.n.values.max() > 0
+    np.testing.assert_allclose(ds_batched.n.values, ds_reference.n.values, atol=1e-12)
+    if "blob_labels" in ds_reference:
+        np.testing.assert_array_equal(
+            ds_batched.blob_labels.values, ds_reference.blob_labels.values
+        )
+
+
+def test_batched_engine_mixed_blob_shapes():
+    """Blobs with different shapes end up in different batches."""
+    blobs = [
+        Blob(t_init=1.0, pos_y0=3.0),
+        Blob(
+            t_init=2.0,
+            pos_y0=5.0,
+            blob_shape=BlobShapeImpl(BlobShapeEnum.lorentz, BlobShapeEnum.rect),
+        ),
+        Blob(t_init=3.0, pos_y0=7.0, theta=0.5),
+    ]
+    geometry = Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=10)
+    datasets = [
+        Model.from_blobs(
+            blobs, geometry=geometry, labels="individual", verbose=False
+        ).make_realization(engine=engine)
+        for engine in ("per_blob", "batched")
+    ]
+    np.testing.assert_allclose(datasets[1].n.values, datasets[0].n.values, atol=1e-12)
+    np.testing.assert_array_equal(
+        datasets[1].blob_labels.values, datasets[0].blob_labels.values
+    )
+
+
+def test_discretize_blobs_matches_discretize_blob():
+    blobs = [
+        Blob(v_y=2.0, pos_y0=4.0, t_init=1.0, theta=0.3, amplitude=2.0),
+        Blob(v_y=-1.0, pos_y0=9.0, t_init=3.0, theta=0.3, width_s=2.0),
+    ]
+    geometry = Geometry(Nx=5, Ny=4, Lx=10, Ly=10, dt=1, T=10)
+    t = np.stack([geometry.t[0:4], geometry.t[3:7]])
+    stacked = discretize_blobs(
+        blobs, x=geometry.x, y=geometry.y, t=t, Ly=10, periodic_y=True
+    )
+    assert stacked.shape == (2, 4, 5, 4)
+    for blob, times, values in zip(blobs, t, stacked):
+        reference = blob.discretize_blob(
+            x=geometry.x[np.newaxis, :, np.newaxis],
+            y=geometry.y[:, np.newaxis, np.newaxis],
+            t=times[np.newaxis, np.newaxis, :],
+            Ly=10,
+            periodic_y=True,
+        )
+        np.testing.assert_allclose(values, reference, atol=1e-14)
+
+
+@pytest.mark.parametrize("theta", [0.0, 0.3])
+def test_discretize_blobs_reuses_scratch_buffers(theta):
+    blobs = [
+        Blob(v_y=1.0, pos_y0=4.0, t_init=1.0, theta=theta, amplitude=2.0),
+        Blob(v_y=1.0, pos_y0=9.0, t_init=3.0, theta=theta, width_s=2.0),
+    ]
+    geometry = Geometry(Nx=5, Ny=4, Lx=10, Ly=10, dt=1, T=10)
+    t = np.stack([geometry.t[0:4], geometry.t[3:7]])
+    kwargs = dict(x=geometry.x, y=geometry.y, Ly=10, periodic_y=True)
+    expected = discretize_blobs(blobs, t=t, **kwargs)
+    scratch = ScratchArena()
+    out = np.empty_like(expected)
+    assert discretize_blobs(blobs, t=t, out=out, scratch=scratch, **kwargs) is out
+    np.testing.assert_array_equal(out, expected)
+    # A smaller batch is computed in the buffers of the first one.
+    nbytes = scratch.nbytes
+    discretize_blobs(blobs[:1], t=t[:1], out=out[:1], scratch=scratch, **kwargs)
+    assert scratch.nbytes == nbytes
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_discretize_blobs_with_per_blob_shape_parameters():
+    """Blobs with different lam are discretized in one call for shapes that
+    take parameter arrays, and in separate batches for custom shapes."""
+
+    class ScalarDoubleExp(AbstractBlobShape):
+        def __init__(self):
+            self.shape = BlobShapeImpl(BlobShapeEnum.double_exp, BlobShapeEnum.exp)
+
+        def get_blob_shape_p(self, theta, **kwargs):
+            assert np.ndim(kwargs["lam"]) == 0
+            return self.shape.get_blob_shape_p(theta, **kwargs)
+
+        def get_blob_shape_s(self, theta, **kwargs):
+            return self.shape.get_blob_shape_s(theta, **kwargs)
+
+        def get_support_p(self, tolerance, **kwargs):
+            return self.shape.get_support_p(tolerance, **kwargs)
+
+    geometry = Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=10)
+    for blob_shape, num_keys in [
+        (BlobShapeImpl(BlobShapeEnum.double_exp, BlobShapeEnum.exp), 1),
+        (ScalarDoubleExp(), 4),
+    ]:
+        blobs = [
+            Blob(
+                t_init=1.0,
+                pos_y0=5.0,
+                blob_shape=blob_shape,
+                shape_parameters_p={"lam": lam},
+            )
+            for lam in (0.0, 0.3, 0.7, 1.0)
+        ]
+        batch = BlobBatch.from_blobs(blobs)
+        assert len(np.unique(batch.shape_keys(), axis=0)) == num_keys
+        datasets = [
+            Model.from_blobs(
+                blobs, geometry=geometry, labels="individual", verbose=False
+            ).make_realization(engine=engine)
+            for engine in ("per_blob", "batched")
+        ]
+        np.testing.assert_allclose(
+            datasets[1].n.values, datasets[0].n.values, atol=1e-12
+        )
+
+
+def test_make_realization_rejects_unknown_engine():
+    with pytest.raises(ValueError, match="engine"):
+        Model(verbose=False).make_realization(engine="gpu")
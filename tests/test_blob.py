@@ -261,6 +261,25 @@ def test_negative_radial_velocity():
     assert error < 1e-10, "Numerical error too big"
 
 
+def test_periodicity_wraps_at_every_time():
+    """
+    Tests that a blob crossing the domain several times during the discretized
+    times is wrapped around the domain at every time, not only at the first.
+    """
+    blob = Blob(blob_id=0, amplitude=1, v_x=0, v_y=3, pos_y0=2, t_drain=10**100)
+    y = np.arange(0, 10, 0.5)
+    t = np.arange(0, 10, 0.5)
+    mesh_y, mesh_t = np.meshgrid(y, t, indexing="ij")
+    blob_values = blob.discretize_blob(
+        x=np.zeros_like(mesh_y), y=mesh_y, t=mesh_t, periodic_y=True, Ly=10
+    )
+    for index, time in enumerate(t):
+        expected = blob.discretize_blob(
+            x=np.zeros_like(y), y=y, t=time, periodic_y=True, Ly=10
+        )
+        np.testing.assert_allclose(blob_values[:, index], expected, atol=1e-12)
+
+
 def test_kwargs():
     """
     Tests that additional pulse parameters passed through kwards are used correctly for computing the pulse shape.
@@ -418,3 +437,62 @@ def test_factory_default_is_axis_aligned():
     bf = DefaultBlobFactory().set_sampler("amplitude", DistributionEnum.deg)
     blobs = bf.sample_blobs(Ly=10, T=1, num_blobs=3, blob_shape=BlobShapeImpl())
     assert all(b._theta == 0 for b in blobs)
+
+
+@pytest.mark.parametrize("v_y, periodic_y", [(0, False), (0, True), (2, True)])
+def test_separable_blob_matches_explicit_formula(v_y, periodic_y):
+    """
+    Untilted blobs take the separable fast path, which must agree with the
+    blob formula evaluated on the full meshgrid.
+    """
+    blob = Blob(
+        amplitude=2.0,
+        width_p=0.7,
+        width_s=1.3,
+        v_x=1.5,
+        v_y=v_y,
+        pos_y0=4.0,
+        t_init=1.0,
+        t_drain=3.0,
+    )
+    assert blob.is_separable
+    x, y, t = np.arange(0, 10, 0.5), np.arange(0, 10, 0.5), np.arange(0, 5, 0.25)
+    mesh_y, mesh_x, mesh_t = np.meshgrid(y, x, t, indexing="ij")
+
+    def explicit(y_shift):
+        pos_y = 4.0 + v_y * (mesh_t - 1.0)
+        if periodic_y:
+            pos_y = pos_y - (pos_y // 10) * 10
+        return (
+            2.0
+            * np.exp(-(mesh_t - 1.0) / 3.0)
+            * np.exp(-(((mesh_x - 1.5 * (mesh_t - 1.0)) / 0.7) ** 2))
+            * np.exp(-(((mesh_y + y_shift - pos_y) / 1.3) ** 2))
+            / np.pi
+        )
+
+    expected = explicit(0)
+    if periodic_y:
+        expected = expected + explicit(10) + explicit(-10)
+    values = blob.discretize_blob(
+        x=x[np.newaxis, :, np.newaxis],
+        y=y[:, np.newaxis, np.newaxis],
+        t=t[np.newaxis, np.newaxis, :],
+        Ly=10,
+        periodic_y=periodic_y,
+    )
+    np.testing.assert_allclose(values, expected, rtol=1e-12, atol=1e-300)
+
+
+def test_separable_blob_evaluates_shapes_on_factors():
+    """With theta == 0 and v_y == 0 the secondary shape is time independent."""
+    blob = Blob(blob_shape=BlobShapeImpl(), v_y=0)
+    blob.blob_shape.get_blob_shape_s = MagicMock(return_value=np.ones((4, 1, 1)))
+    blob.discretize_blob(
+        x=np.arange(5.0)[np.newaxis, :, np.newaxis],
+        y=np.arange(4.0)[:, np.newaxis, np.newaxis],
+        t=np.arange(6.0)[np.newaxis, np.newaxis, :],
+        Ly=4,
+    )
+    assert blob.blob_shape.get_blob_shape_s.call_args[0][0].shape == (4, 1, 1)
+    assert not Blob(theta=0.1).is_separable
@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+import blobmodel.model
+from blobmodel import (
+    Blob,
+    BlobBatch,
+    BlobShapeEnum,
+    BlobShapeImpl,
+    DefaultBlobFactory,
+    DistributionEnum,
+    Geometry,
+    Model,
+)
+
+
+def _factory(**kwargs):
+    return (
+        DefaultBlobFactory(seed=4, **kwargs)
+        .set_sampler("vy", DistributionEnum.normal, 0.5)
+        .set_sampler("spp", DistributionEnum.uniform, 0.5)
+    )
+
+
+def _assert_same_blobs(blobs, reference):
+    assert len(blobs) == len(reference)
+    for blob, expected in zip(blobs, reference):
+        for attribute in [
+            "blob_id",
+            "amplitude",
+            "width_p",
+            "width_s",
+            "v_x",
+            "v_y",
+            "pos_x0",
+            "pos_y0",
+            "t_init",
+            "theta",
+        ]:
+            assert getattr(blob, attribute) == getattr(expected, attribute)
+        np.testing.assert_array_equal(blob.t_drain, expected.t_drain)
+        assert blob.blob_shape is expected.blob_shape
+        assert blob.shape_parameters_p == expected.shape_parameters_p
+        assert blob.shape_parameters_s == expected.shape_parameters_s
+
+
+def test_sample_blob_batch_matches_sample_blobs():
+    shape = BlobShapeImpl(BlobShapeEnum.double_exp)
+    batch = _factory(t_drain=np.arange(1.0, 6.0), blob_alignment=True)
+    batch = batch.sample_blob_batch(Ly=10, T=10, num_blobs=20, blob_shape=shape)
+    blobs = _factory(t_drain=np.arange(1.0, 6.0), blob_alignment=True).sample_blobs(
+        Ly=10, T=10, num_blobs=20, blob_shape=shape
+    )
+    _assert_same_blobs(batch.to_blobs(), blobs)
+    assert np.all(np.diff(batch.amplitude) >= 0)
+    # The drain profile shared by all blobs is not copied per blob.
+    assert batch.t_drain.strides[0] == 0
+
+
+def test_from_blobs_round_trip_with_mixed_blobs():
+    blobs = [
+        Blob(blob_id=3, amplitude=2.0, theta=0.4, t_drain=2.0),
+        Blob(
+            blob_shape=BlobShapeImpl(BlobShapeEnum.double_exp),
+            shape_parameters_p={"lam": 0.3},
+            v_y=0.5,
+        ),
+    ]
+    batch = BlobBatch.from_blobs(blobs)
+    assert len(batch.blob_shapes) == 2
+    assert np.isnan(batch.shape_parameters_p["lam"][0])
+    _assert_same_blobs(batch.to_blobs(), blobs)
+    _assert_same_blobs(batch.take([1]).to_blobs(), blobs[1:])
+
+
+def test_from_blobs_groups_equal_shapes(monkeypatch):
+    """Blobs created one by one get distinct but equal shape objects, which
+    are evaluated in a single batch."""
+    blobs = [
+        Blob(blob_id=index, t_init=index, blob_shape=BlobShapeImpl(shape))
+        for index, shape in enumerate(
+            [BlobShapeEnum.exp, BlobShapeEnum.gaussian, BlobShapeEnum.exp]
+        )
+    ]
+    assert blobs[0].blob_shape is not blobs[2].blob_shape
+    batch = BlobBatch.from_blobs(blobs)
+    assert len(batch.blob_shapes) == 2
+    np.testing.assert_array_equal(batch.shape_index, [0, 1, 0])
+    assert BlobShapeImpl() == BlobShapeImpl(BlobShapeEnum.gaussian)
+    assert BlobShapeImpl() != BlobShapeImpl(BlobShapeEnum.gaussian, BlobShapeEnum.exp)
+
+    groups = []
+    discretize_blobs = blobmodel.model.discretize_blobs
+
+    def spy(blobs, *args, **kwargs):
+        groups.append(len(blobs))
+        return discretize_blobs(blobs, *args, **kwargs)
+
+    monkeypatch.setattr(blobmodel.model, "discretize_blobs", spy)
+    blobs = [Blob(blob_id=index, t_init=index) for index in range(10)]
+    Model.from_blobs(
+        blobs, geometry=Geometry(Nx=8, Ny=1, Lx=10, Ly=0, dt=0.5, T=20)
+    ).make_realization(speed_up=False)
+    assert groups == [10]
+
+
+def test_support_matches_blob_support():
+    batch = _factory().sample_blob_batch(
+        Ly=10, T=10, num_blobs=10, blob_shape=BlobShapeImpl(BlobShapeEnum.double_exp)
+    )
+    batch.theta[::2] = 0.7
+    (x_lo, x_hi), (y_lo, y_hi) = batch.get_support(1e-6)
+    for index, blob in enumerate(batch.to_blobs()):
+        support_x, support_y = blob.get_support(1e-6)
+        np.testing.assert_allclose((x_lo[index], x_hi[index]), support_x)
+        np.testing.assert_allclose((y_lo[index], y_hi[index]), support_y)
+
+
+def test_batched_realization_does_not_materialize_blobs(monkeypatch):
+    model = Model(
+        geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=20),
+        blob_factory=_factory(),
+        num_blobs=30,
+        labels="individual",
+        verbose=False,
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("A Blob object was materialized.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(BlobBatch, "to_blob", fail)
+        ds = model.make_realization()
+    assert len(model.get_blobs()) == 30
+    ds_per_blob = Model.from_blobs(
+        model.get_blobs(),
+        geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=20),
+        labels="individual",
+        verbose=False,
+    ).make_realization(engine="per_blob")
+    # The reference is not truncated, see the "per_blob" engine.
+    np.testing.assert_allclose(ds.n.values, ds_per_blob.n.values, atol=1e-9)
+    np.testing.assert_array_equal(ds.blob_labels.values, ds_per_blob.blob_labels.values)
+
+
+@pytest.mark.parametrize(
+    "kwargs, error",
+    [
+        (dict(amplitude=[1.0, 2.0], width_p=[1.0, 0.0]), ValueError),
+        (dict(amplitude=[1.0, 2.0], t_drain=-1.0), ValueError),
+        (dict(amplitude=[1.0, 2.0], v_x=[1.0, 2.0, 3.0]), ValueError),
+        (dict(amplitude=[1.0], blob_shape="gauss"), TypeError),
+    ],
+)
+def test_blob_batch_rejects_invalid_columns(kwargs, error):
+    with pytest.raises(error):
+        BlobBatch(**kwargs)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+import xarray as xr
+from blobmodel import (
+    Blob,
+    BlobShapeEnum,
+    BlobShapeImpl,
+    DefaultBlobFactory,
+    DistributionEnum,
+    Geometry,
+    Model,
+)
+from blobmodel.blobs import discretize_blobs
+
+
+def _realize(dtype, engine="batched", **model_kwargs):
+    model = Model(
+        geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.1, T=10, periodic_y=True),
+        num_blobs=20,
+        verbose=False,
+        seed=1,
+        dtype=dtype,
+        **model_kwargs,
+    )
+    return model.make_realization(engine=engine)
+
+
+@pytest.mark.parametrize("engine", ["batched", "per_blob"])
+@pytest.mark.parametrize(
+    "model_kwargs",
+    [
+        dict(labels="individual"),
+        dict(
+            blob_factory=DefaultBlobFactory(
+                blob_alignment=True, t_drain=np.linspace(1, 3, 8)
+            ).set_sampler("vy", DistributionEnum.normal)
+        ),
+    ],
+)
+def test_float32_realization_matches_float64(engine, model_kwargs):
+    reference = _realize(np.float64, engine, **model_kwargs)
+    single = _realize(np.float32, engine, **model_kwargs)
+    assert single.n.dtype == np.float32
+    np.testing.assert_allclose(
+        single.n.values, reference.n.values, atol=1e-5 * reference.n.values.max()
+    )
+    if "blob_labels" in reference:
+        assert single.blob_labels.dtype == np.float32
+
+
+@pytest.mark.parametrize("shape", list(BlobShapeEnum))
+def test_blob_kernels_keep_float32(shape):
+    """No float64 intermediate leaks into the kernels of any blob shape."""
+    blob = Blob(
+        blob_shape=BlobShapeImpl(shape, shape),
+        shape_parameters_p={"lam": 0.3},
+        shape_parameters_s={"lam": 0.3},
+        theta=0.3,
+        v_y=0.5,
+        t_drain=np.full(4, 2.0),
+    )
+    x, y, t = (np.linspace(0, 3, 4, dtype=np.float32) for _ in range(3))
+    single = blob.discretize_blob(
+        x=x[np.newaxis, :, np.newaxis],
+        y=y[:, np.newaxis, np.newaxis],
+        t=t[np.newaxis, np.newaxis, :],
+        Ly=3,
+        periodic_y=True,
+    )
+    stacked = discretize_blobs([blob], x=x, y=y, t=t[np.newaxis], Ly=3, periodic_y=True)
+    assert single.dtype == np.float32
+    assert stacked.dtype == np.float32
+
+
+def test_float32_netcdf_output(tmp_path):
+    file_name = tmp_path / "realization.nc"
+    Model(
+        geometry=Geometry(Nx=4, Ny=4, T=5), num_blobs=5, verbose=False, dtype="float32"
+    ).make_realization(file_name=str(file_name))
+    with xr.open_dataset(file_name) as dataset:
+        assert dataset.n.dtype == np.float32
+
+
+def test_model_rejects_non_float_dtype():
+    with pytest.raises(ValueError, match="dtype"):
+        Model(dtype=np.int32)
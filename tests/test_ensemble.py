@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from blobmodel import (
+    Blob,
+    DefaultBlobFactory,
+    DistributionEnum,
+    Geometry,
+    HistogramReducer,
+    MeanReducer,
+    Model,
+    VarianceReducer,
+)
+
+
+def _model():
+    return Model(
+        geometry=Geometry(Nx=6, Ny=6, Lx=10, Ly=10, dt=0.5, T=10, periodic_y=True),
+        blob_factory=DefaultBlobFactory().set_sampler(
+            "vy", DistributionEnum.normal, 0.5
+        ),
+        num_blobs=10,
+        verbose=False,
+    )
+
+
+def _realizations(num_realizations, seed):
+    model = _model()
+    realizations = []
+    for seed_sequence in np.random.SeedSequence(seed).spawn(num_realizations):
+        model._blob_factory.set_rng(np.random.default_rng(seed_sequence))
+        realizations.append(model.make_realization().n.values)
+    return np.stack(realizations)
+
+
+def test_ensemble_statistics_match_stacked_realizations():
+    bins = np.linspace(0, 3, 31)
+    ensemble = _model().run_ensemble(
+        5, [VarianceReducer(ddof=1), HistogramReducer(bins)], seed=7
+    )
+    realizations = _realizations(5, seed=7)
+    np.testing.assert_allclose(ensemble.n_mean.values, realizations.mean(axis=0))
+    np.testing.assert_allclose(
+        ensemble.n_variance.values, realizations.var(axis=0, ddof=1), atol=1e-12
+    )
+    np.testing.assert_allclose(
+        ensemble.n_pdf.values, np.histogram(realizations, bins, density=True)[0]
+    )
+    assert ensemble.n_mean.dims == ("y", "x", "t")
+
+
+def test_ensemble_does_not_depend_on_workers():
+    serial = _model().run_ensemble(6, [MeanReducer(), VarianceReducer()], seed=3)
+    parallel = _model().run_ensemble(
+        6, [MeanReducer(), VarianceReducer()], seed=3, workers=2
+    )
+    np.testing.assert_allclose(parallel.n_mean.values, serial.n_mean.values)
+    np.testing.assert_allclose(
+        parallel.n_variance.values, serial.n_variance.values, atol=1e-12
+    )
+
+
+def test_ensemble_accepts_seed_sequence():
+    from_int = _model().run_ensemble(3, [MeanReducer()], seed=5)
+    from_sequence = _model().run_ensemble(
+        3, [MeanReducer()], seed=np.random.SeedSequence(5)
+    )
+    np.testing.assert_array_equal(from_sequence.n_mean.values, from_int.n_mean.values)
+
+
+def test_ensemble_leaves_reducers_untouched():
+    reducer = MeanReducer()
+    _model().run_ensemble(2, [reducer], seed=1)
+    assert reducer.count == 0
+
+
+def test_reducers_reject_mismatched_merges():
+    with pytest.raises(ValueError):
+        MeanReducer().merge(VarianceReducer())
+    with pytest.raises(ValueError):
+        HistogramReducer([0, 1, 2]).merge(HistogramReducer([0, 1, 3]))
+    with pytest.raises(ValueError):
+        MeanReducer().result()
+
+
+@pytest.mark.parametrize(
+    "args, kwargs",
+    [((0, [MeanReducer()]), {}), ((2, [MeanReducer()]), dict(workers=0))],
+)
+def test_ensemble_rejects_invalid_arguments(args, kwargs):
+    with pytest.raises(ValueError):
+        _model().run_ensemble(*args, **kwargs)
+
+
+def test_ensemble_rejects_fixed_blob_list():
+    model = Model.from_blobs([Blob()], verbose=False)
+    with pytest.raises(ValueError, match="fixed list"):
+        model.run_ensemble(2, [MeanReducer()])
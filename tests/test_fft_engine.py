@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+from blobmodel import (
+    BlobShapeEnum,
+    BlobShapeImpl,
+    DefaultBlobFactory,
+    DistributionEnum,
+    Geometry,
+    Model,
+)
+
+
+def _realize(engine, **model_kwargs):
+    model = Model(verbose=False, seed=1, **model_kwargs)
+    return model.make_realization(engine=engine).n.values
+
+
+FFT_CONFIGS = [
+    (
+        dict(
+            num_blobs=300,
+            geometry=Geometry(Nx=1, Ny=1, Lx=1, Ly=0, dt=0.1, T=200),
+            blob_shape=BlobShapeImpl(BlobShapeEnum.exp),
+            one_dimensional=True,
+        ),
+        1e-4,
+    ),
+    # The jumps of the pulses fall between the samples off the blob origin.
+    (
+        dict(
+            num_blobs=300,
+            geometry=Geometry(Nx=7, Ny=1, Lx=10, Ly=0, dt=0.1, T=100),
+            blob_shape=BlobShapeImpl(BlobShapeEnum.exp),
+            blob_factory=DefaultBlobFactory(t_drain=np.linspace(1, 3, 7)),
+            one_dimensional=True,
+        ),
+        1e-4,
+    ),
+    (
+        dict(
+            num_blobs=300,
+            geometry=Geometry(Nx=7, Ny=1, Lx=10, Ly=0, dt=0.1, T=100),
+            blob_shape=BlobShapeImpl(BlobShapeEnum.rect),
+            one_dimensional=True,
+        ),
+        1e-12,
+    ),
+    (
+        dict(
+            num_blobs=300,
+            geometry=Geometry(Nx=7, Ny=1, Lx=10, Ly=0, dt=0.1, T=100),
+            blob_shape=BlobShapeImpl(BlobShapeEnum.gaussian, BlobShapeEnum.rect),
+            blob_factory=DefaultBlobFactory().set_sampler(
+                "vy", DistributionEnum.deg, 0.3
+            ),
+        ),
+        1e-4,
+    ),
+    (
+        dict(
+            num_blobs=100,
+            geometry=Geometry(Nx=10, Ny=1, Lx=10, Ly=0, dt=0.1, T=50),
+            blob_factory=DefaultBlobFactory(t_drain=np.linspace(1, 3, 10)),
+            one_dimensional=True,
+        ),
+        1e-4,
+    ),
+    (
+        dict(
+            num_blobs=100,
+            geometry=Geometry(Nx=8, Ny=16, Lx=10, Ly=10, dt=0.1, T=20, periodic_y=True),
+            blob_factory=DefaultBlobFactory(blob_alignment=True).set_sampler(
+                "vy", DistributionEnum.deg, 0.7
+            ),
+        ),
+        2e-3,
+    ),
+    (
+        dict(
+            num_blobs=100,
+            geometry=Geometry(Nx=8, Ny=16, Lx=10, Ly=10, dt=0.1, T=20),
+            blob_factory=DefaultBlobFactory().set_sampler(
+                "vy", DistributionEnum.deg, 0.3
+            ),
+        ),
+        2e-3,
+    ),
+]
+
+
+@pytest.mark.parametrize("model_kwargs, rtol", FFT_CONFIGS)
+def test_fft_engine_matches_batched(model_kwargs, rtol):
+    reference = _realize("batched", **model_kwargs)
+    fft = _realize("fft", **model_kwargs)
+    assert reference.max() > 0
+    np.testing.assert_allclose(fft, reference, atol=rtol * reference.max())
+
+
+@pytest.mark.parametrize("t_drain", [np.inf, 0.3, np.linspace(0.3, 1, 10)])
+def test_fft_kernel_support_covers_drained_pulse(t_drain):
+    """
+    Truncating the pulse kernel must not change the realization by more than
+    the truncation error, for the largest amplitude of the population and
+    the growth of the drain factor before the arrival of a blob.
+    """
+    model_kwargs = dict(
+        num_blobs=100,
+        geometry=Geometry(Nx=10, Ny=1, Lx=10, Ly=0, dt=0.1, T=50),
+        blob_factory=DefaultBlobFactory(t_drain=t_drain),
+        one_dimensional=True,
+    )
+    untruncated = Model(verbose=False, seed=1, **model_kwargs).make_realization(
+        engine="fft", truncation_error=1e-300
+    )
+    truncated = Model(verbose=False, seed=1, **model_kwargs).make_realization(
+        engine="fft", truncation_error=1e-10
+    )
+    np.testing.assert_allclose(truncated.n.values, untruncated.n.values, atol=1e-9)
+
+
+def test_is_homogeneous():
+    assert DefaultBlobFactory().is_homogeneous()
+    assert (
+        not DefaultBlobFactory()
+        .set_sampler("wp", DistributionEnum.exp)
+        .is_homogeneous()
+    )
+    factory = DefaultBlobFactory()
+    factory.set_theta_setter(lambda: 0.3)
+    assert not factory.is_homogeneous()
+
+
+def test_fft_engine_rejects_inhomogeneous_population():
+    model = Model(
+        verbose=False,
+        blob_factory=DefaultBlobFactory().set_sampler("vx", DistributionEnum.exp),
+    )
+    with pytest.raises(ValueError, match="homogeneous"):
+        model.make_realization(engine="fft")
+
+
+@pytest.mark.parametrize(
+    "blob_shape",
+    [
+        BlobShapeImpl(BlobShapeEnum.exp),
+        BlobShapeImpl(BlobShapeEnum.gaussian, BlobShapeEnum.rect),
+    ],
+)
+def test_fft_engine_rejects_jumps_in_two_dimensions(blob_shape):
+    model = Model(
+        verbose=False,
+        geometry=Geometry(Nx=8, Ny=16, Lx=10, Ly=10, dt=0.1, T=20),
+        blob_shape=blob_shape,
+    )
+    with pytest.raises(ValueError, match="jump"):
+        model.make_realization(engine="fft")
+
+
+def test_fft_engine_rejects_labels():
+    with pytest.raises(ValueError, match="labels"):
+        Model(verbose=False, labels="same").make_realization(engine="fft")
@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ["xarray", "pandas", "tqdm", "nptyping", "netCDF4", "matplotlib"]
+
+
+def test_import_does_not_load_heavy_dependencies():
+    # A fresh interpreter, as modules loaded by other tests stay in sys.modules.
+    code = (
+        "import sys, blobmodel; "
+        f"print([module for module in {HEAVY_MODULES!r} if module in sys.modules])"
+    )
+    loaded = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert loaded == "[]"
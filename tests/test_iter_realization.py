@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+import xarray as xr
+from blobmodel import Blob, DefaultBlobFactory, DistributionEnum, Geometry, Model
+
+
+def _model(**model_kwargs):
+    model_kwargs.setdefault(
+        "geometry", Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=40, periodic_y=True)
+    )
+    return Model(num_blobs=30, verbose=False, seed=1, **model_kwargs)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 80, 1000])
+@pytest.mark.parametrize("engine", ["batched", "per_blob"])
+@pytest.mark.parametrize(
+    "model_kwargs",
+    [
+        dict(labels="individual"),
+        dict(
+            geometry=Geometry(Nx=8, Ny=16, Lx=10, Ly=10, dt=0.5, T=40),
+            blob_factory=DefaultBlobFactory().set_sampler(
+                "vy", DistributionEnum.normal, 0.5
+            ),
+            labels="same",
+        ),
+        dict(
+            geometry=Geometry(Nx=8, Ny=1, Lx=10, Ly=0, dt=0.5, T=40),
+            one_dimensional=True,
+        ),
+    ],
+)
+def test_chunks_concatenate_to_realization(chunk_size, engine, model_kwargs):
+    reference = _model(**model_kwargs).make_realization(engine=engine)
+    chunks = list(
+        _model(**model_kwargs).iter_realization(chunk_size=chunk_size, engine=engine)
+    )
+    assert all(chunk.sizes["t"] <= chunk_size for chunk in chunks)
+    combined = xr.concat(chunks, dim="t")
+    np.testing.assert_allclose(combined.t.values, reference.t.values)
+    # The "per_blob" engine evaluates every blob on the whole chunk, but
+    # only the blobs whose truncated time window overlaps it.
+    atol = 1e-12 if engine == "batched" else 1e-9
+    np.testing.assert_allclose(combined.n.values, reference.n.values, atol=atol)
+    if "blob_labels" in reference:
+        np.testing.assert_array_equal(
+            combined.blob_labels.values, reference.blob_labels.values
+        )
+
+
+def test_only_active_blobs_are_summed_up(monkeypatch):
+    """Each chunk only sums up the blobs whose time window overlaps it."""
+    blobs = [Blob(pos_x0=0.0, t_init=t_init, width_p=0.2) for t_init in range(0, 40, 5)]
+    model = Model.from_blobs(
+        blobs, geometry=Geometry(Nx=8, Ny=1, Lx=10, Ly=0, dt=0.5, T=50), verbose=False
+    )
+    summed_up = []
+    sum_up_blob_list = model._sum_up_blob_list
+
+    def spy(blobs, blob_indices, *args, **kwargs):
+        summed_up.append(list(blob_indices))
+        return sum_up_blob_list(blobs, blob_indices, *args, **kwargs)
+
+    monkeypatch.setattr(model, "_sum_up_blob_list", spy)
+    chunks = list(model.iter_realization(chunk_size=10))
+    assert len(chunks) == 10
+    assert max(map(len, summed_up)) <= 4
+    assert summed_up[-1] == [7]
+
+
+def test_iter_realization_does_not_allocate_full_fields():
+    model = _model()
+    chunks = model.iter_realization(chunk_size=5)
+    next(chunks)
+    assert model._density.shape == (8, 8, 5)
+
+
+@pytest.mark.parametrize(
+    "kwargs, match",
+    [(dict(chunk_size=0), "chunk_size"), (dict(chunk_size=5, engine="fft"), "engine")],
+)
+def test_iter_realization_rejects_invalid_arguments(kwargs, match):
+    with pytest.raises(ValueError, match=match):
+        _model().iter_realization(**kwargs)
+
+
+@pytest.mark.parametrize(
+    "model_kwargs, layout",
+    [
+        (dict(labels="individual"), "default"),
+        (dict(labels="same"), "imaging"),
+        (
+            dict(
+                geometry=Geometry(Nx=8, Ny=1, Lx=10, Ly=0, dt=0.5, T=40),
+                one_dimensional=True,
+            ),
+            "default",
+        ),
+    ],
+)
+def test_chunked_netcdf_matches_in_memory_realization(tmp_path, model_kwargs, layout):
+    reference = _model(**model_kwargs).make_realization(layout=layout)
+    file_name = str(tmp_path / "realization.nc")
+    streamed = _model(**model_kwargs).make_realization(
+        file_name=file_name, layout=layout, chunk_size=7
+    )
+    with xr.open_dataset(file_name) as written:
+        for dataset in (streamed, written):
+            xr.testing.assert_allclose(dataset.load(), reference, atol=1e-12)
+    streamed.close()
+
+
+def test_chunked_realization_releases_file_when_closed(tmp_path):
+    """The dataset is read lazily from the file, which is released once the
+    dataset is closed."""
+    file_name = str(tmp_path / "realization.nc")
+    with _model().make_realization(file_name=file_name, chunk_size=7) as streamed:
+        assert streamed.n.sum() > 0
+    rewritten = _model().make_realization(file_name=file_name, chunk_size=7)
+    rewritten.close()
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(chunk_size=5),
+        dict(chunk_size=5, file_name="unused.nc", workers=2),
+    ],
+)
+def test_chunked_make_realization_rejects_unsupported_options(kwargs):
+    with pytest.raises(ValueError, match="chunk_size"):
+        _model().make_realization(**kwargs)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from blobmodel import DefaultBlobFactory, DistributionEnum, Geometry, Model
+
+da = pytest.importorskip("dask.array")
+
+
+def _model(**model_kwargs):
+    model_kwargs.setdefault(
+        "geometry", Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=40, periodic_y=True)
+    )
+    return Model(num_blobs=30, verbose=False, seed=1, **model_kwargs)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+@pytest.mark.parametrize(
+    "model_kwargs",
+    [
+        dict(labels="individual"),
+        dict(
+            geometry=Geometry(Nx=8, Ny=16, Lx=10, Ly=10, dt=0.5, T=40),
+            blob_factory=DefaultBlobFactory().set_sampler(
+                "vy", DistributionEnum.normal, 0.5
+            ),
+            labels="same",
+        ),
+        dict(
+            geometry=Geometry(Nx=8, Ny=1, Lx=10, Ly=0, dt=0.5, T=40),
+            one_dimensional=True,
+        ),
+    ],
+)
+def test_lazy_realization_matches_eager(chunk_size, model_kwargs):
+    reference = _model(**model_kwargs).make_realization()
+    lazy = _model(**model_kwargs).make_realization(lazy=True, chunks={"t": chunk_size})
+    assert isinstance(lazy.n.data, da.Array)
+    assert max(lazy.n.data.chunks[-1]) == min(chunk_size, reference.t.size)
+    np.testing.assert_allclose(lazy.t.values, reference.t.values)
+    np.testing.assert_allclose(lazy.n.values, reference.n.values, atol=1e-12)
+    if "blob_labels" in reference:
+        assert isinstance(lazy.blob_labels.data, da.Array)
+        np.testing.assert_array_equal(
+            lazy.blob_labels.values, reference.blob_labels.values
+        )
+
+
+def test_lazy_selection_and_reduction():
+    reference = _model().make_realization()
+    lazy = _model().make_realization(lazy=True, chunks={"t": 10})
+    np.testing.assert_allclose(
+        lazy.n.isel(t=slice(25, 35)).mean("t").values,
+        reference.n.isel(t=slice(25, 35)).mean("t").values,
+        atol=1e-12,
+    )
+
+
+def test_lazy_imaging_layout():
+    imaging = _model().make_realization(lazy=True, layout="imaging")
+    assert isinstance(imaging.frames.data, da.Array)
+    np.testing.assert_allclose(
+        imaging.frames.values, _model().make_realization().n.values, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(chunks={"x": 4}),
+        dict(chunks={"t": 0}),
+        dict(workers=2),
+        dict(chunk_size=10, file_name="lazy.nc"),
+    ],
+)
+def test_invalid_lazy_arguments(kwargs):
+    with pytest.raises(ValueError):
+        _model().make_realization(lazy=True, **kwargs)
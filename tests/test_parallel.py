@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from blobmodel import DefaultBlobFactory, DistributionEnum, Geometry, Model
+
+
+def _make_model(labels="off"):
+    return Model(
+        geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=20, periodic_y=True),
+        blob_factory=DefaultBlobFactory().set_sampler(
+            "vy", DistributionEnum.normal, 0.5
+        ),
+        num_blobs=40,
+        labels=labels,
+        verbose=False,
+        seed=3,
+    )
+
+
+@pytest.mark.parametrize("labels", ["off", "same", "individual"])
+@pytest.mark.parametrize("engine", ["batched", "per_blob"])
+def test_parallel_realization_matches_serial(labels, engine):
+    ds_serial = _make_model(labels).make_realization(engine=engine)
+    ds_parallel = _make_model(labels).make_realization(engine=engine, workers=2)
+    np.testing.assert_allclose(ds_parallel.n.values, ds_serial.n.values, atol=1e-12)
+    if labels != "off":
+        np.testing.assert_array_equal(
+            ds_parallel.blob_labels.values, ds_serial.blob_labels.values
+        )
+
+
+def test_parallel_realization_rejects_invalid_workers():
+    with pytest.raises(ValueError, match="workers"):
+        _make_model().make_realization(workers=0)
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+from blobmodel import Geometry, Model
+
+
+def _model(**kwargs):
+    kwargs.setdefault(
+        "geometry", Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=40, periodic_y=True)
+    )
+    return Model(num_blobs=30, verbose=False, seed=1, **kwargs)
+
+
+@pytest.mark.parametrize("engine", ["batched", "per_blob"])
+def test_plan_predicts_work_of_next_realization(engine):
+    model = _model(labels="same")
+    plan = model.plan(engine=engine)
+    reference = _model(labels="same").make_realization(engine=engine)
+    ds = model.make_realization(engine=engine, profile=True)
+    # Planning does not consume the random numbers of the realization.
+    assert ds.n.equals(reference.n)
+    assert plan.num_blobs == 30
+    assert plan.cells == model.last_counters.cells_evaluated
+    assert plan.culled_blobs == model.last_counters.culled_blobs
+    np.testing.assert_array_equal(
+        plan.window_lengths, model.last_counters.window_lengths
+    )
+    assert plan.density_bytes == plan.labels_bytes == ds.n.nbytes
+    assert plan.peak_bytes >= plan.density_bytes + plan.labels_bytes
+    assert plan.temporary_bytes >= model._scratch.nbytes
+    assert plan.seconds(plan.cells / 2) == 2
+
+
+def test_plan_scales_with_chunks_and_workers():
+    model = _model()
+    plan = model.plan()
+    assert plan.labels_bytes == 0
+    assert plan.chunk_size == 80
+    chunked = model.plan(chunk_size=8)
+    assert chunked.density_bytes == plan.density_bytes // 10
+    assert chunked.cells == plan.cells
+    parallel = model.plan(workers=2)
+    # Every worker holds fields of its own and the temporaries of the largest
+    # batch of its partition of the blobs.
+    assert parallel.temporary_bytes <= plan.temporary_bytes
+    assert parallel.peak_bytes == plan.density_bytes + 2 * (
+        plan.density_bytes + parallel.temporary_bytes
+    )
+
+
+def test_plan_rejects_fft_engine():
+    with pytest.raises(ValueError):
+        _model().plan(engine="fft")
+
+
+def test_max_memory_falls_back_to_chunked_write(tmp_path):
+    reference = _model().make_realization()
+    model = _model()
+    plan = model.plan()
+    max_memory = plan.temporary_bytes + plan.density_bytes // 4
+    ds = model.make_realization(
+        file_name=str(tmp_path / "realization.nc"), max_memory=max_memory
+    )
+    assert ds.encoding["unlimited_dims"] == {"t"}
+    np.testing.assert_allclose(ds.n.values, reference.n.values)
+    # Fitting realizations are built in memory as usual.
+    ds = _model().make_realization(max_memory=plan.peak_bytes)
+    assert ds.n.equals(reference.n)
+
+
+def test_max_memory_exceeded_without_chunked_write(tmp_path):
+    model = _model()
+    plan = model.plan()
+    with pytest.raises(ValueError):
+        model.make_realization(max_memory=plan.peak_bytes - 1)
+    with pytest.raises(ValueError):
+        model.make_realization(
+            file_name=str(tmp_path / "realization.nc"),
+            max_memory=plan.temporary_bytes,
+        )
+    with pytest.raises(ValueError):
+        model.make_realization(max_memory=plan.peak_bytes, chunk_size=8)
+
+
+def test_max_memory_samples_blobs_once(tmp_path):
+    reference = _model().make_realization()
+    model = _model()
+    plan = model.plan()
+    sample_blob_batch = model._blob_factory.sample_blob_batch
+    calls = []
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs)
+        return sample_blob_batch(*args, **kwargs)
+
+    model._blob_factory.sample_blob_batch = spy
+    ds = model.make_realization(
+        file_name=str(tmp_path / "realization.nc"),
+        max_memory=plan.temporary_bytes + plan.density_bytes // 4,
+    )
+    assert len(calls) == 1
+    np.testing.assert_allclose(ds.n.values, reference.n.values)
+    ds.close()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_max_memory_keeps_plan_within_budget(tmp_path, monkeypatch, workers):
+    reference = _model().make_realization()
+    model = _model()
+    plan = model.plan(workers=workers)
+    chunk_sizes = []
+    iter_chunks = Model._iter_chunks
+
+    def spy(self, chunk_size, *args, **kwargs):
+        chunk_sizes.append(chunk_size)
+        return iter_chunks(self, chunk_size, *args, **kwargs)
+
+    monkeypatch.setattr(Model, "_iter_chunks", spy)
+    if workers > 1:
+        # Several workers can not write in chunks, the budget must hold the
+        # fields and temporaries of every worker.
+        ds = model.make_realization(workers=workers, max_memory=plan.peak_bytes)
+        np.testing.assert_allclose(ds.n.values, reference.n.values)
+        with pytest.raises(ValueError):
+            model.make_realization(workers=workers, max_memory=plan.peak_bytes - 1)
+        assert not chunk_sizes
+    else:
+        max_memory = plan.temporary_bytes + plan.density_bytes // 3
+        ds = model.make_realization(
+            file_name=str(tmp_path / "realization.nc"), max_memory=max_memory
+        )
+        np.testing.assert_allclose(ds.n.values, reference.n.values)
+        ds.close()
+        (chunk_size,) = chunk_sizes
+        # The largest chunks within the budget.
+        assert _model().plan(chunk_size=chunk_size).peak_bytes <= max_memory
+        assert _model().plan(chunk_size=chunk_size + 1).peak_bytes > max_memory
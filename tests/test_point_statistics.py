@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from blobmodel import Geometry, Model, PointStatisticsReducer
+
+
+def _model(**model_kwargs):
+    model_kwargs.setdefault(
+        "geometry", Geometry(Nx=6, Ny=5, Lx=10, Ly=10, dt=0.5, T=40, periodic_y=True)
+    )
+    return Model(num_blobs=30, verbose=False, seed=2, **model_kwargs)
+
+
+def _central_moment(values, order):
+    return ((values - values.mean(axis=-1, keepdims=True)) ** order).mean(axis=-1)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+@pytest.mark.parametrize(
+    "model_kwargs",
+    [
+        dict(),
+        dict(
+            geometry=Geometry(Nx=6, Ny=1, Lx=10, Ly=0, dt=0.5, T=40),
+            one_dimensional=True,
+        ),
+    ],
+)
+def test_statistics_match_full_realization(chunk_size, model_kwargs):
+    bins = np.linspace(0, 2, 11)
+    n = _model(**model_kwargs).make_realization().n.values
+    statistics = _model(**model_kwargs).make_statistics(chunk_size, bins=bins)
+
+    variance = n.var(axis=-1)
+    np.testing.assert_allclose(statistics.n_mean.values, n.mean(axis=-1), atol=1e-12)
+    np.testing.assert_allclose(statistics.n_variance.values, variance, atol=1e-12)
+    np.testing.assert_allclose(
+        statistics.n_skewness.values,
+        _central_moment(n, 3) / variance**1.5,
+        rtol=1e-8,
+    )
+    np.testing.assert_allclose(
+        statistics.n_flatness.values, _central_moment(n, 4) / variance**2, rtol=1e-8
+    )
+    expected_counts = np.apply_along_axis(
+        lambda values: np.histogram(values, bins)[0], -1, n
+    )
+    np.testing.assert_array_equal(statistics.n_counts.values, expected_counts)
+    assert statistics.n_pdf.dims[-1] == "n_bin"
+    assert "t" not in statistics.dims
+
+
+def test_merged_statistics_match_pooled_values():
+    chunks = list(_model().iter_realization(chunk_size=13))
+    first, second = PointStatisticsReducer(), PointStatisticsReducer()
+    for chunk in chunks[:2]:
+        first.update(chunk)
+    for chunk in chunks[2:]:
+        second.update(chunk)
+    first.merge(second)
+    n = np.concatenate([chunk.n.values for chunk in chunks], axis=-1)
+    np.testing.assert_allclose(
+        first.result().n_flatness.values,
+        _central_moment(n, 4) / n.var(axis=-1) ** 2,
+        rtol=1e-8,
+    )
+
+
+def test_constant_points_have_undefined_shape_moments():
+    statistics = Model.from_blobs(
+        [], geometry=Geometry(Nx=2, Ny=2, Lx=1, Ly=1, T=5), verbose=False
+    ).make_statistics(2, bins=[0, 1])
+    np.testing.assert_array_equal(statistics.n_variance.values, 0)
+    assert np.isnan(statistics.n_skewness.values).all()
+    np.testing.assert_array_equal(statistics.n_pdf.values, 1)
+
+
+def test_statistics_reject_invalid_bins():
+    with pytest.raises(ValueError, match="bins"):
+        _model().make_statistics(10, bins=[1, 0])
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from blobmodel import Blob, DefaultBlobFactory, DistributionEnum, Geometry, Model
+
+PROBE_CONFIGS = [
+    dict(geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=30, periodic_y=True)),
+    dict(
+        geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=30),
+        blob_factory=DefaultBlobFactory(blob_alignment=True).set_sampler(
+            "vy", DistributionEnum.normal, 0.5
+        ),
+    ),
+    dict(
+        geometry=Geometry(Nx=8, Ny=1, Lx=10, Ly=0, dt=0.5, T=30),
+        blob_factory=DefaultBlobFactory(t_drain=np.linspace(1, 3, 8)),
+        one_dimensional=True,
+    ),
+]
+
+
+@pytest.mark.parametrize("model_kwargs", PROBE_CONFIGS)
+def test_probes_on_grid_points_match_realization(model_kwargs):
+    def model():
+        return Model(num_blobs=30, verbose=False, seed=2, **model_kwargs)
+
+    dataset = model().make_realization()
+    if "y" not in dataset.dims:
+        dataset = dataset.expand_dims(y=[0.0])
+    probes = [(x, y) for x in dataset.x.values[1::3] for y in dataset.y.values[::3]]
+    probe_dataset = model().make_probe_realization(probes)
+    assert probe_dataset.n.dims == ("probe", "t")
+    for index, (x, y) in enumerate(probes):
+        np.testing.assert_allclose(
+            probe_dataset.n.values[index],
+            dataset.n.sel(x=x, y=y).values,
+            atol=1e-9,
+        )
+
+
+def test_off_grid_probe_matches_blob():
+    blob = Blob(pos_x0=-2.0, pos_y0=3.3, v_y=0.1, t_init=1.0, width_s=0.7)
+    geometry = Geometry(Nx=4, Ny=4, Lx=10, Ly=10, dt=0.1, T=20)
+    probe_dataset = Model.from_blobs(
+        [blob], geometry=geometry, verbose=False
+    ).make_probe_realization([(4.37, 3.9)])
+    expected = blob.discretize_blob(
+        x=np.array(4.37), y=np.array(3.9), t=geometry.t, Ly=10
+    )
+    assert probe_dataset.n.values.max() > 0.1
+    np.testing.assert_allclose(probe_dataset.n.values[0], expected, atol=1e-9)
+
+
+def test_probe_realization_rejects_malformed_points():
+    with pytest.raises(ValueError, match="points"):
+        Model(verbose=False).make_probe_realization([1.0, 2.0])
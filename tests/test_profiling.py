@@ -0,0 +1,111 @@
+import pstats
+import time
+
+import numpy as np
+import pytest
+from blobmodel import Blob, Geometry, Model, PhaseTimer
+
+
+def _model(**kwargs):
+    return Model(
+        geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=20),
+        num_blobs=20,
+        verbose=False,
+        seed=1,
+        **kwargs,
+    )
+
+
+def test_phase_timer_excludes_nested_phases():
+    timer = PhaseTimer()
+    with timer.phase("outer"):
+        time.sleep(0.01)
+        for _ in range(2):
+            with timer.phase("inner"):
+                time.sleep(0.02)
+    report = timer.report()
+    assert list(report) == ["outer", "inner"]
+    assert report["outer"][1] == 1 and report["inner"][1] == 2
+    assert 0.01 <= report["outer"][0] < 0.03
+    assert report["inner"][0] >= 0.04
+    assert timer.total == pytest.approx(report["outer"][0] + report["inner"][0])
+    assert "inner" in str(timer)
+
+
+def test_disabled_phase_timer_records_nothing():
+    timer = PhaseTimer(enabled=False)
+    with timer.phase("phase"):
+        pass
+    assert timer.report() == {}
+
+
+@pytest.mark.parametrize("engine", ["batched", "per_blob"])
+def test_make_realization_records_phases(engine, tmp_path):
+    model = _model(labels="individual")
+    model.make_realization(
+        file_name=str(tmp_path / "realization.nc"), engine=engine, profile=True
+    )
+    report = model.last_profile.report()
+    phases = {
+        "sampling",
+        "validation",
+        "windows",
+        "discretization",
+        "accumulation",
+        "labels",
+        "dataset",
+        "write",
+    }
+    if engine == "per_blob":
+        # The reference engine evaluates the blobs on the whole grid.
+        phases.remove("windows")
+    assert set(report) == phases
+    assert report["labels"][1] == report["accumulation"][1] >= 20
+    model.make_realization()
+    assert model.last_profile is None
+
+
+def test_make_realization_dumps_cprofile_statistics(tmp_path):
+    model = _model()
+    reference = _model().make_realization()
+    ds = model.make_realization(profile=str(tmp_path / "realization.prof"))
+    assert ds.n.equals(reference.n)
+    assert "discretization" in model.last_profile.report()
+    stats = pstats.Stats(str(tmp_path / "realization.prof"))
+    assert any(function[2] == "_make_realization" for function in stats.stats)
+
+
+def test_work_counters_match_between_engines():
+    """Without speed_up the batched engine evaluates the whole grid as well."""
+    counters = []
+    for engine in ["batched", "per_blob"]:
+        model = _model()
+        model.make_realization(engine=engine, speed_up=False, profile=True)
+        counters.append(model.last_counters)
+    assert counters[0].report() == counters[1].report()
+    np.testing.assert_array_equal(
+        counters[0].window_lengths, counters[1].window_lengths
+    )
+    report = counters[0].report()
+    assert report["num_blobs"] == 20
+    assert report["cells_evaluated"] == 20 * 8 * 8 * 40
+    assert 0 < report["cells_above_truncation"] <= report["cells_evaluated"]
+    assert report["mirror_cells"] == 0
+    assert counters[0].window_length_histogram(bins=5)[0].sum() == 20
+
+
+def test_work_counters_count_culled_blobs_and_mirror_cells():
+    blobs = [
+        Blob(blob_id=0, pos_x0=5.0, pos_y0=0.0, width_s=0.5),
+        Blob(blob_id=1, pos_x0=50.0, pos_y0=5.0),
+    ]
+    geometry = Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=10, periodic_y=True)
+    model = Model.from_blobs(blobs, geometry=geometry, verbose=False)
+    model.make_realization(profile=True)
+    counters = model.last_counters
+    assert counters.culled_blobs == 1
+    np.testing.assert_array_equal(counters.window_lengths, [20, 0])
+    # The blob sits on the lower edge, its mirror at +Ly is evaluated too.
+    assert 0 < counters.mirror_share < 1
+    model.make_realization()
+    assert model.last_counters is None
@@ -0,0 +1,111 @@
+import io
+import logging
+
+import pytest
+from blobmodel import (
+    CallbackReporter,
+    Geometry,
+    LoggingReporter,
+    Model,
+    ProgressReporter,
+    SilentReporter,
+    TqdmReporter,
+)
+
+
+def _model(**kwargs):
+    return Model(
+        geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=20),
+        num_blobs=20,
+        verbose=False,
+        seed=1,
+        **kwargs,
+    )
+
+
+class _RecordingReporter(ProgressReporter):
+    def __init__(self, interval=0.0):
+        super().__init__(interval)
+        self.states = []
+
+    def report(self, state):
+        self.states.append(state)
+
+
+def test_reporter_throttles_reports():
+    reporter = _RecordingReporter(interval=float("inf"))
+    reporter.start(total=3, description="Task")
+    reporter.update(1, cells=10)
+    reporter.update(1, cells=10)
+    assert reporter.states == []
+    reporter.update(1, cells=10)
+    assert len(reporter.states) == 1
+    state = reporter.states[0]
+    assert (state.description, state.unit) == ("Task", "blobs")
+    assert (state.done, state.total, state.cells) == (3, 3, 30)
+    assert state.eta == 0
+
+
+def test_reporter_estimates_time_left():
+    reporter = _RecordingReporter()
+    reporter.start(total=4, description="Task")
+    assert reporter.state().eta == float("inf")
+    reporter.update(1)
+    state = reporter.states[-1]
+    assert state.eta == pytest.approx(3 * state.elapsed)
+
+
+@pytest.mark.parametrize("engine", ["batched", "per_blob"])
+def test_callback_reporter_receives_final_state(engine):
+    states = []
+    model = _model(progress=CallbackReporter(states.append))
+    model.make_realization(engine=engine)
+    assert states[-1].done == states[-1].total == 20
+    assert states[-1].cells > 0
+    assert states[-1].description == "Summing up Blobs"
+
+
+def test_engines_report_same_cells():
+    cells = []
+    for engine in ["batched", "per_blob"]:
+        reporter = SilentReporter()
+        _model(progress=reporter).make_realization(engine=engine, speed_up=False)
+        cells.append(reporter.cells)
+    assert cells[0] == cells[1] == 20 * 8 * 8 * 40
+
+
+def test_parallel_realization_reports_cells_of_workers():
+    serial, parallel = SilentReporter(), SilentReporter()
+    _model(progress=serial).make_realization()
+    _model(progress=parallel).make_realization(workers=2)
+    assert parallel.done == parallel.total == 20
+    assert parallel.cells == serial.cells
+
+
+def test_logging_reporter_writes_progress(caplog):
+    model = _model(progress=LoggingReporter())
+    with caplog.at_level(logging.INFO, logger="blobmodel"):
+        model.make_realization()
+    assert caplog.records[-1].getMessage().startswith("Summing up Blobs: 20/20 blobs")
+
+
+def test_silent_reporter_does_not_report(capsys):
+    model = Model(
+        geometry=Geometry(Nx=8, Ny=8, Lx=10, Ly=10, dt=0.5, T=20),
+        num_blobs=20,
+        seed=1,
+        progress=SilentReporter(),
+    )
+    model.make_realization()
+    assert capsys.readouterr().err == ""
+
+
+def test_tqdm_reporter_shows_unit():
+    output = io.StringIO()
+    reporter = TqdmReporter(file=output)
+    reporter.start(10, "Summing up chunks", "time steps")
+    assert reporter._bar.unit == "time steps"
+    reporter.update(10)
+    reporter.close()
+    assert "10/10" in output.getvalue()
+    assert "time steps/s" in output.getvalue()
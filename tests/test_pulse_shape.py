@@ -90,6 +90,22 @@ def test__get_double_exponential_shape():
     assert np.max(np.abs(values - expected_result)) < 1e-5, "Wrong shape"
 
 
+def test_double_exponential_shape_with_lam_array():
+    """An array of lam evaluates the scalar shapes in one broadcast call."""
+    theta = np.linspace(-5, 5, 101)
+    lam = np.array([0.0, 0.2, 0.5, 1.0])
+    ps = BlobShapeImpl(BlobShapeEnum.double_exp, BlobShapeEnum.double_exp)
+    values = ps.get_blob_shape_p(theta[np.newaxis, :], lam=lam[:, np.newaxis])
+    assert values.shape == (4, 101)
+    for row, scalar_lam in zip(values, lam):
+        np.testing.assert_array_equal(row, ps.get_blob_shape_p(theta, lam=scalar_lam))
+    lower, upper = ps.get_support_p(1e-6, lam=lam)
+    for index, scalar_lam in enumerate(lam):
+        assert (lower[index], upper[index]) == ps.get_support_p(1e-6, lam=scalar_lam)
+    with pytest.raises(ValueError):
+        ps.get_blob_shape_p(theta, lam=np.array([0.5, 1.5])[:, np.newaxis])
+
+
 def test__get_secant_shape():
     """
     Tests that secant has expected shape.
@@ -124,3 +140,76 @@ def test__get_dipole_shape():
     ps = BlobShapeImpl(BlobShapeEnum.dipole, BlobShapeEnum.dipole)
     values = ps.get_blob_shape_s(theta)
     assert np.max(np.abs(values - expected_result)) < 1e-5, "Wrong shape"
+
+
+@pytest.mark.parametrize("shape", list(BlobShapeEnum))
+@pytest.mark.parametrize("tolerance", [1e-2, 1e-6, 1e-10])
+def test_support_bounds_pulse_shape(shape, tolerance):
+    """
+    Outside the reported support the pulse shape is below the tolerance,
+    while just inside it is not (the support is tight), except for the
+    compactly supported rectangle.
+    """
+    kwargs = {"lam": 0.3} if shape == BlobShapeEnum.double_exp else {}
+    ps = BlobShapeImpl(shape, shape)
+    lower, upper = ps.get_support_p(tolerance, **kwargs)
+    assert (lower, upper) == ps.get_support_s(tolerance, **kwargs)
+    assert lower <= 0 <= upper
+
+    theta = np.linspace(lower - 10, upper + 10, 100001)
+    outside = (theta < lower) | (theta > upper)
+    values = np.abs(ps.get_blob_shape_p(theta, **kwargs))
+    assert np.all(values[outside] < tolerance * (1 + 1e-9))
+    if shape != BlobShapeEnum.rect:
+        margin = 1e-3 * max(1, upper - lower)
+        near = (np.abs(theta - lower) < margin) | (np.abs(theta - upper) < margin)
+        near &= ~outside
+        assert np.any(values[near] > tolerance * 0.9)
+
+
+@pytest.mark.parametrize("shape", list(BlobShapeEnum))
+def test_pulse_shape_writes_into_out(shape):
+    """Shapes written into a buffer, including theta itself, match the
+    returned ones in value and dtype."""
+    kwargs = {"lam": 0.3} if shape == BlobShapeEnum.double_exp else {}
+    ps = BlobShapeImpl(shape, shape)
+    for dtype in (np.float64, np.float32):
+        theta = np.linspace(-5, 5, 101, dtype=dtype)
+        expected = ps.get_blob_shape_p(theta, **kwargs)
+        assert expected.dtype == dtype
+        out = np.empty_like(theta)
+        assert ps.get_blob_shape_p(theta, out=out, **kwargs) is out
+        np.testing.assert_array_equal(out, expected)
+        values = theta.copy()
+        ps.get_blob_shape_p(values, out=values, **kwargs)
+        np.testing.assert_array_equal(values, expected)
+
+
+def test_default_support_of_custom_shape():
+    """Custom shapes not overriding the support get the exponential bound."""
+
+    class CustomShape(AbstractBlobShape):
+        def get_blob_shape_p(self, theta, **kwargs):
+            return np.exp(-np.abs(theta))
+
+        def get_blob_shape_s(self, theta, **kwargs):
+            return np.exp(-np.abs(theta))
+
+    radius = -np.log(1e-10 * np.sqrt(np.pi))
+    assert CustomShape().get_support_p(1e-10) == pytest.approx((-radius, radius))
+
+
+@pytest.mark.parametrize(
+    "shape, kwargs",
+    [(shape, {}) for shape in BlobShapeEnum if shape != BlobShapeEnum.double_exp]
+    + [(BlobShapeEnum.double_exp, {"lam": lam}) for lam in [0.0, 0.3, 1.0]],
+)
+def test_jumps_locate_discontinuities(shape, kwargs):
+    """The pulse shape only changes abruptly at the reported jumps."""
+    ps = BlobShapeImpl(shape, shape)
+    jumps = ps.get_jumps_p(**kwargs)
+    assert jumps == ps.get_jumps_s(**kwargs)
+    theta = np.linspace(-5, 5, 100000)
+    steps = np.abs(np.diff(ps.get_blob_shape_p(theta, **kwargs)))
+    midpoints = (theta[1:] + theta[:-1]) / 2
+    np.testing.assert_allclose(midpoints[steps > 0.1], jumps, atol=1e-4)
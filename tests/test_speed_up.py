@@ -2,7 +2,10 @@ from blobmodel import (
     Geometry,
     Model,
     BlobFactory,
+    DefaultBlobFactory,
+    DistributionEnum,
     Blob,
+    BlobBatch,
     AbstractBlobShape,
     BlobShapeImpl,
     BlobShapeEnum,
@@ -91,20 +94,48 @@ def _start_stop(
     geometry_t0: float = 0.0,
     x0: float = 0.0,
 ):
-    """Call _compute_start_stop directly; no discretization is performed."""
+    """Call _compute_windows directly; no discretization is performed."""
     model = _make_model(factory, geometry_t0=geometry_t0, x0=x0)
     blob = _single_blob(factory)
-    start, stop = model._compute_start_stop(blob, speed_up, error)
+    start, stop = _window(model, blob, speed_up, error)
     return start, stop, model, blob
 
 
+def _window(model: Model, blob: Blob, speed_up: bool = True, error: float = ERROR):
+    """Time window of a single blob, see `Model._compute_windows`."""
+    starts, stops = model._compute_windows(
+        BlobBatch.from_blobs([blob]), speed_up, error
+    )
+    return int(starts[0]), int(stops[0])
+
+
+def _y_window(
+    model: Model,
+    blob: Blob,
+    start: int,
+    stop: int,
+    speed_up: bool = True,
+    error: float = ERROR,
+):
+    """Rows a single blob reaches in its time window, see
+    `Model._compute_y_windows`."""
+    y_starts, y_stops = model._compute_y_windows(
+        BlobBatch.from_blobs([blob]),
+        np.array([start]),
+        np.array([stop]),
+        speed_up,
+        error,
+    )
+    return int(y_starts[0]), int(y_stops[0])
+
+
 def _support_indices(model: Model, blob: Blob, error: float) -> np.ndarray:
     """
     Time indices at which the blob's peak contribution inside the sampled
     grid still exceeds `error` (absolute threshold, drain ignored). Derived
     from the trajectory only -- no field discretization.
 
-    The [start, stop) window returned by _compute_start_stop must contain all
+    The [start, stop) window returned by _compute_windows must contain all
     of these indices, otherwise speed_up truncates part of the blob.
     """
     geom = model._geometry
@@ -131,7 +162,7 @@ CONFIGS = [
 
 
 @pytest.mark.parametrize("blob_kwargs", CONFIGS)
-def test_compute_start_stop_returns_integer_window(blob_kwargs):
+def test_compute_windows_returns_integer_window(blob_kwargs):
     """
     start and stop are used as array slice bounds, so they must be genuine
     integers, ordered, and inside [0, t.size]. A float bound (division left
@@ -146,7 +177,7 @@ def test_compute_start_stop_returns_integer_window(blob_kwargs):
 
 
 @pytest.mark.parametrize("blob_kwargs", CONFIGS)
-def test_compute_start_stop_covers_blob_support(blob_kwargs):
+def test_compute_windows_covers_blob_support(blob_kwargs):
     """
     The [start, stop) window must contain every time index at which the blob
     still contributes above `error`; otherwise speed_up silently truncates it.
@@ -171,7 +202,7 @@ SHIFTED_GRID_CONFIGS = [
 
 
 @pytest.mark.parametrize("geometry_t0, blob_kwargs", SHIFTED_GRID_CONFIGS)
-def test_compute_start_stop_with_shifted_time_grid(geometry_t0, blob_kwargs):
+def test_compute_windows_with_shifted_time_grid(geometry_t0, blob_kwargs):
     """
     start/stop are indices into np.arange(geometry_t0, T, dt), so they must be
     rebased by t[0], not by 0. This exercises the (blob.t_init - t0) term: a
@@ -205,7 +236,7 @@ OFFSET_X_CONFIGS = [
 
 
 @pytest.mark.parametrize("x0, blob_kwargs", OFFSET_X_CONFIGS)
-def test_compute_start_stop_with_offset_x_domain(x0, blob_kwargs):
+def test_compute_windows_with_offset_x_domain(x0, blob_kwargs):
     """
     The truncation window is derived from geometry.x[0] and geometry.Lx, so a
     domain-origin offset x0 must not shift the window off the blob's support
@@ -282,7 +313,7 @@ def test_make_realization_defaults_to_speed_up():
 
 
 @pytest.mark.parametrize("speed_up, v_x", [(False, 1.0), (True, 0.0)])
-def test_compute_start_stop_full_window_when_not_applicable(speed_up, v_x):
+def test_compute_windows_full_window_when_not_applicable(speed_up, v_x):
     """
     speed_up disabled, or v_x == 0 (no x-velocity to window on), must return
     the whole time axis.
@@ -293,8 +324,79 @@ def test_compute_start_stop_full_window_when_not_applicable(speed_up, v_x):
     assert (int(start), int(stop)) == (0, model._geometry.t.size)
 
 
+@pytest.mark.parametrize(
+    "t_drain, drain_end",
+    [
+        (0.2, 0.2 * np.log(2.0 / ERROR)),
+        # Drain times varying along x are bounded by the slowest drain.
+        (np.linspace(0.1, 0.2, 10), 0.2 * np.log(2.0 / ERROR)),
+    ],
+)
+@pytest.mark.parametrize("v_x", [0.0, 0.2])
+def test_compute_windows_ends_when_drained(t_drain, drain_end, v_x):
+    """
+    The window ends once the drained amplitude has fallen below the
+    truncation error, also for blobs at rest along x.
+    """
+    start, stop, model, blob = _start_stop(
+        SingleBlobFactory(
+            amplitude=2.0, pos_x0=5.0, v_x=v_x, t_init=1.0, t_drain=t_drain
+        )
+    )
+    t = model._geometry.t
+    assert t[stop - 1] <= blob.t_init + drain_end < t[stop]
+
+    ds_full = model.make_realization(speed_up=False)
+    ds_fast = model.make_realization(truncation_error=ERROR)
+    np.testing.assert_allclose(ds_fast.n.values, ds_full.n.values, atol=10 * ERROR)
+
+
+# (t_drain, periodic_y). The blobs are born mid-domain and enter it well
+# before t_init, while their drain factor exp(-(t - t_init) / t_drain) still
+# exceeds 1 by orders of magnitude.
+DRAIN_CONFIGS = [
+    (0.5, False),
+    (0.5, True),
+    (np.linspace(0.3, 3.0, 32), False),  # drain times varying along x
+]
+
+
+@pytest.mark.parametrize("t_drain, periodic_y", DRAIN_CONFIGS)
+def test_speed_up_realization_matches_full_with_drain(t_drain, periodic_y):
+    """
+    The windows of drained blobs must open early enough for the growth of
+    the drain factor before t_init: a window padded for the bare pulse shape
+    truncates the blobs by many times the truncation error.
+    """
+    geometry_kwargs = dict(
+        Nx=32, Ny=32, Lx=10, Ly=10, dt=0.1, T=15, periodic_y=periodic_y
+    )
+    blobs = [
+        Blob(blob_id=0, pos_x0=5.0, pos_y0=5.0, v_x=1.0, t_init=8.0, t_drain=t_drain),
+        Blob(
+            blob_id=1,
+            pos_x0=6.0,
+            pos_y0=8.0,
+            v_x=0.5,
+            v_y=0.8,
+            t_init=9.0,
+            t_drain=t_drain,
+        ),
+        Blob(blob_id=2, pos_x0=4.0, pos_y0=2.0, v_x=-1.0, t_init=7.0, t_drain=t_drain),
+    ]
+    ds_full = Model.from_blobs(
+        blobs, geometry=Geometry(**geometry_kwargs), verbose=False
+    ).make_realization(speed_up=False)
+    assert ds_full.n.values.max() > 10  # guard: the drain factor exceeds 1
+    for engine in ["batched", "per_blob"]:
+        ds_fast = Model.from_blobs(
+            blobs, geometry=Geometry(**geometry_kwargs), verbose=False
+        ).make_realization(truncation_error=ERROR, engine=engine)
+        np.testing.assert_allclose(ds_fast.n.values, ds_full.n.values, atol=10 * ERROR)
+
+
 @pytest.mark.parametrize("blob_kwargs", CONFIGS)
-def test_compute_start_stop_is_not_wastefully_wide(blob_kwargs):
+def test_compute_windows_is_not_wastefully_wide(blob_kwargs):
     """
     Complement to the coverage test: the window must not extend far past the
     blob's support, or speed_up buys nothing. It may exceed the support by at
@@ -321,7 +423,7 @@ def test_compute_start_stop_is_not_wastefully_wide(blob_kwargs):
         dict(pos_x0=-200.0, v_x=-1.0, t_init=0.0),  # far left, moving further left
     ],
 )
-def test_compute_start_stop_empty_when_blob_never_enters(blob_kwargs):
+def test_compute_windows_empty_when_blob_never_enters(blob_kwargs):
     """
     A blob that never reaches the domain within the time window contributes
     nothing, so the window must collapse (start == stop) rather than default
@@ -332,7 +434,7 @@ def test_compute_start_stop_empty_when_blob_never_enters(blob_kwargs):
     assert start == stop
 
 
-def test_compute_start_stop_widens_as_error_decreases():
+def test_compute_windows_widens_as_error_decreases():
     """
     A smaller `error` keeps more of the blob's tail, so the window can only
     grow (never shrink) as error decreases -- and must still cover the
@@ -347,3 +449,214 @@ def test_compute_start_stop_widens_as_error_decreases():
         assert stop > support.max()
         widths.append(stop - start)
     assert widths == sorted(widths)  # non-decreasing as error shrinks
+
+
+# (blob_kwargs). Narrow blobs in a non-periodic 2D domain, where the y window
+# covers only a few rows of the grid.
+Y_WINDOW_CONFIGS = [
+    dict(width_s=0.2, pos_y0=5.0),  # v_y = 0, centered
+    dict(width_s=0.2, pos_y0=0.0),  # on the lower domain edge
+    dict(width_s=0.2, pos_y0=2.0, v_y=0.2),  # drifting upwards
+    dict(width_s=0.2, pos_y0=3.0, v_y=-0.3),  # leaves the domain downwards
+    dict(width_p=0.1, width_s=0.2, pos_y0=5.0, theta=1.0),  # tilted
+]
+
+
+@pytest.mark.parametrize("blob_kwargs", Y_WINDOW_CONFIGS)
+def test_speed_up_y_window_matches_full(blob_kwargs):
+    """
+    Truncating the rows along y must not change the realization by more than
+    the truncation error.
+    """
+    geometry_kwargs = dict(Nx=16, Ny=64, Lx=10, Ly=10, dt=0.1, T=15)
+    blob = Blob(t_init=2.0, **blob_kwargs)
+    model = Model.from_blobs([blob], geometry=Geometry(**geometry_kwargs))
+    start, stop = _window(model, blob)
+    y_start, y_stop = _y_window(model, blob, start, stop)
+    assert y_stop - y_start < model.geometry.Ny  # guard: the window truncates
+
+    ds_full = Model.from_blobs(
+        [blob], geometry=Geometry(**geometry_kwargs), verbose=False
+    ).make_realization(speed_up=False)
+    for engine in ["batched", "per_blob"]:
+        ds_fast = Model.from_blobs(
+            [blob], geometry=Geometry(**geometry_kwargs), verbose=False
+        ).make_realization(truncation_error=ERROR, engine=engine)
+        np.testing.assert_allclose(ds_fast.n.values, ds_full.n.values, atol=10 * ERROR)
+
+
+@pytest.mark.parametrize("pos_y0, v_y", [(-20.0, 0.0), (40.0, 0.0), (-20.0, -1.0)])
+def test_compute_y_windows_empty_when_blob_never_enters(pos_y0, v_y):
+    """A blob that stays outside the domain vertically is culled entirely."""
+    blob = Blob(pos_y0=pos_y0, v_y=v_y, width_s=0.5)
+    model = Model.from_blobs(
+        [blob], geometry=Geometry(Nx=8, Ny=16, Lx=10, Ly=10, dt=0.1, T=10)
+    )
+    start, stop = _window(model, blob)
+    assert start == stop
+    y_start, y_stop = _y_window(model, blob, 0, 10)
+    assert y_start == y_stop
+    assert model.make_realization().n.values.max() == 0
+
+
+@pytest.mark.parametrize(
+    "blob_kwargs",
+    [
+        dict(pos_y0=5.0, v_x=0.0, v_y=1.0),  # leaves the domain upwards
+        dict(pos_y0=-3.0, v_x=0.0, v_y=0.5),  # enters from below
+        dict(pos_y0=5.0, v_x=1e-3, v_y=-2.0, theta=0.5),  # slow radially
+    ],
+)
+def test_time_window_follows_vertical_motion(blob_kwargs):
+    """
+    Blobs at rest or slow along x get a finite time window from crossing the
+    domain along y, which must not change the realization.
+    """
+    geometry_kwargs = dict(Nx=16, Ny=32, Lx=10, Ly=10, dt=0.1, T=30)
+    blob = Blob(pos_x0=5.0, width_s=0.5, t_init=2.0, **blob_kwargs)
+    model = Model.from_blobs([blob], geometry=Geometry(**geometry_kwargs))
+    start, stop = _window(model, blob)
+    assert 0 < stop - start < model.geometry.t.size
+
+    ds_full = Model.from_blobs(
+        [blob], geometry=Geometry(**geometry_kwargs), verbose=False
+    ).make_realization(speed_up=False)
+    for engine in ["batched", "per_blob"]:
+        ds_fast = Model.from_blobs(
+            [blob], geometry=Geometry(**geometry_kwargs), verbose=False
+        ).make_realization(truncation_error=ERROR, engine=engine)
+        np.testing.assert_allclose(ds_fast.n.values, ds_full.n.values, atol=10 * ERROR)
+
+
+def test_compute_y_windows_full_axis_when_periodic():
+    blob = Blob(pos_y0=5.0, width_s=0.1)
+    model = Model.from_blobs(
+        [blob],
+        geometry=Geometry(Nx=8, Ny=16, Lx=10, Ly=10, dt=0.1, T=10, periodic_y=True),
+    )
+    assert _y_window(model, blob, 0, 10) == (0, 16)
+
+
+@pytest.mark.parametrize(
+    "blob_kwargs",
+    [
+        dict(pos_y0=5.0, width_s=0.5),  # v_y = 0, away from the edges
+        dict(pos_y0=0.2, width_s=0.5),  # v_y = 0, on the lower domain edge
+        dict(pos_y0=2.0, v_y=3.0, theta=0.4),  # wraps several times
+        dict(pos_y0=8.0, v_y=-2.5, width_s=0.7),  # wraps downwards
+    ],
+)
+def test_periodic_speed_up_matches_sum_of_mirrors(blob_kwargs):
+    """
+    In periodic domains each blob is only evaluated on the rows it and its
+    mirrors reach, which must give the sum of the blob's mirrors.
+    """
+    geometry = Geometry(Nx=16, Ny=32, Lx=10, Ly=10, dt=0.1, T=20, periodic_y=True)
+    blob = Blob(v_x=0.5, t_init=2.0, **blob_kwargs)
+    x, y, t = geometry.x[None, :, None], geometry.y[:, None, None], geometry.t
+    expected = sum(
+        blob.discretize_blob(x=x, y=y - k * 10, t=t[None, None, :], Ly=10)
+        for k in range(-8, 9)
+    )
+    for engine in ["batched", "per_blob"]:
+        ds = Model.from_blobs(
+            [blob], geometry=geometry, verbose=False
+        ).make_realization(truncation_error=1e-16, engine=engine)
+        np.testing.assert_allclose(ds.n.values, expected, atol=1e-12)
+
+
+def test_periodic_y_windows_cover_reached_rows_only():
+    """A blob away from the edges does not evaluate its mirrors."""
+    blob = Blob(pos_y0=5.0, width_s=0.1)
+    model = Model.from_blobs(
+        [blob],
+        geometry=Geometry(Nx=8, Ny=16, Lx=10, Ly=10, dt=0.1, T=10, periodic_y=True),
+    )
+    blobs = BlobBatch.from_blobs([blob])
+    segments = model._compute_segments(blobs, True, ERROR)
+    assert 0 < segments.y_starts[0] < segments.y_stops[0] < 16
+    segments = model._compute_segments(blobs, False, ERROR)
+    assert (segments.y_starts[0], segments.y_stops[0]) == (-16, 32)
+
+
+@pytest.mark.parametrize(
+    "blob_shape, shape_parameters",
+    [
+        (BlobShapeImpl(BlobShapeEnum.lorentz, BlobShapeEnum.lorentz), {}),
+        (BlobShapeImpl(BlobShapeEnum.exp, BlobShapeEnum.rect), {}),
+        (BlobShapeImpl(BlobShapeEnum.double_exp, BlobShapeEnum.secant), {"lam": 0.3}),
+        (BlobShapeImpl(BlobShapeEnum.dipole, BlobShapeEnum.gaussian), {}),
+    ],
+)
+@pytest.mark.parametrize("theta", [0.0, 0.4])
+def test_speed_up_matches_full_for_every_shape(blob_shape, shape_parameters, theta):
+    """
+    The truncation window follows the support of the blob shape, so speed_up
+    is correct for slowly decaying (lorentz), one-sided (exp, double_exp) and
+    compact (rect) shapes alike.
+    """
+    error = 1e-4
+    geometry_kwargs = dict(Nx=16, Ny=32, Lx=10, Ly=10, dt=0.1, T=80)
+    blob = Blob(
+        blob_shape=blob_shape,
+        width_p=0.3,
+        width_s=0.3,
+        pos_y0=5.0,
+        t_init=10.0,
+        theta=theta,
+        shape_parameters_p=shape_parameters,
+        shape_parameters_s=shape_parameters,
+    )
+    ds_full = Model.from_blobs(
+        [blob], geometry=Geometry(**geometry_kwargs), verbose=False
+    ).make_realization(speed_up=False)
+    model = Model.from_blobs(
+        [blob], geometry=Geometry(**geometry_kwargs), verbose=False
+    )
+    start, stop = _window(model, blob, error=error)
+    assert stop - start < model.geometry.t.size  # guard: the window truncates
+    ds_fast = model.make_realization(truncation_error=error)
+    assert ds_full.n.values.max() > 0.1
+    np.testing.assert_allclose(ds_fast.n.values, ds_full.n.values, atol=2 * error)
+
+
+def test_exp_window_is_one_sided():
+    """The exponential pulse vanishes before the blob arrives, so the window
+    starts when the blob reaches the domain rather than a margin earlier."""
+    blob = Blob(blob_shape=BlobShapeImpl(BlobShapeEnum.exp), pos_x0=0.0, t_init=5.0)
+    model = Model.from_blobs(
+        [blob], geometry=Geometry(Nx=10, Ny=1, Lx=10, Ly=0, dt=0.1, T=30)
+    )
+    start, _ = _window(model, blob)
+    assert model.geometry.t[start] == pytest.approx(5.0)
+
+
+@pytest.mark.parametrize("periodic_y", [False, True])
+def test_speed_up_keeps_blob_labels(periodic_y):
+    """
+    The windows of speed_up leave out the faint tails of the blobs, which
+    must not change which cells are labeled and with which blob.
+    """
+    factory = (
+        DefaultBlobFactory(blob_alignment=True)
+        .set_sampler("wp", DistributionEnum.uniform, 1.0)
+        .set_sampler("ws", DistributionEnum.uniform, 1.0)
+        .set_sampler("vy", DistributionEnum.normal, 1.0)
+    )
+    datasets = [
+        Model(
+            geometry=Geometry(
+                Nx=16, Ny=16, Lx=10, Ly=10, dt=0.1, T=20, periodic_y=periodic_y
+            ),
+            blob_factory=factory,
+            num_blobs=50,
+            labels="individual",
+            seed=7,
+            verbose=False,
+        ).make_realization(speed_up=speed_up, truncation_error=ERROR)
+        for speed_up in [False, True]
+    ]
+    assert np.unique(datasets[0].blob_labels.values).size > 10
+    np.testing.assert_array_equal(
+        datasets[1].blob_labels.values, datasets[0].blob_labels.values
+    )